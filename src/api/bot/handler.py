@@ -4,18 +4,37 @@ from aiogram import Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message, CallbackQuery
 
-from src.bot.callbacks import QuestionCallback, NumericCallback
+from src.bot.callbacks import QuestionCallback, NumericCallback, RerollCallback
+from src.bot.connections import DatabaseConnectionsMiddleware
+from src.bot.metrics import UpdateMetricsMiddleware
 from src.bot.utils import build_main_reply_keyboard, get_internal_user_with_language_pack
 from src.config import settings
 from src.utils.log import async_log
 from src.bot.bot_controller import get_bot_controller
 
 router = Router()
+router.message.outer_middleware(UpdateMetricsMiddleware('message'))
+router.callback_query.outer_middleware(UpdateMetricsMiddleware('callback_query'))
+router.message.outer_middleware(DatabaseConnectionsMiddleware())
+router.callback_query.outer_middleware(DatabaseConnectionsMiddleware())
 logger = logging.getLogger(settings.LOGGER_NAME)
 
 bot_controller = get_bot_controller()
 
 
+@router.startup()
+async def on_startup() -> None:
+    """Start background tasks of the bot controller."""
+    bot_controller.start_state_sweeper()
+
+
+@router.shutdown()
+async def on_shutdown() -> None:
+    """Stop background tasks of the bot controller."""
+    await bot_controller.stop_state_sweeper()
+    await bot_controller.wait_for_finalization()
+
+
 @router.message(CommandStart())
 @async_log(lvl=logging.INFO)
 async def command_start_handler(message: Message) -> None:
@@ -38,6 +57,12 @@ async def base_handler(message: Message) -> None:
     await bot_controller.pass_message_to_processor(message)
 
 
+@router.callback_query(RerollCallback.filter())
+async def handle_reroll_callback(query: CallbackQuery):
+    """Process team change of a player."""
+    await bot_controller.pass_message_to_processor(query.message, query)
+
+
 @router.callback_query(QuestionCallback.filter)
 async def handle_question_callback(query: CallbackQuery):
     """Process registration choice."""
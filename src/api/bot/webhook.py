@@ -0,0 +1,83 @@
+import asyncio
+import hmac
+from typing import Any, Awaitable, Callable
+
+import ujson
+
+from src.bot.dispatcher import dispatcher, telegram_bot
+from src.config import settings
+from src.utils.log import get_logger
+
+SECRET_TOKEN_HEADER = b'x-telegram-bot-api-secret-token'  # noqa: S105
+
+ASGIApplication = Callable[[dict, Callable[[], Awaitable[dict]], Callable[[dict], Awaitable[None]]], Awaitable[None]]
+
+logger = get_logger(settings.LOGGER_NAME)
+
+feed_tasks: set[asyncio.Task] = set()
+
+
+class WebhookApplication:
+    """
+    ASGI application which receives Telegram updates and passes other requests to the wrapped application.
+
+    Updates bypass the Django request/middleware stack and are processed in the background,
+    so Telegram gets the response immediately and can deliver the next update without waiting for the handlers.
+    """
+
+    def __init__(self, application: ASGIApplication, path: str = settings.BOT_WEBHOOK_PATH) -> None:
+        self.application = application
+        self.path = '/' + path.strip('/')
+        self.secret = settings.BOT_WEBHOOK_SECRET.encode() if settings.BOT_WEBHOOK_SECRET else None
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        """Handle webhook request or pass the request to the wrapped application."""
+        if scope['type'] != 'http' or scope['path'].rstrip('/') != self.path:
+            await self.application(scope, receive, send)
+            return
+
+        if scope['method'] != 'POST':
+            await _send_response(send, 405)
+            return
+
+        if self.secret is not None and not self._is_secret_valid(scope):
+            await _send_response(send, 403)
+            return
+
+        try:
+            update = ujson.loads(await _read_body(receive))
+        except ValueError:
+            await _send_response(send, 400)
+            return
+
+        task = asyncio.create_task(_feed_update(update))
+        feed_tasks.add(task)
+        task.add_done_callback(feed_tasks.discard)
+
+        await _send_response(send, 200)
+
+    def _is_secret_valid(self, scope: dict) -> bool:
+        """Compare the secret token header in constant time, so the secret can not be guessed by timing."""
+        return hmac.compare_digest(dict(scope['headers']).get(SECRET_TOKEN_HEADER, b''), self.secret)
+
+
+async def _feed_update(update: dict[str, Any]) -> None:
+    try:
+        await dispatcher.feed_raw_update(bot=telegram_bot, update=update)
+    except Exception as e:
+        logger.exception(f'Exception while processing webhook update: {e}')
+
+
+async def _read_body(receive: Callable) -> bytes:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def _send_response(send: Callable, status: int) -> None:
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-length', b'0')]})
+    await send({'type': 'http.response.body', 'body': b''})
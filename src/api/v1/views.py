@@ -0,0 +1,10 @@
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET
+
+from src.utils.metrics import CONTENT_TYPE, get_metrics_registry
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Return the process metrics in the text exposition format."""
+    return HttpResponse(get_metrics_registry().render(), content_type=CONTENT_TYPE)
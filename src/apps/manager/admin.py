@@ -1,7 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
 from src.apps.manager.forms import CustomUserChangeForm, CustomUserCreationForm, TeamForm
-from src.apps.manager.models import CustomUser, Team, Tournament, Game, League
+from src.apps.manager.models import CustomUser, Team, Tournament, Game, League, Standing
+from src.apps.manager.scheduler import schedule_tournament_games
+from src.apps.manager.standings import rebuild_standings
 
 
 @admin.register(CustomUser)
@@ -51,6 +53,56 @@ class TournamentAdmin(admin.ModelAdmin):
     list_display = ('name', 'start_date', 'end_date')
     list_filter = ('start_date', 'fifa_version')
     search_fields = ('name',)
+    actions = ('generate_schedule', 'rebuild_tournament_standings')
+
+    @admin.action(description='Generate round-robin games schedule')
+    def generate_schedule(self, request, queryset):
+        """Create games of all circles for the selected tournaments."""
+        for tournament in queryset:
+            try:
+                games = schedule_tournament_games(tournament)
+            except ValueError as e:
+                self.message_user(request, str(e), level=messages.WARNING)
+                continue
+
+            self.message_user(request, f'Tournament "{tournament}": {len(games)} games scheduled.')
+
+    @admin.action(description='Rebuild standings from completed games')
+    def rebuild_tournament_standings(self, request, queryset):
+        """Recalculate standings of the selected tournaments from scratch."""
+        for tournament in queryset:
+            rebuild_standings(tournament)
+
+        self.message_user(request, f'Standings of {len(queryset)} tournaments are rebuilt.')
+
+
+@admin.register(Standing)
+class StandingAdmin(admin.ModelAdmin):
+    """Admin model for Standing, the standings are changed by games only."""
+
+    list_display = (
+        'player',
+        'tournament',
+        'points',
+        'played',
+        'victories',
+        'draws',
+        'losses',
+        'goals_for',
+        'goals_against',
+    )
+    list_filter = ('tournament',)
+    search_fields = ('player__nickname', 'player__telegram_username')
+    ordering = ('tournament', '-points')
+    list_select_related = ('player', 'tournament')
+
+    def has_add_permission(self, request):
+        """Standings are created by tournaments participants."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Standings are changed by games results."""
+        return False
 
 
 @admin.register(Game)
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
 
+from src.utils.log_queue import start_queue_listeners
+
 
 class ManagerConfig(AppConfig):
     """Config for manager app."""
 
     name = 'src.apps.manager'
+
+    def ready(self):
+        """Connect signal receivers and start processing of the queued log records."""
+        from src.apps.manager import signals  # noqa: F401, WPS433
+
+        start_queue_listeners()
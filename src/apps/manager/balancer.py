@@ -0,0 +1,203 @@
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from uuid import UUID
+
+import numpy as np
+
+from src.apps.manager.catalogue import TeamRecord, get_team_catalogue
+from src.config import settings
+from src.utils.enums import Country
+
+STATS_FIELDS = ('attack', 'midfield', 'defense', 'general')
+
+NO_COUNTRY = -1
+
+# teams tried as centers of the balanced group, they are scored in vectorized batches until one fits
+ANCHORS_COUNT = 64
+ANCHORS_BATCH_SIZE = 8
+
+# seeded picks are replayed for every change of the drawn teams, so they are kept until the catalogue is reloaded
+SEEDED_PICKS_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class TeamFilter:
+    """Conditions of the teams pool, omitted conditions match all teams."""
+
+    min_rating: float | None = None
+    max_rating: float | None = None
+    countries: tuple[Country, ...] = ()
+    league_ids: tuple[UUID, ...] = ()
+    fifa_version: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BalancedTeams:
+    """Picked teams and the largest difference of their stats."""
+
+    teams: tuple[TeamRecord, ...]
+    spread: int
+    is_within_tolerance: bool
+
+
+class TeamStatsIndex:
+    """Column arrays of the catalogue teams for vectorized filtering and scoring."""
+
+    def __init__(self, teams: tuple[TeamRecord, ...]) -> None:
+        self.teams = teams
+        # stats by columns, so that every stat of the pool is a contiguous row
+        self.stats = np.array(
+            [[getattr(team, field_name) for team in teams] for field_name in STATS_FIELDS],
+            dtype=np.int16,
+        ).reshape(len(STATS_FIELDS), -1)
+        self.ratings = np.array([team.rating for team in teams], dtype=np.float64)
+        self.fifa_versions = np.array([team.fifa_version for team in teams], dtype=np.int16)
+        self.countries = np.array(
+            [team.country.value if team.country is not None else NO_COUNTRY for team in teams],
+            dtype=np.int16,
+        )
+        self._league_numbers = {
+            league_id: number for number, league_id in enumerate({team.league_id for team in teams})
+        }
+        self.leagues = np.array([self._league_numbers[team.league_id] for team in teams], dtype=np.int32)
+
+    def get_pool(self, team_filter: TeamFilter) -> np.ndarray:
+        """Return indexes of the teams matching the filter."""
+        mask = np.ones(len(self.teams), dtype=bool)
+        if team_filter.min_rating is not None:
+            mask &= self.ratings >= team_filter.min_rating
+        if team_filter.max_rating is not None:
+            mask &= self.ratings <= team_filter.max_rating
+        if team_filter.fifa_version is not None:
+            mask &= self.fifa_versions == team_filter.fifa_version
+        if team_filter.countries:
+            mask &= np.isin(self.countries, [country.value for country in team_filter.countries])
+        if team_filter.league_ids:
+            league_numbers = [self._league_numbers.get(league_id) for league_id in team_filter.league_ids]
+            mask &= np.isin(self.leagues, [number for number in league_numbers if number is not None])
+        return np.flatnonzero(mask)
+
+
+class TeamBalancer:
+    """
+    Picks teams with close attack, midfield, defense and general stats.
+
+    Random anchor teams of the pool are scored in batches by the Chebyshev distance of their stats to every pool team,
+    teams within half of the tolerance from one anchor differ by at most the tolerance in every stat.
+    If no anchor has enough such teams, the anchor with the closest teams is used.
+    """
+
+    def __init__(self, tolerance: int = settings.TEAM_BALANCE_TOLERANCE) -> None:
+        self.tolerance = tolerance
+        self._index: TeamStatsIndex | None = None
+        self._seeded_picks: OrderedDict[tuple, BalancedTeams] = OrderedDict()
+
+    async def apick_teams(
+        self,
+        teams_count: int,
+        team_filter: TeamFilter,
+        seed: int | None = None,
+    ) -> BalancedTeams | None:
+        """Pick teams from the catalogue, None if the pool has too few teams."""
+        return self.pick_teams(await get_team_catalogue().aget_all_teams(), teams_count, team_filter, seed)
+
+    def pick_teams(
+        self,
+        teams: tuple[TeamRecord, ...],
+        teams_count: int,
+        team_filter: TeamFilter,
+        seed: int | None = None,
+    ) -> BalancedTeams | None:
+        """Pick teams from the given teams, the same seed gives the same teams, which are picked only once."""
+        index = self._get_index(teams)
+        if seed is None:
+            return self._pick_teams(index, teams_count, team_filter, seed)
+
+        pick_key = (teams_count, team_filter, seed)
+        balanced_teams = self._seeded_picks.get(pick_key)
+        if balanced_teams is not None:
+            self._seeded_picks.move_to_end(pick_key)
+            return balanced_teams
+
+        # too small pools are not cached, they are rejected before scoring
+        balanced_teams = self._pick_teams(index, teams_count, team_filter, seed)
+        if balanced_teams is not None:
+            self._seeded_picks[pick_key] = balanced_teams
+            if len(self._seeded_picks) > SEEDED_PICKS_CACHE_SIZE:
+                self._seeded_picks.popitem(last=False)
+        return balanced_teams
+
+    def _pick_teams(
+        self,
+        index: TeamStatsIndex,
+        teams_count: int,
+        team_filter: TeamFilter,
+        seed: int | None,
+    ) -> BalancedTeams | None:
+        pool = index.get_pool(team_filter)
+        if teams_count < 1 or len(pool) < teams_count:
+            return None
+
+        random_generator = np.random.default_rng(seed)
+        pool_stats = index.stats[:, pool]
+        picked = self._pick_within_tolerance(pool_stats, teams_count, random_generator)
+
+        picked_stats = pool_stats[:, picked]
+        spread = int((picked_stats.max(axis=1) - picked_stats.min(axis=1)).max())
+        return BalancedTeams(
+            teams=tuple(index.teams[team_index] for team_index in pool[picked]),
+            spread=spread,
+            is_within_tolerance=spread <= self.tolerance,
+        )
+
+    def _pick_within_tolerance(
+        self,
+        pool_stats: np.ndarray,
+        teams_count: int,
+        random_generator: np.random.Generator,
+    ) -> np.ndarray:
+        """Return pool indexes of the teams close to a random anchor, or the closest teams if none fits."""
+        pool_size = pool_stats.shape[1]
+        anchors = random_generator.choice(pool_size, size=min(ANCHORS_COUNT, pool_size), replace=False)
+        radius = self.tolerance // 2
+        anchors_distances = []
+        for anchors_batch in itertools.batched(anchors, ANCHORS_BATCH_SIZE):
+            distances = _get_distances(pool_stats, np.array(anchors_batch))
+            feasible_anchors = np.flatnonzero((distances <= radius).sum(axis=1) >= teams_count)
+            if feasible_anchors.size:
+                candidates = np.flatnonzero(distances[random_generator.choice(feasible_anchors)] <= radius)
+                return random_generator.choice(candidates, size=teams_count, replace=False)
+            anchors_distances.append(distances)
+
+        distances = np.vstack(anchors_distances)
+        closest_anchor = int(np.argmin(np.partition(distances, teams_count - 1, axis=1)[:, teams_count - 1]))
+        return np.argpartition(distances[closest_anchor], teams_count - 1)[:teams_count]
+
+    def _get_index(self, teams: tuple[TeamRecord, ...]) -> TeamStatsIndex:
+        """Return index of the teams, it is rebuilt with the seeded picks only after the catalogue is reloaded."""
+        if self._index is None or self._index.teams is not teams:
+            self._index = TeamStatsIndex(teams)
+            self._seeded_picks.clear()
+        return self._index
+
+
+@lru_cache()
+def get_team_balancer() -> TeamBalancer:
+    """Create and return Team Balancer."""
+    return TeamBalancer()
+
+
+def _get_distances(pool_stats: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+    """Return the largest stat difference of every anchor with every pool team, anchors by rows."""
+    distances = np.zeros((len(anchors), pool_stats.shape[1]), dtype=np.int16)
+    for stat_values in pool_stats:
+        np.maximum(distances, np.abs(stat_values[anchors, None] - stat_values[None, :]), out=distances)
+    return distances
+
+
+def get_stats_spread(teams: tuple[TeamRecord, ...]) -> int:
+    """Return the largest difference of the teams stats."""
+    stats = np.array([[getattr(team, field_name) for field_name in STATS_FIELDS] for team in teams])
+    return int((stats.max(axis=0) - stats.min(axis=0)).max())
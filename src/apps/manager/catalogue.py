@@ -0,0 +1,142 @@
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+
+from src.apps.manager.models import Team
+from src.config import settings
+from src.utils.enums import Country
+
+CatalogueKey = tuple[Optional[int], float, Optional[Country]]
+
+
+@dataclass(frozen=True, slots=True)
+class TeamRecord:
+    """Immutable snapshot of a team with its league and country."""
+
+    id: UUID
+    name: str
+    fifa_version: int
+    rating: float
+    attack: int
+    midfield: int
+    defense: int
+    general: int
+    league_id: UUID
+    league_name: str
+    country: Country | None
+
+
+class TeamCatalogue:
+    """
+    Process-wide in-memory index of all teams.
+
+    Teams are grouped by (fifa_version, rating, country), where None in fifa_version or country
+    means "any", so every lookup is a single dict access. The whole catalogue is loaded with one query
+    and reloaded lazily after Team/League rows change in this process or ttl seconds after loading,
+    so changes made by other processes are picked up as well.
+    """
+
+    def __init__(self, ttl: int = settings.TEAM_CATALOGUE_TTL_SECONDS) -> None:
+        self.ttl = ttl
+        self._teams: Mapping[UUID, TeamRecord] = MappingProxyType({})
+        self._all_teams: tuple[TeamRecord, ...] = ()
+        self._buckets: Mapping[CatalogueKey, tuple[TeamRecord, ...]] = MappingProxyType({})
+        self._generation = 0
+        self._loaded_generation: int | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True if the catalogue reflects the current database state."""
+        return self._loaded_generation == self._generation and self._expires_at > time.monotonic()
+
+    def invalidate(self) -> None:
+        """Mark the catalogue as stale, it will be reloaded on the next access."""
+        self._generation += 1
+
+    def load(self) -> None:
+        """Load all teams with their leagues from the database and rebuild indexes."""
+        with self._lock:
+            # concurrent callers wait for the same reload, only the first one queries
+            if self.is_loaded:
+                return
+
+            generation = self._generation
+            expires_at = time.monotonic() + self.ttl
+            teams = {}
+            buckets: dict[CatalogueKey, list[TeamRecord]] = {}
+
+            for team in Team.objects.select_related('league').order_by('name', 'id'):
+                record = _build_record(team)
+                teams[record.id] = record
+                for bucket_key in _get_bucket_keys(record):
+                    buckets.setdefault(bucket_key, []).append(record)
+
+            self._teams = MappingProxyType(teams)
+            self._all_teams = tuple(teams.values())
+            self._buckets = MappingProxyType({key: tuple(records) for key, records in buckets.items()})
+            self._loaded_generation = generation
+            self._expires_at = expires_at
+
+    async def aensure_loaded(self) -> None:
+        """Reload the catalogue if it is stale."""
+        if not self.is_loaded:
+            await sync_to_async(self.load)()
+
+    async def aget_teams(
+        self,
+        rating: float,
+        country: Country | None = None,
+        fifa_version: int | None = None,
+    ) -> tuple[TeamRecord, ...]:
+        """Return all teams with the given rating, optionally filtered by league country and FIFA version."""
+        await self.aensure_loaded()
+        return self._buckets.get((fifa_version, rating, country), ())
+
+    async def aget_all_teams(self) -> tuple[TeamRecord, ...]:
+        """Return all teams, the same tuple is returned until the catalogue is reloaded."""
+        await self.aensure_loaded()
+        return self._all_teams
+
+    async def aget_team(self, team_id: UUID) -> TeamRecord:
+        """Return the team by id."""
+        await self.aensure_loaded()
+        return self._teams[team_id]
+
+
+@lru_cache()
+def get_team_catalogue() -> TeamCatalogue:
+    """Create and return Team Catalogue."""
+    return TeamCatalogue()
+
+
+def _get_bucket_keys(record: TeamRecord) -> set[CatalogueKey]:
+    return {
+        (fifa_version, record.rating, country)
+        for fifa_version in (record.fifa_version, None)
+        for country in (record.country, None)
+    }
+
+
+def _build_record(team: Team) -> TeamRecord:
+    league = team.league
+    return TeamRecord(
+        id=team.id,
+        name=team.name,
+        fifa_version=team.fifa_version,
+        rating=team.rating,
+        attack=team.attack,
+        midfield=team.midfield,
+        defense=team.defense,
+        general=team.general,
+        league_id=league.id,
+        league_name=league.name,
+        country=Country(league.country) if league.country is not None else None,
+    )
@@ -0,0 +1,160 @@
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from django.db import transaction
+
+from src.apps.manager.catalogue import get_team_catalogue
+from src.apps.manager.models import League, Team
+from src.utils.enums import Country, FIFAVersion
+
+TEAMS_BATCH_SIZE = 500
+
+READ_CHUNK_SIZE = 64 * 1024
+
+TEAM_UPDATE_FIELDS = ('img_url', 'rating', 'attack', 'midfield', 'defense', 'general')
+
+
+class CatalogueImportError(Exception):
+    """Import file has invalid data."""
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """Counts and durations of the import phases in seconds."""
+
+    leagues_count: int = 0
+    teams_count: int = 0
+    created_teams_count: int = 0
+    durations: dict[str, float] = field(default_factory=dict)
+
+
+def import_catalogue(
+    teams_path: Path,
+    leagues_path: Path | None = None,
+    fifa_version: FIFAVersion | None = None,
+    batch_size: int = TEAMS_BATCH_SIZE,
+) -> ImportReport:
+    """
+    Insert or update leagues and teams from JSON arrays in one transaction.
+
+    Leagues are matched by name and teams by name, league and FIFA version, so importing the same files again
+    only updates the stats. The files are read as streams and teams are written in batches.
+    Team fifa_version is taken from the file unless fifa_version is passed.
+    """
+    report = ImportReport()
+    start_time = time.perf_counter()
+    with transaction.atomic():
+        if leagues_path is not None:
+            with open(leagues_path, 'r', encoding='utf-8') as leagues_file:
+                report.leagues_count = _upsert_leagues(iter_json_array(leagues_file))
+            report.durations['leagues'] = time.perf_counter() - start_time
+
+        teams_start_time = time.perf_counter()
+        league_ids = dict(League.objects.values_list('name', 'id'))
+        teams_count_before = Team.objects.count()
+        with open(teams_path, 'r', encoding='utf-8') as teams_file:
+            for teams_batch in itertools.batched(iter_json_array(teams_file), batch_size):
+                report.teams_count += _upsert_teams(teams_batch, league_ids, fifa_version)
+
+        report.created_teams_count = Team.objects.count() - teams_count_before
+        report.durations['teams'] = time.perf_counter() - teams_start_time
+        transaction.on_commit(get_team_catalogue().invalidate)
+
+    report.durations['total'] = time.perf_counter() - start_time
+    return report
+
+
+def iter_json_array(json_file: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield objects of the top-level JSON array reading the file by chunks."""
+    decoder = json.JSONDecoder()
+    buffer = _read_until_item(json_file, '', chunk_size)
+    if not buffer.startswith('['):
+        raise CatalogueImportError('JSON array is expected.')
+
+    buffer = _read_until_item(json_file, buffer[1:], chunk_size)
+    if buffer.startswith(']'):
+        return
+
+    while True:
+        try:
+            item, item_end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = json_file.read(chunk_size)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+
+        yield item
+        buffer = _read_until_item(json_file, buffer[item_end:], chunk_size)
+        if buffer.startswith(']'):
+            return
+        if not buffer.startswith(','):
+            raise CatalogueImportError('Items of the JSON array must be separated by commas.')
+        buffer = _read_until_item(json_file, buffer[1:], chunk_size)
+
+
+def _read_until_item(json_file: IO[str], buffer: str, chunk_size: int) -> str:
+    """Return buffer without leading whitespace, reading more of the file while it is empty."""
+    buffer = buffer.lstrip()
+    while not buffer:
+        chunk = json_file.read(chunk_size)
+        if not chunk:
+            raise CatalogueImportError('Unexpected end of the JSON array.')
+        buffer = chunk.lstrip()
+    return buffer
+
+
+def _upsert_leagues(leagues_data: Iterator[dict]) -> int:
+    leagues = {
+        league_data['name']: League(
+            name=league_data['name'],
+            country=Country.from_string(league_data['country']) if league_data.get('country') else None,
+        )
+        for league_data in leagues_data
+    }
+    League.objects.bulk_create(
+        leagues.values(),
+        update_conflicts=True,
+        unique_fields=['name'],
+        update_fields=['country'],
+    )
+    return len(leagues)
+
+
+def _upsert_teams(teams_data: tuple[dict, ...], league_ids: dict, fifa_version: FIFAVersion | None) -> int:
+    # the same team may appear twice in a file, the last one wins as a row can be upserted once per statement
+    teams = {}
+    for team_data in teams_data:
+        team = _build_team(team_data, league_ids, fifa_version)
+        teams[team.name, team.league_id, team.fifa_version] = team
+
+    Team.objects.bulk_create(
+        teams.values(),
+        update_conflicts=True,
+        unique_fields=['name', 'league', 'fifa_version'],
+        update_fields=TEAM_UPDATE_FIELDS,
+    )
+    return len(teams)
+
+
+def _build_team(team_data: dict, league_ids: dict, fifa_version: FIFAVersion | None) -> Team:
+    league_id = league_ids.get(team_data['league'])
+    if league_id is None:
+        raise CatalogueImportError(f'League "{team_data['league']}" of team "{team_data['name']}" is not found.')
+
+    return Team(
+        name=team_data['name'],
+        league_id=league_id,
+        img_url=team_data.get('img_url'),
+        fifa_version=FIFAVersion(fifa_version or team_data['fifa_version']),
+        rating=team_data['rating'],
+        attack=team_data['attack'],
+        midfield=team_data['midfield'],
+        defense=team_data['defense'],
+        general=team_data['general'],
+    )
@@ -0,0 +1,79 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable
+from uuid import uuid1
+
+from django.core.management.base import BaseCommand
+from wrapt import decorator
+
+from src.utils.log import async_log, get_logged_args, normalize_for_log
+
+BENCH_LOGGER_NAME = 'bench_async_log'
+
+
+def legacy_async_log(logger_inst: logging.Logger, lvl: int) -> Callable:
+    """async_log used before the fast path: the call is always traced and the records are filtered by the logger."""
+
+    @decorator
+    async def _log(wrapped: Callable, instance: Any, args: tuple, kwargs: dict) -> Any:
+        func_name = wrapped.__qualname__
+        extra = {'call_id': uuid1().hex, 'function': func_name, 'function_full_name': func_name}
+        params = inspect.getfullargspec(wrapped)
+        start_time = time.time()
+        extra['input_data'] = get_logged_args(params, [instance] + list(args) if instance else args, kwargs, ())
+        logger_inst.log(level=lvl, msg=f'call {func_name}', extra=extra)
+
+        result = await wrapped(*args, **kwargs)
+
+        extra['result'] = normalize_for_log(result)
+        extra['execution_time_ms'] = int((time.time() - start_time) * 1000)
+        logger_inst.log(level=lvl, msg=f'return {func_name}', extra=extra)
+        return result
+
+    return _log
+
+
+async def process(chat_id: int, text: str, payload: dict | None = None) -> dict:
+    """Function of a typical signature used to measure the decorator overhead."""
+    return {'chat_id': chat_id, 'text': text}
+
+
+class Command(BaseCommand):
+    """Measure per-call overhead of async_log."""
+
+    help = 'Benchmark async_log overhead with disabled, sampled and enabled tracing.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--calls', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        logger = logging.getLogger(BENCH_LOGGER_NAME)
+        logger.propagate = False
+        logger.handlers = [logging.NullHandler()]
+        calls = options['calls']
+
+        baseline = asyncio.run(_measure(process, calls))
+        self.stdout.write(f'undecorated: {baseline * 1e6:.2f} us per call')
+
+        cases = (
+            ('legacy, level disabled', logging.WARNING, legacy_async_log(logger, logging.DEBUG)),
+            ('level disabled', logging.WARNING, async_log(logger, logging.DEBUG)),
+            ('level enabled, 1% sample', logging.DEBUG, async_log(logger, logging.DEBUG, sample_rate=0.01)),
+            ('legacy, level enabled', logging.DEBUG, legacy_async_log(logger, logging.DEBUG)),
+            ('level enabled', logging.DEBUG, async_log(logger, logging.DEBUG)),
+        )
+        for case_name, logger_level, log_decorator in cases:
+            logger.setLevel(logger_level)
+            per_call = asyncio.run(_measure(log_decorator(process), calls))
+            self.stdout.write(f'{case_name}: {(per_call - baseline) * 1e6:.2f} us overhead per call')
+
+
+async def _measure(func: Callable, calls: int) -> float:
+    start_time = time.perf_counter()
+    for i in range(calls):
+        await func(i, 'text', payload={'key': 'value'})
+    return (time.perf_counter() - start_time) / calls
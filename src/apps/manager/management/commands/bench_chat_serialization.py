@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from aiogram.types import Update
+from django.core.management.base import BaseCommand, CommandError
+
+from src.bot import metrics
+from src.language.manager import get_bot_phrases
+from src.utils.fake_telegram import build_conversation_updates, build_message_update, use_fake_session
+
+REFERENCE_CHAT_ID = 0
+
+
+class Command(BaseCommand):
+    """Feed all updates of many team choosing conversations at once."""
+
+    help = 'Load test of per-chat update serialization: chats run concurrently, updates of a chat in order.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--chats', type=int, default=1000)
+        parser.add_argument('--latency-ms', type=float, default=5, help='Emulated Bot API round-trip.')
+        parser.add_argument('--burst', type=int, default=30, help='Messages sent at once to every chat at the end.')
+
+    def handle(self, *args, **options):
+        """Run load test."""
+        asyncio.run(self._run(chats=options['chats'], latency=options['latency_ms'] / 1000, burst=options['burst']))
+
+    async def _run(self, chats: int, latency: float, burst: int) -> None:
+        from src.bot.bot_controller import get_bot_controller  # noqa: WPS433
+        from src.bot.dispatcher import dispatcher, telegram_bot  # noqa: WPS433
+
+        session = use_fake_session(latency)
+        bot_controller = get_bot_controller()
+
+        async def feed(updates: list[dict]) -> None:
+            # tasks start in creation order, so updates of a chat reach its lock in the order of the list
+            await asyncio.gather(
+                *(
+                    dispatcher.feed_update(telegram_bot, Update.model_validate(update, context={'bot': telegram_bot}))
+                    for update in updates
+                ),
+            )
+            await bot_controller.wait_for_finalization()
+
+        # one conversation processed step by step gives the replies every chat must get
+        bot_phrases = get_bot_phrases(None)
+        for reference_updates in build_conversation_updates([REFERENCE_CHAT_ID], bot_phrases):
+            await feed(reference_updates)
+        expected_replies_count = len(session.sent_texts.pop(REFERENCE_CHAT_ID))
+
+        chats_ids = list(range(1, chats + 1))
+        conversation_updates = build_conversation_updates(chats_ids, bot_phrases)
+        updates = [update for step_updates in conversation_updates for update in step_updates]
+        start_time = time.perf_counter()
+        await feed(updates)
+        duration = time.perf_counter() - start_time
+
+        wrong_msg = set(bot_phrases.wrong_msg)
+        broken_chats = [
+            chat_id
+            for chat_id in chats_ids
+            if len(session.sent_texts[chat_id]) != expected_replies_count
+            or wrong_msg.intersection(session.sent_texts[chat_id])
+        ]
+        self.stdout.write(f'conversations: {chats} chats, {len(updates)} updates fed at once')
+        self.stdout.write(f'throughput:    {len(updates) / duration:,.0f} updates/s, {duration:.2f} s')
+        self.stdout.write(f'out of order:  {len(broken_chats)} chats')
+        states_left = [chat_id for chat_id in chats_ids if bot_controller.state_controller.get_state(chat_id)]
+        self.stdout.write(f'states left:   {len(states_left)}')
+
+        dropped_before = metrics.chat_updates_dropped_total.get()
+        await feed(
+            [
+                build_message_update(len(updates) + burst * chat_id + i, chat_id, 'spam')
+                for chat_id in chats_ids
+                for i in range(burst)
+            ],
+        )
+        self.stdout.write(
+            f'burst:         {burst} messages per chat, '
+            + f'{metrics.chat_updates_dropped_total.get() - dropped_before:.0f} dropped '
+            + f'(at most {bot_controller.chat_locks.max_pending_updates} pending per chat)',
+        )
+        self.stdout.write(f'locks left:    {len(bot_controller.chat_locks)}')
+        if broken_chats:
+            raise CommandError(f'Updates of chats {broken_chats[:10]} were processed out of order.')
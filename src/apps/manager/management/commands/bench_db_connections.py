@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from src.apps.manager.models import CustomUser, League, Team
+from src.apps.manager.utils import get_async_query_result
+from src.bot.connections import DatabaseConnectionsMiddleware
+from src.utils.postgresql.metrics import connection_wait_duration
+
+QUERIES_PER_UPDATE = 3
+
+
+class Command(BaseCommand):
+    """Run ORM queries of many chats concurrently through the bot database connections middleware."""
+
+    help = 'Benchmark database queries per second with the configured connection mode.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--chats', type=int, default=50)
+        parser.add_argument('--updates', type=int, default=20, help='Updates processed one by one in every chat.')
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        database = settings.DATABASES['default']
+        pool_options = database.get('OPTIONS', {}).get('pool')
+        if pool_options:
+            self.stdout.write(f'mode: pool {pool_options}')
+        else:
+            self.stdout.write('mode: direct')
+
+        asyncio.run(self._run(chats=options['chats'], updates=options['updates']))
+
+    async def _run(self, chats: int, updates: int) -> None:
+        middleware = DatabaseConnectionsMiddleware()
+
+        async def process_update(event: None, data: dict) -> None:
+            await CustomUser.objects.filter(telegram_chat_id=data['chat_id']).afirst()
+            await Team.objects.filter(rating=4.0).aexists()
+            await get_async_query_result(League.objects.order_by('name')[:5])
+
+        async def process_chat(chat_id: int) -> None:
+            for _ in range(updates):
+                await middleware(process_update, None, {'chat_id': chat_id})
+
+        await process_chat(0)
+        mode = 'pool' if connection.vendor == 'postgresql' and connection.pool else 'direct'
+        waits_count = connection_wait_duration.get_count(mode)
+        waits_sum = connection_wait_duration.get_sum(mode)
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(process_chat(chat_id) for chat_id in range(1, chats + 1)))
+        duration = time.perf_counter() - start_time
+
+        queries_count = chats * updates * QUERIES_PER_UPDATE
+        self.stdout.write(f'chats: {chats}, updates: {chats * updates}, queries: {queries_count}')
+        self.stdout.write(f'throughput: {queries_count / duration:,.0f} queries/s')
+
+        waits_count = connection_wait_duration.get_count(mode) - waits_count
+        if waits_count:
+            mean_wait_ms = (connection_wait_duration.get_sum(mode) - waits_sum) / waits_count * 1000
+            self.stdout.write(f'connections acquired: {waits_count}, mean wait {mean_wait_ms:.2f} ms')
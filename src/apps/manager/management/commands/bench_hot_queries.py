@@ -0,0 +1,212 @@
+import datetime
+import json
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from src.apps.manager.models import CustomUser, Game, League, Team, Tournament
+from src.utils.enums import Country, FIFAVersion
+
+BATCH_SIZE = 5000
+
+COMPLETED_GAMES_SHARE = 0.95
+
+# indexes of the game foreign keys which were replaced by the composite indexes
+BASELINE_INDEXES = (
+    (Game, models.Index(fields=['tournament'], name='bench_game_tournament_idx')),
+    (Game, models.Index(fields=['first_player'], name='bench_game_first_player_idx')),
+    (Game, models.Index(fields=['second_player'], name='bench_game_second_player_idx')),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    """Seeded objects the hot queries are made for."""
+
+    player: CustomUser
+    tournament: Tournament
+    nickname: str
+    now: datetime.datetime
+
+
+UPCOMING_GAMES_COUNT = 20
+
+HOT_QUERIES: Mapping[str, Callable[[Sample], models.QuerySet]] = MappingProxyType(
+    {
+        'team by rating and FIFA version': lambda seeded: Team.objects.filter(
+            rating=4.0,
+            fifa_version=FIFAVersion.FIFA24,
+        ),
+        'team by rating and country': lambda seeded: Team.objects.filter(rating=4.0, league__country=Country.ENGLAND),
+        'nickname in use': lambda seeded: CustomUser.objects.filter(nickname=seeded.nickname).values('pk')[:1],
+        'tournament scheduled games': lambda seeded: seeded.tournament.get_future_games(),
+        'tournament completed games': lambda seeded: seeded.tournament.get_completed_games(),
+        'player scheduled games': lambda seeded: seeded.player.get_future_games(),
+        'player completed games': lambda seeded: seeded.player.get_completed_games(),
+        'upcoming games': lambda seeded: Game.objects.filter(is_completed=False, date__gte=seeded.now).order_by(
+            'date',
+        )[:UPCOMING_GAMES_COUNT],
+    },
+)
+
+
+class Command(BaseCommand):
+    """Compare plans and latencies of the hot queries with and without the lookup indexes."""
+
+    help = 'Report plans and latencies of the hot queries on a seeded dataset, all changes are rolled back.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--tournaments', type=int, default=500)
+        parser.add_argument('--games', type=int, default=200000)
+        parser.add_argument('--teams', type=int, default=20000)
+        parser.add_argument('--repeats', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans are reported for PostgreSQL only.')
+
+        with transaction.atomic():
+            start_time = time.perf_counter()
+            sample = _seed(random.Random(options['seed']), options)
+            self._analyze()
+            self.stdout.write(f'seeded in {time.perf_counter() - start_time:.1f} s')
+
+            self.stdout.write('with lookup indexes:')
+            self._report(sample, options['repeats'])
+
+            _use_baseline_indexes()
+            self.stdout.write('with foreign key indexes only:')
+            self._report(sample, options['repeats'])
+            transaction.set_rollback(True)
+
+    def _report(self, sample: Sample, repeats: int) -> None:
+        for query_name, build_query in HOT_QUERIES.items():
+            query = build_query(sample)
+            durations = []
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                list(query.all())
+                durations.append(time.perf_counter() - start_time)
+
+            self.stdout.write(
+                f'  {query_name}: {statistics.median(durations) * 1000:.3f} ms, {_describe_plan(query)}',
+            )
+
+    @staticmethod
+    def _analyze() -> None:
+        with connection.cursor() as cursor:
+            # deferred foreign key checks of the seeded rows would forbid changing indexes
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            for model in (League, Team, CustomUser, Tournament, Game):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')  # noqa: S608, WPS437
+
+
+def _seed(rng: random.Random, options: dict) -> Sample:
+    """Insert leagues, teams, users, tournaments and games and return objects to query."""
+    prefix = uuid.uuid4().hex[:8]
+    leagues = League.objects.bulk_create(
+        League(name=f'{prefix} league {i}', country=rng.choice(list(Country))) for i in range(options['teams'] // 20)
+    )
+    Team.objects.bulk_create(
+        (
+            Team(
+                name=f'{prefix} team {i}',
+                league=rng.choice(leagues),
+                fifa_version=rng.choice(list(FIFAVersion)),
+                rating=rng.randint(1, 10) / 2,
+                attack=rng.randint(50, 90),
+                midfield=rng.randint(50, 90),
+                defense=rng.randint(50, 90),
+                general=rng.randint(50, 90),
+            )
+            for i in range(options['teams'])
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    players = CustomUser.objects.bulk_create(
+        (
+            CustomUser(username=f'{prefix}_{i}', telegram_username=f'{prefix}_{i}', nickname=f'{prefix} player {i}')
+            for i in range(options['users'])
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    tournaments = Tournament.objects.bulk_create(
+        Tournament(
+            name=f'{prefix} tournament {i}',
+            rules_url='https://example.com',
+            start_date=datetime.date.today(),
+            circles_number=2,
+            fifa_version=FIFAVersion.FIFA24,
+        )
+        for i in range(options['tournaments'])
+    )
+
+    now = timezone.now()
+    Game.objects.bulk_create(
+        (_build_game(rng, now, rng.choice(tournaments), *rng.sample(players, 2)) for _ in range(options['games'])),
+        batch_size=BATCH_SIZE,
+    )
+    return Sample(
+        player=rng.choice(players),
+        tournament=rng.choice(tournaments),
+        nickname=f'{prefix} player {options["users"] // 2}',
+        now=now,
+    )
+
+
+def _use_baseline_indexes() -> None:
+    """Replace the lookup indexes with the indexes the tables had before them."""
+    with connection.schema_editor() as schema_editor:
+        for model in (CustomUser, Game, Team):
+            for index in model._meta.indexes:  # noqa: WPS437
+                schema_editor.remove_index(model, index)
+        for baseline_model, baseline_index in BASELINE_INDEXES:
+            schema_editor.add_index(baseline_model, baseline_index)
+
+
+def _build_game(
+    rng: random.Random,
+    now: datetime.datetime,
+    tournament: Tournament,
+    first_player: CustomUser,
+    second_player: CustomUser,
+) -> Game:
+    is_completed = rng.random() < COMPLETED_GAMES_SHARE
+    days = -rng.randint(1, 365) if is_completed else rng.randint(1, 60)
+    return Game(
+        date=now + datetime.timedelta(days=days),
+        is_completed=is_completed,
+        tournament=tournament,
+        first_player=first_player,
+        second_player=second_player,
+        first_player_score=rng.randint(0, 5) if is_completed else None,
+        second_player_score=rng.randint(0, 5) if is_completed else None,
+    )
+
+
+def _describe_plan(query: models.QuerySet) -> str:
+    """Return total cost and scans of the query plan."""
+    plan = json.loads(query.explain(format='json'))[0]['Plan']
+    return f'cost {plan["Total Cost"]:.0f}, {", ".join(_get_scans(plan))}'
+
+
+def _get_scans(plan: dict) -> list[str]:
+    scans = []
+    if 'Scan' in plan['Node Type']:
+        index_name = plan.get('Index Name')
+        scans.append(f'{plan["Node Type"]} on {index_name or plan.get("Relation Name")}')
+    for subplan in plan.get('Plans', ()):
+        scans.extend(_get_scans(subplan))
+    return scans
@@ -0,0 +1,52 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.utils.log_formatter import FormatterMode, LogFormatter
+
+LIMIT_KEYS_TO = ('call_id', 'input_data', 'result', 'function_full_name')
+
+
+def build_record(items_count: int, text_length: int) -> logging.LogRecord:
+    """Return record of an async_log call with input data and result of the given size."""
+    record = logging.LogRecord('bench', logging.INFO, __file__, 1, 'call process', None, None)
+    record.call_id = 'e0b1c8a4d2f611ef9c3a0242ac120002'
+    record.function_full_name = 'src.bot.processors.team_choosing.TeamChoosingProcessor.process'
+    record.input_data = {
+        'self': 'TeamChoosingProcessor object at 0x7f0a1c2b3d40',
+        'message': 'Message id 1 from user: text...',
+        'teams': [{'id': i, 'name': 'x' * text_length, 'rating': 4.5} for i in range(items_count)],
+    }
+    record.result = ['y' * text_length for _ in range(items_count)]
+    return record
+
+
+class Command(BaseCommand):
+    """Measure records per second of every formatter mode."""
+
+    help = 'Benchmark LogFormatter modes on small and large records.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--records', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        records_count = options['records']
+        records = (
+            ('small record', build_record(items_count=3, text_length=20)),
+            ('large record', build_record(items_count=500, text_length=200)),
+        )
+        for record_name, record in records:
+            for formatter_mode in FormatterMode:
+                formatter = LogFormatter(formatter_mode=formatter_mode, limit_keys_to=LIMIT_KEYS_TO)
+                start_time = time.perf_counter()
+                for _ in range(records_count):
+                    formatted = formatter.format(record)
+                elapsed = time.perf_counter() - start_time
+
+                self.stdout.write(
+                    f'{record_name}, {formatter_mode.value}: {records_count / elapsed:.0f} records/s, '
+                    + f'{len(formatted)} chars',
+                )
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+from django.core.management.base import BaseCommand
+
+from src.bot.rate_limiter import OutboundScheduler
+from src.config import settings
+from src.utils.fake_telegram import FakeBotAPIServer
+
+FAKE_BOT_TOKEN = '123456:fake-token'  # noqa: S105
+
+
+class Command(BaseCommand):
+    """Send bursts of messages to many chats through a local fake Bot API with Telegram rate limits."""
+
+    help = 'Benchmark outbound requests with and without the rate limiter against a local fake Bot API server.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--chats', type=int, default=30)
+        parser.add_argument('--messages', type=int, default=5, help='Messages sent to every chat at once.')
+        parser.add_argument('--edits', type=int, default=3, help='Message edits sent to every chat at once.')
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        cases = (('without rate limiter', None), ('with rate limiter', OutboundScheduler()))
+        for case_name, scheduler in cases:
+            self.stdout.write(f'--- {case_name} ---')
+            asyncio.run(self._run(scheduler, options['chats'], options['messages'], options['edits']))
+
+    async def _run(self, scheduler: OutboundScheduler | None, chats: int, messages: int, edits: int) -> None:
+        server = FakeBotAPIServer(global_limit=int(settings.BOT_GLOBAL_RATE_LIMIT))
+        bot = Bot(FAKE_BOT_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(await server.start())))
+        if scheduler is not None:
+            bot.session.middleware(scheduler)
+
+        requests = []
+        for chat_id in range(1, chats + 1):
+            requests.extend(bot.edit_message_text(f'edit {i}', chat_id=chat_id, message_id=1) for i in range(edits))
+            requests.extend(bot.send_message(chat_id, f'message {i}') for i in range(messages))
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        duration = time.perf_counter() - start_time
+        await bot.session.close()
+        await server.stop()
+
+        flood_errors = len([result for result in results if isinstance(result, TelegramRetryAfter)])
+        other_errors = len([result for result in results if isinstance(result, Exception)]) - flood_errors
+        self.stdout.write(f'requests:        {len(results)} in {duration:.2f} s')
+        self.stdout.write(f'failed with 429: {flood_errors}, other errors: {other_errors}')
+        self.stdout.write(f'server accepted: {dict(server.requests)}, rejected: {dict(server.rejected)}')
+        if scheduler is not None:
+            self.stdout.write(f'coalesced sends: {scheduler.coalesced_count}')
@@ -0,0 +1,69 @@
+import datetime
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from src.apps.manager.models import CustomUser, Tournament
+from src.apps.manager.scheduler import generate_round_robin, schedule_tournament_games
+from src.utils.enums import FIFAVersion
+
+
+class Command(BaseCommand):
+    """Measure round-robin schedule generation and games insertion."""
+
+    help = 'Benchmark round-robin scheduler for tournaments of different sizes.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--participants', type=int, nargs='+', default=[10, 100, 300, 500])
+        parser.add_argument('--circles', type=int, default=2)
+        parser.add_argument(
+            '--insert',
+            action='store_true',
+            help='Also insert games of a temporary tournament, all changes are rolled back.',
+        )
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        circles = options['circles']
+        for participants_count in options['participants']:
+            start_time = time.perf_counter()
+            matchdays = generate_round_robin(range(participants_count), circles=circles)
+            generation_ms = (time.perf_counter() - start_time) * 1000
+            games_count = sum(len(matchday) for matchday in matchdays)
+
+            report = (
+                f'{participants_count} participants, {circles} circles: '
+                + f'{len(matchdays)} matchdays, {games_count} games, generated in {generation_ms:.1f} ms'
+            )
+            if options['insert']:
+                report += f', inserted in {self._measure_insert(participants_count, circles):.1f} ms'
+
+            self.stdout.write(report)
+
+    @staticmethod
+    def _measure_insert(participants_count: int, circles: int) -> float:
+        with transaction.atomic():
+            prefix = uuid.uuid4().hex[:8]
+            participants = CustomUser.objects.bulk_create(
+                CustomUser(username=f'{prefix}_{i}', telegram_username=f'{prefix}_{i}')
+                for i in range(participants_count)
+            )
+            tournament = Tournament.objects.create(
+                name=f'Benchmark {prefix}',
+                rules_url='https://example.com',
+                start_date=datetime.date.today(),
+                circles_number=circles,
+                fifa_version=FIFAVersion.FIFA24,
+            )
+            tournament.participants.set(participants)
+
+            start_time = time.perf_counter()
+            schedule_tournament_games(tournament)
+            insert_ms = (time.perf_counter() - start_time) * 1000
+
+            transaction.set_rollback(True)
+
+        return insert_ms
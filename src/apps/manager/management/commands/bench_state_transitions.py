@@ -0,0 +1,146 @@
+import time
+from functools import partial
+from typing import Any, Callable
+from uuid import UUID, uuid4
+
+from django.core.management.base import BaseCommand
+from pydantic import BaseModel
+
+from src.apps.manager.sampler import TeamSampler
+from src.bot.models import MessageNewData, ProcessName, ProcessPhase, StateModel
+from src.bot.state_backends import InMemoryStateBackend
+from src.bot.state_controller import StateController
+
+# create, add messages, three updates and delete
+TRANSITIONS_PER_CONVERSATION = 6
+
+
+class LegacyMessageNewData(BaseModel):
+    """Pydantic MessageNewData used before states were mutated in place."""
+
+    message_id: int
+    remove_markup: bool = False
+    text: str | None = None
+    remove: bool = False
+    update_on_completion_only: bool = False
+
+
+class LegacyStateModel(BaseModel):
+    """Pydantic StateModel used before states were mutated in place."""
+
+    chat_id: int
+    process_name: ProcessName
+    process_phase: ProcessPhase
+    is_query: bool = False
+    payload: Any | None = None
+    teams_by_filter_ids: list[UUID] | None = None
+    messages_to_update: dict[int, LegacyMessageNewData] = {}
+    is_complete: bool = False
+
+
+class LegacyStateController:
+    """StateController which rebuilds and revalidates the whole state on every update."""
+
+    def __init__(self) -> None:
+        self.state: dict[int, LegacyStateModel] = {}
+
+    def create_state(self, chat_id: int, state: LegacyStateModel) -> None:
+        """Create new state by chat_id."""
+        self.state[chat_id] = state
+
+    def update_state(self, chat_id: int, **changes) -> None:
+        """Update state by chat_id."""
+        current_state = self.state.pop(chat_id)
+        new_state_data = current_state.model_dump()
+        new_state_data.update({key: value for key, value in changes.items() if value})
+        new_state_data['messages_to_update'] = current_state.messages_to_update
+        self.create_state(chat_id, LegacyStateModel(**new_state_data))
+
+    def add_messages_to_update(self, chat_id: int, *data_objects: LegacyMessageNewData) -> None:
+        """Add MessageNewData objects to messages_to_update."""
+        self.state[chat_id].messages_to_update.update({new_data.message_id: new_data for new_data in data_objects})
+
+    def delete_state(self, chat_id: int) -> None:
+        """Delete state by chat_id."""
+        self.state.pop(chat_id)
+
+
+class Command(BaseCommand):
+    """Measure state transitions per second of the current and the legacy pydantic state controller."""
+
+    help = 'Benchmark StateController transitions against the legacy pydantic implementation.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--conversations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        conversations = options['conversations']
+        teams_ids = [uuid4() for _ in range(80)]
+
+        legacy_rate = self._measure(
+            conversations,
+            partial(
+                _run_conversation,
+                LegacyStateController(),
+                LegacyStateModel,
+                LegacyMessageNewData,
+                lambda: {'teams_by_filter_ids': list(teams_ids)},
+            ),
+        )
+        current_rate = self._measure(
+            conversations,
+            partial(
+                _run_conversation,
+                StateController(InMemoryStateBackend()),
+                StateModel,
+                MessageNewData,
+                lambda: {'team_sampler': TeamSampler.create(rating=4.0)},
+            ),
+        )
+
+        self.stdout.write(f'legacy pydantic: {legacy_rate:,.0f} transitions/s')
+        self.stdout.write(f'in-place:        {current_rate:,.0f} transitions/s')
+        self.stdout.write(f'speedup:         x{current_rate / legacy_rate:.1f}')
+
+    @staticmethod
+    def _measure(conversations: int, run_conversation: Callable[[int], None]) -> float:
+        start_time = time.perf_counter()
+        for chat_id in range(conversations):
+            run_conversation(chat_id)
+        return conversations * TRANSITIONS_PER_CONVERSATION / (time.perf_counter() - start_time)
+
+
+def _run_conversation(
+    state_controller,
+    state_model,
+    message_new_data,
+    build_drawn_teams: Callable[[], dict[str, Any]],
+    chat_id: int,
+) -> None:
+    """Replay state transitions of a team choosing conversation."""
+    state_controller.create_state(
+        chat_id,
+        state_model(
+            chat_id=chat_id,
+            is_query=True,
+            process_name=ProcessName.TEAM_CHOOSING,
+            process_phase=ProcessPhase.TC_EXPECT_PLAYERS_COUNT,
+        ),
+    )
+    state_controller.add_messages_to_update(chat_id, message_new_data(message_id=1, remove_markup=True))
+    state_controller.update_state(
+        chat_id,
+        is_query=True,
+        process_phase=ProcessPhase.TC_EXPECT_TEAM_RATING,
+        payload=4,
+    )
+    state_controller.update_state(
+        chat_id,
+        process_phase=ProcessPhase.TC_EXPECT_TEAMS_CONFIRM,
+        payload=None,
+        **build_drawn_teams(),
+    )
+    state_controller.update_state(chat_id, is_complete=True)
+    state_controller.delete_state(chat_id)
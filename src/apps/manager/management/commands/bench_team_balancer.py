@@ -0,0 +1,81 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from src.apps.manager.balancer import TeamBalancer, TeamFilter, get_stats_spread
+from src.apps.manager.catalogue import TeamRecord
+from src.utils.enums import Country, FIFAVersion
+
+LEAGUES_COUNT = 50
+
+
+class Command(BaseCommand):
+    """Measure balanced teams picking on a generated catalogue."""
+
+    help = 'Benchmark balanced team assignment against random draws from the exact rating bucket.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--teams', type=int, default=5000)
+        parser.add_argument('--players', type=int, default=6)
+        parser.add_argument('--draws', type=int, default=200)
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        teams = _generate_teams(options['teams'])
+        players = options['players']
+        draws = options['draws']
+        balancer = TeamBalancer()
+        balancer.pick_teams(teams, players, TeamFilter())
+
+        bucket = [team for team in teams if team.rating == 4.0]
+        random_spreads = [get_stats_spread(tuple(random.sample(bucket, players))) for _ in range(draws)]
+        self.stdout.write(f'random from 4.0 bucket: median spread {statistics.median(random_spreads)}')
+
+        cases = (
+            ('rating 4.0', TeamFilter(min_rating=4.0, max_rating=4.0)),
+            ('rating 3.5-4.5', TeamFilter(min_rating=3.5, max_rating=4.5)),
+            ('rating 3.5-4.5, FIFA 24', TeamFilter(min_rating=3.5, max_rating=4.5, fifa_version=FIFAVersion.FIFA24)),
+            ('England and Spain', TeamFilter(countries=(Country.ENGLAND, Country.SPAIN))),
+            ('all teams', TeamFilter()),
+        )
+        for case_name, team_filter in cases:
+            spreads = []
+            start_time = time.perf_counter()
+            for seed in range(draws):
+                spreads.append(balancer.pick_teams(teams, players, team_filter, seed=seed).spread)
+            per_draw_ms = (time.perf_counter() - start_time) / draws * 1000
+
+            within_tolerance = len([spread for spread in spreads if spread <= balancer.tolerance])
+            self.stdout.write(
+                f'{case_name}: {per_draw_ms:.2f} ms per draw, median spread {statistics.median(spreads)}, '
+                + f'{within_tolerance}/{draws} within tolerance {balancer.tolerance}',
+            )
+
+
+def _generate_teams(teams_count: int) -> tuple[TeamRecord, ...]:
+    """Return teams with stats spread around the general stat and the rating derived from it."""
+    leagues = [(uuid.uuid4(), f'League {i}', random.choice(list(Country))) for i in range(LEAGUES_COUNT)]
+    teams = []
+    for i in range(teams_count):
+        league_id, league_name, country = random.choice(leagues)
+        general = random.randint(55, 90)
+        teams.append(
+            TeamRecord(
+                id=uuid.uuid4(),
+                name=f'Team {i}',
+                fifa_version=random.choice(list(FIFAVersion)),
+                rating=min(5.0, max(0.5, round((general - 50) / 4) / 2)),
+                attack=general + random.randint(-8, 8),
+                midfield=general + random.randint(-8, 8),
+                defense=general + random.randint(-8, 8),
+                general=general,
+                league_id=league_id,
+                league_name=league_name,
+                country=country,
+            ),
+        )
+    return tuple(teams)
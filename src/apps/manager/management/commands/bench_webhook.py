@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import ujson
+from django.core.management.base import BaseCommand, CommandError
+
+from src.config import settings
+from src.language.manager import get_bot_phrases
+from src.utils.enums import BotUpdatesMode
+from src.utils.fake_telegram import build_conversation_updates, post_to_asgi, use_fake_session
+
+
+class Command(BaseCommand):
+    """Replay team choosing conversations of many chats into the webhook endpoint."""
+
+    help = 'Benchmark webhook ingestion with a local fake Telegram Bot API.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('--chats', type=int, default=1000)
+        parser.add_argument('--latency-ms', type=float, default=0, help='Emulated Bot API round-trip.')
+
+    def handle(self, *args, **options):
+        """Run benchmark."""
+        if settings.BOT_UPDATES_MODE != BotUpdatesMode.WEBHOOK:
+            raise CommandError('Set BOT_UPDATES_MODE=webhook to expose the webhook endpoint.')
+
+        asyncio.run(self._run(chats=options['chats'], latency=options['latency_ms'] / 1000))
+
+    async def _run(self, chats: int, latency: float) -> None:
+        from src.api.bot.webhook import feed_tasks  # noqa: WPS433
+        from src.bot.bot_controller import get_bot_controller  # noqa: WPS433
+        from src.config.asgi import application  # noqa: WPS433
+
+        session = use_fake_session(latency)
+
+        path = f'/{settings.BOT_WEBHOOK_PATH}'
+        headers = {'X-Telegram-Bot-Api-Secret-Token': settings.BOT_WEBHOOK_SECRET or ''}
+
+        ingestion_time = 0
+        processing_time = 0
+        updates_count = 0
+        for updates in build_conversation_updates(range(1, chats + 1), get_bot_phrases(None)):
+            start_time = time.perf_counter()
+            statuses = await asyncio.gather(
+                *(post_to_asgi(application, path, ujson.dumps(update).encode(), headers) for update in updates),
+            )
+            ingestion_time += time.perf_counter() - start_time
+            await asyncio.gather(*feed_tasks)
+            await get_bot_controller().wait_for_finalization()
+            processing_time += time.perf_counter() - start_time
+            updates_count += len(updates)
+
+            failed = len([status for status in statuses if status != 200])
+            if failed:
+                raise CommandError(f'{failed} webhook requests failed')
+
+        self.stdout.write(f'updates:    {updates_count}')
+        self.stdout.write(f'ingestion:  {updates_count / ingestion_time:,.0f} updates/s')
+        self.stdout.write(f'end-to-end: {updates_count / processing_time:,.0f} updates/s')
+        self.stdout.write(f'Bot API requests: {dict(session.requests)}')
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.apps.manager.importer import TEAMS_BATCH_SIZE, CatalogueImportError, import_catalogue
+from src.utils.enums import FIFAVersion
+
+
+class Command(BaseCommand):
+    """Load leagues and teams of a FIFA version from JSON files."""
+
+    help = 'Insert or update leagues and teams from JSON files in one transaction.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('teams', type=Path, help='JSON array of teams with league names.')
+        parser.add_argument('--leagues', type=Path, help='JSON array of leagues with countries.')
+        parser.add_argument('--fifa-version', type=int, choices=[version.value for version in FIFAVersion])
+        parser.add_argument('--batch-size', type=int, default=TEAMS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """Import the files."""
+        fifa_version = options['fifa_version']
+        try:
+            report = import_catalogue(
+                teams_path=options['teams'],
+                leagues_path=options['leagues'],
+                fifa_version=FIFAVersion(fifa_version) if fifa_version is not None else None,
+                batch_size=options['batch_size'],
+            )
+        except (CatalogueImportError, ValueError, KeyError) as e:
+            raise CommandError(f'Import is rolled back: {e!r}')
+
+        self.stdout.write(f'leagues: {report.leagues_count}')
+        self.stdout.write(f'teams:   {report.teams_count}, new {report.created_teams_count}')
+        for phase, duration in report.durations.items():
+            self.stdout.write(f'{phase}: {duration * 1000:.0f} ms')
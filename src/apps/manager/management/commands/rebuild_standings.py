@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.apps.manager.models import Tournament
+from src.apps.manager.standings import rebuild_standings
+
+
+class Command(BaseCommand):
+    """Recalculate tournaments standings from completed games."""
+
+    help = 'Rebuild standings of the tournaments from scratch.'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument('tournament_ids', nargs='*', help='Tournaments to rebuild, all tournaments by default.')
+
+    def handle(self, *args, **options):
+        """Rebuild standings."""
+        tournaments = Tournament.objects.all()
+        if options['tournament_ids']:
+            tournaments = tournaments.filter(id__in=options['tournament_ids'])
+
+        for tournament in tournaments:
+            start_time = time.perf_counter()
+            standings = rebuild_standings(tournament)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self.stdout.write(f'{tournament}: {len(standings)} standings rebuilt in {elapsed_ms:.1f} ms')
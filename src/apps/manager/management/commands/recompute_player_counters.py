@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.apps.manager.results import recompute_player_counters
+
+
+class Command(BaseCommand):
+    """Recalculate players victories, draws and losses from completed games."""
+
+    help = 'Rebuild victories, draws and losses of all players from scratch.'
+
+    def handle(self, *args, **options):
+        """Recompute counters."""
+        start_time = time.perf_counter()
+        players_count = recompute_player_counters()
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stdout.write(f'Counters of {players_count} players with games recomputed in {elapsed_ms:.1f} ms')
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manager", "0003_load_fifa24_teams"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="game",
+            name="first_player_team",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games_as_first_team",
+                to="manager.team",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="second_player_team",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games_as_second_team",
+                to="manager.team",
+            ),
+        ),
+    ]
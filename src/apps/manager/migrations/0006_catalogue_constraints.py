@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:56
+
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    """Merge leagues with the same name and then teams with the same name, league and FIFA version."""
+    League = apps.get_model("manager", "League")
+    Team = apps.get_model("manager", "Team")
+    Game = apps.get_model("manager", "Game")
+
+    kept_league_ids = {}
+    for league_id, name in League.objects.order_by("id").values_list("id", "name"):
+        kept_league_id = kept_league_ids.setdefault(name, league_id)
+        if kept_league_id != league_id:
+            Team.objects.filter(league_id=league_id).update(league_id=kept_league_id)
+            League.objects.filter(pk=league_id).delete()
+
+    kept_team_ids = {}
+    for team_id, *team_key in Team.objects.order_by("id").values_list("id", "name", "league_id", "fifa_version"):
+        kept_team_id = kept_team_ids.setdefault(tuple(team_key), team_id)
+        if kept_team_id != team_id:
+            Game.objects.filter(first_player_team_id=team_id).update(first_player_team_id=kept_team_id)
+            Game.objects.filter(second_player_team_id=team_id).update(second_player_team_id=kept_team_id)
+            Team.objects.filter(pk=team_id).delete()
+
+    # deferred foreign key checks of the updated rows must not be pending when the tables are altered
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manager", "0005_standing"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="team",
+            name="country",
+        ),
+        migrations.RunPython(merge_duplicates, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="league",
+            constraint=models.UniqueConstraint(fields=("name",), name="unique_league_name"),
+        ),
+        migrations.AddConstraint(
+            model_name="team",
+            constraint=models.UniqueConstraint(
+                fields=("name", "league", "fifa_version"), name="unique_team_league_fifa_version"
+            ),
+        ),
+    ]
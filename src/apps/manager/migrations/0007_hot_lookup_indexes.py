@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manager", "0006_catalogue_constraints"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                condition=models.Q(("nickname__isnull", False)), fields=["nickname"], name="user_nickname_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["tournament", "is_completed"], name="game_tournament_done_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["first_player", "is_completed"], name="game_first_player_done_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["second_player", "is_completed"], name="game_second_player_done_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                condition=models.Q(("is_completed", False)), fields=["date"], name="game_scheduled_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="team",
+            index=models.Index(fields=["rating", "fifa_version"], name="team_rating_fifa_version_idx"),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="first_player",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games_as_first",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="second_player",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games_as_second",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="tournament",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games",
+                to="manager.tournament",
+            ),
+        ),
+    ]
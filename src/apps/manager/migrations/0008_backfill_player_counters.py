@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from src.apps.manager.results import recompute_player_counters
+
+
+def backfill_player_counters(apps, _):
+    # counters are updated by every game change since now, so they start from the games completed before
+    recompute_player_counters()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('manager', '0007_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_player_counters, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from src.apps.manager.models import Tournament
+from src.apps.manager.standings import rebuild_standings
+
+
+def backfill_standings(apps, _):
+    # standings of all current participants are created and filled with the games completed before
+    for tournament in Tournament.objects.only('pk'):
+        rebuild_standings(tournament)
+
+
+def remove_standings(apps, _):
+    Standing = apps.get_model('manager', 'Standing')
+    Standing.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('manager', '0008_backfill_player_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_standings, reverse_code=remove_standings),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manager", "0009_backfill_standings"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                condition=models.Q(("telegram_user_id__isnull", False)),
+                fields=["telegram_user_id"],
+                name="user_telegram_user_id_idx",
+            ),
+        ),
+    ]
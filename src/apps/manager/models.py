@@ -1,7 +1,7 @@
 import uuid
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 
 from src.utils.enums import Country, FIFAVersion
 
@@ -23,20 +23,35 @@ class CustomUser(AbstractUser):
     draws = models.PositiveIntegerField(default=0)
     fifa_versions = models.JSONField(default=list)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # registration checks that a nickname is free, users without a nickname are not indexed
+            models.Index(
+                fields=['nickname'],
+                name='user_nickname_idx',
+                condition=models.Q(nickname__isnull=False),
+            ),
+            # users are resolved by the Telegram user id on every message
+            models.Index(
+                fields=['telegram_user_id'],
+                name='user_telegram_user_id_idx',
+                condition=models.Q(telegram_user_id__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         return f'{self.username} @{self.telegram_username}'
 
     def get_future_games(self) -> list['Game']:
         """Return scheduled games."""
-        result = [self.games_as_first.filter(is_completed=False)]
-        result.extend(self.games_as_second.filter(is_completed=False))
-        return result
+        return self._get_games().filter(is_completed=False)
 
     def get_completed_games(self) -> list['Game']:
         """Return completed games."""
-        result = [self.games_as_first.filter(is_completed=True)]
-        result.extend(self.games_as_second.filter(is_completed=True))
-        return result
+        return self._get_games().filter(is_completed=True)
+
+    def _get_games(self) -> models.QuerySet:
+        return Game.objects.filter(models.Q(first_player=self) | models.Q(second_player=self))
 
 
 class Tournament(models.Model):
@@ -65,6 +80,12 @@ class Tournament(models.Model):
         """Return completed games."""
         return self.games.filter(is_completed=True)
 
+    def get_standings(self) -> list['Standing']:
+        """Return participants standings from the best to the worst."""
+        standings = self.standings.select_related('player')
+        standings = standings.alias(goal_difference=models.F('goals_for') - models.F('goals_against'))
+        return standings.order_by('-points', '-goal_difference', '-goals_for', 'player__nickname')
+
 
 class Game(models.Model):
     """Game model."""
@@ -73,20 +94,62 @@ class Game(models.Model):
     date = models.DateTimeField()
     is_completed = models.BooleanField(default=False)
 
-    tournament = models.ForeignKey(to='Tournament', related_name='games', on_delete=models.CASCADE)
+    # foreign keys are the first columns of the composite indexes, so they have no own indexes
+    tournament = models.ForeignKey(to='Tournament', related_name='games', on_delete=models.CASCADE, db_index=False)
 
     first_player_score = models.PositiveIntegerField(blank=True, null=True)
     second_player_score = models.PositiveIntegerField(blank=True, null=True)
 
-    first_player = models.ForeignKey(to='CustomUser', on_delete=models.CASCADE, related_name='games_as_first')
-    second_player = models.ForeignKey(to='CustomUser', on_delete=models.CASCADE, related_name='games_as_second')
-
-    first_player_team = models.ForeignKey(to='Team', on_delete=models.CASCADE, related_name='games_as_first_team')
-    second_player_team = models.ForeignKey(to='Team', on_delete=models.CASCADE, related_name='games_as_second_team')
+    first_player = models.ForeignKey(
+        to='CustomUser',
+        on_delete=models.CASCADE,
+        related_name='games_as_first',
+        db_index=False,
+    )
+    second_player = models.ForeignKey(
+        to='CustomUser',
+        on_delete=models.CASCADE,
+        related_name='games_as_second',
+        db_index=False,
+    )
+
+    first_player_team = models.ForeignKey(
+        to='Team',
+        on_delete=models.CASCADE,
+        related_name='games_as_first_team',
+        blank=True,
+        null=True,
+    )
+    second_player_team = models.ForeignKey(
+        to='Team',
+        on_delete=models.CASCADE,
+        related_name='games_as_second_team',
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tournament', 'is_completed'], name='game_tournament_done_idx'),
+            models.Index(fields=['first_player', 'is_completed'], name='game_first_player_done_idx'),
+            models.Index(fields=['second_player', 'is_completed'], name='game_second_player_done_idx'),
+            # scheduled games are a small part of all games
+            models.Index(fields=['date'], name='game_scheduled_date_idx', condition=models.Q(is_completed=False)),
+        ]
 
     def __str__(self):
         return f'{self.first_player} vs {self.second_player} on {self.date}'
 
+    def save(self, *args, **kwargs):
+        """Save the game in a transaction, so its stored result stays locked until the standings are updated."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete the game in a transaction, so its stored result stays locked until the standings are updated."""
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def get_participants(self) -> list[CustomUser]:
         """Return participants."""
         return [self.first_player, self.second_player]
@@ -103,6 +166,35 @@ class Game(models.Model):
         return player == self.first_player
 
 
+class Standing(models.Model):
+    """Materialized results of a tournament participant, updated by completed games."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tournament = models.ForeignKey(to='Tournament', related_name='standings', on_delete=models.CASCADE)
+    player = models.ForeignKey(to='CustomUser', related_name='standings', on_delete=models.CASCADE)
+
+    played = models.PositiveIntegerField(default=0)
+    victories = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    goals_for = models.PositiveIntegerField(default=0)
+    goals_against = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tournament', 'player'], name='unique_tournament_player_standing'),
+        ]
+
+    def __str__(self):
+        return f'{self.player} in {self.tournament}: {self.points}'
+
+    @property
+    def goal_difference(self) -> int:
+        """Return difference between scored and conceded goals."""
+        return self.goals_for - self.goals_against
+
+
 class Team(models.Model):
     """Team model."""
 
@@ -117,6 +209,15 @@ class Team(models.Model):
     defense = models.PositiveIntegerField()
     general = models.PositiveIntegerField()
 
+    class Meta:
+        constraints = [
+            # men's and women's teams of a club share the name, so the league is a part of the key
+            models.UniqueConstraint(fields=['name', 'league', 'fifa_version'], name='unique_team_league_fifa_version'),
+        ]
+        indexes = [
+            models.Index(fields=['rating', 'fifa_version'], name='team_rating_fifa_version_idx'),
+        ]
+
     @property
     def country(self) -> Country | None:
         """Take the country from the team league and return."""
@@ -134,3 +235,8 @@ class League(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=128)
     country = models.IntegerField(choices=Country.choices, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_league_name'),
+        ]
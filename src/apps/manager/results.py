@@ -0,0 +1,57 @@
+from django.db import models, transaction
+
+from src.apps.manager.models import CustomUser, Game
+from src.apps.manager.standings import GameResult, aggregate_game_results
+
+PLAYER_COUNTERS = ('victories', 'draws', 'losses')
+
+COUNTERS_BATCH_SIZE = 1000
+
+
+def record_game_result(game_id, first_player_score: int, second_player_score: int) -> Game:
+    """
+    Complete the game with the score in one transaction.
+
+    The game row is locked while the players counters and the tournament standings are updated by the signals,
+    so concurrent records of the same game are applied one after another.
+    """
+    with transaction.atomic():
+        game = Game.objects.select_for_update().get(pk=game_id)
+        game.first_player_score = first_player_score
+        game.second_player_score = second_player_score
+        game.is_completed = True
+        game.save(update_fields=['first_player_score', 'second_player_score', 'is_completed'])
+
+    return game
+
+
+def update_player_counters(previous_result: GameResult | None, current_result: GameResult | None) -> None:
+    """Replace the previous game result with the current one in the players victories, draws and losses."""
+    if previous_result == current_result:
+        return
+
+    with transaction.atomic():
+        if previous_result is not None:
+            _apply_game_result(previous_result, sign=-1)
+        if current_result is not None:
+            _apply_game_result(current_result, sign=1)
+
+
+def recompute_player_counters() -> int:
+    """Recalculate counters of all players from completed games with a single aggregate query, return players count."""
+    with transaction.atomic():
+        players = []
+        for player_id, _, victories, draws, losses, *_ in aggregate_game_results():
+            players.append(CustomUser(id=player_id, victories=victories, draws=draws, losses=losses))
+
+        CustomUser.objects.update(victories=0, draws=0, losses=0)
+        CustomUser.objects.bulk_update(players, PLAYER_COUNTERS, batch_size=COUNTERS_BATCH_SIZE)
+
+    return len(players)
+
+
+def _apply_game_result(result: GameResult, sign: int) -> None:
+    for player_id, deltas in result.get_standings_deltas().items():
+        CustomUser.objects.filter(pk=player_id).update(
+            **{counter: models.F(counter) + sign * deltas[counter] for counter in PLAYER_COUNTERS if deltas[counter]},
+        )
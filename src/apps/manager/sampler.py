@@ -0,0 +1,130 @@
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.apps.manager.balancer import TeamFilter, get_team_balancer
+from src.apps.manager.catalogue import TeamRecord, get_team_catalogue
+from src.config import settings
+from src.utils.enums import Country
+
+FEISTEL_ROUNDS = 4
+
+SEED_BITS = 32
+
+UINT64_MASK = (1 << 64) - 1
+
+
+@dataclass(slots=True)
+class TeamSampler:
+    """
+    Reproducible draw of teams without repetition from a catalogue bucket.
+
+    Instead of a shuffled list of the bucket teams only the seed and the count of drawn teams are kept,
+    the next team is the bucket team at the seeded permutation of the cursor, so every draw takes O(1) time
+    and the same seed replays the same teams while the catalogue is unchanged.
+    The first teams may be picked by the balancer with the same seed, the next teams skip them.
+    """
+
+    rating: float
+    country: Country | None
+    seed: int
+    cursor: int
+    balanced_count: int
+
+    @classmethod
+    def create(cls, rating: float, country: Country | None = None) -> 'TeamSampler':
+        """Create sampler with a random seed."""
+        return cls(rating=rating, country=country, seed=random.getrandbits(SEED_BITS), cursor=0, balanced_count=0)
+
+    @classmethod
+    def load(cls, raw_sampler: list) -> 'TeamSampler':
+        """Create sampler from the list packed with dump."""
+        rating, country, seed, cursor = raw_sampler[:4]
+        return cls(
+            rating=rating,
+            country=Country(country) if country is not None else None,
+            seed=seed,
+            cursor=cursor,
+            # samplers dumped before balanced draws have no balanced teams count
+            balanced_count=raw_sampler[4] if len(raw_sampler) > 4 else 0,
+        )
+
+    def dump(self) -> list:
+        """Pack sampler to a compact list."""
+        country = self.country.value if self.country is not None else None
+        return [self.rating, country, self.seed, self.cursor, self.balanced_count]
+
+    async def aget_teams_count(self) -> int:
+        """Return count of the bucket teams."""
+        return len(await get_team_catalogue().aget_teams(rating=self.rating, country=self.country))
+
+    async def adraw_teams(self, teams_count: int) -> list[TeamRecord | None]:
+        """Return the first teams of the draw, teams with close stats if balanced draws are enabled."""
+        if settings.TEAM_DRAW_BALANCED and not self.cursor:
+            balanced_teams = await self._apick_balanced_teams(teams_count)
+            if balanced_teams:
+                self.balanced_count = teams_count
+                return list(balanced_teams)
+
+        return [await self.anext_team() for _ in range(teams_count)]
+
+    async def anext_team(self) -> TeamRecord | None:
+        """Return the next team of the draw, None if all teams are drawn."""
+        teams = await get_team_catalogue().aget_teams(rating=self.rating, country=self.country)
+        balanced_team_ids = {team.id for team in await self._apick_balanced_teams(self.balanced_count)}
+        while self.cursor < len(teams):
+            team = teams[permute_index(self.cursor, len(teams), self.seed)]
+            self.cursor += 1
+            if team.id not in balanced_team_ids:
+                return team
+
+        return None
+
+    async def _apick_balanced_teams(self, teams_count: int) -> tuple[TeamRecord, ...]:
+        """Return teams with close stats from the bucket, the same for the same seed."""
+        if not teams_count:
+            return ()
+
+        team_filter = TeamFilter(
+            min_rating=self.rating,
+            max_rating=self.rating,
+            countries=(self.country,) if self.country is not None else (),
+        )
+        balanced_teams = await get_team_balancer().apick_teams(teams_count, team_filter, seed=self.seed)
+        return balanced_teams.teams if balanced_teams is not None else ()
+
+
+def permute_index(index: int, size: int, seed: int) -> int:
+    """
+    Return position of the index in the permutation of range(size) defined by the seed.
+
+    Feistel network is a bijection of the smallest power of four covering the size,
+    indexes out of range are mapped again until they fall into it, which takes less than four rounds on average.
+    """
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    half_mask = (1 << half_bits) - 1
+    round_keys = _get_round_keys(seed)
+
+    permuted = index
+    while True:
+        left, right = permuted >> half_bits, permuted & half_mask
+        for round_key in round_keys:
+            left, right = right, left ^ (_mix(right ^ round_key) & half_mask)
+
+        permuted = (left << half_bits) | right
+        if permuted < size:
+            return permuted
+
+
+@lru_cache(maxsize=1024)
+def _get_round_keys(seed: int) -> tuple[int, ...]:
+    seeded_random = random.Random(seed)
+    return tuple(seeded_random.getrandbits(64) for _ in range(FEISTEL_ROUNDS))
+
+
+def _mix(mixed_value: int) -> int:
+    """Finalizer of splitmix64, spreads every input bit over the output."""
+    mixed_value = (mixed_value + 0x9E3779B97F4A7C15) & UINT64_MASK
+    mixed_value = ((mixed_value ^ (mixed_value >> 30)) * 0xBF58476D1CE4E5B9) & UINT64_MASK
+    mixed_value = ((mixed_value ^ (mixed_value >> 27)) * 0x94D049BB133111EB) & UINT64_MASK
+    return mixed_value ^ (mixed_value >> 31)
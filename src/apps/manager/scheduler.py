@@ -0,0 +1,91 @@
+import datetime
+import random
+from collections import deque
+from typing import Sequence, TypeVar
+
+from django.db import transaction
+
+from src.apps.manager.models import Game, Tournament
+
+Participant = TypeVar('Participant')
+
+GAMES_BATCH_SIZE = 1000
+
+
+def generate_round_robin(participants: Sequence[Participant], circles: int = 1) -> list[list[tuple]]:
+    """
+    Generate matchdays of a round-robin tournament with the circle method.
+
+    Every matchday is a list of (home, away) pairs and nobody plays twice in one matchday.
+    Each circle contains every pair once, home and away are swapped in every second circle,
+    so the home/away difference of a participant is at most 1 per circle and 0 after every two circles.
+    """
+    players: list[Participant | None] = list(participants)
+    if len(players) % 2:
+        # the fixed position is a bye, so all real participants rotate and get balanced home/away games
+        players.insert(0, None)
+
+    players_count = len(players)
+    fixed = players[0]
+    rotating = deque(players[1:])
+
+    first_circle = []
+    for matchday_number in range(players_count - 1):
+        line = [fixed, *rotating]
+        matchday = []
+        for i in range(players_count // 2):
+            home, away = line[i], line[players_count - 1 - i]
+            if _is_swapped(matchday_number, i):
+                home, away = away, home
+            if home is not None and away is not None:
+                matchday.append((home, away))
+
+        first_circle.append(matchday)
+        rotating.rotate(1)
+
+    mirrored_circle = [[(away, home) for home, away in matchday] for matchday in first_circle]
+    circles_matchdays = (first_circle, mirrored_circle)
+    return [matchday for circle in range(circles) for matchday in circles_matchdays[circle % 2]]
+
+
+def schedule_tournament_games(tournament: Tournament, days_between_matchdays: int = 1) -> list[Game]:
+    """
+    Create games of all tournament circles, one matchday every days_between_matchdays from the start date.
+
+    Participants are shuffled, so every generated schedule is different.
+    """
+    if tournament.games.exists():
+        raise ValueError(f'Tournament "{tournament}" already has games.')
+
+    participants = list(tournament.participants.all())
+    random.shuffle(participants)
+
+    games = []
+    matchdays = generate_round_robin(participants, circles=tournament.circles_number)
+    for matchday_number, matchday in enumerate(matchdays):
+        matchday_date = tournament.start_date + datetime.timedelta(days=matchday_number * days_between_matchdays)
+        game_date = datetime.datetime.combine(matchday_date, datetime.time(), tzinfo=datetime.UTC)
+        games.extend(
+            Game(tournament=tournament, date=game_date, first_player=home, second_player=away)
+            for home, away in matchday
+        )
+
+    with transaction.atomic():
+        Game.objects.bulk_create(games, batch_size=GAMES_BATCH_SIZE)
+        if games and tournament.end_date is None:
+            tournament.end_date = games[-1].date.date()
+            tournament.save(update_fields=['end_date'])
+
+    return games
+
+
+def _is_swapped(matchday_number: int, pair_number: int) -> bool:
+    """
+    Return True if the second participant of the pair plays at home.
+
+    The fixed participant changes sides every matchday, the rotating ones move through pair positions,
+    so alternating sides of the positions balances them too.
+    """
+    if pair_number:
+        return bool(pair_number % 2)
+    return bool(matchday_number % 2)
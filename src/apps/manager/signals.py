@@ -0,0 +1,84 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from src.apps.manager.catalogue import get_team_catalogue
+from src.apps.manager.models import CustomUser, Game, League, Team, Tournament
+from src.apps.manager.results import update_player_counters
+from src.apps.manager.standings import GameResult, create_empty_standings, get_stored_game_result, update_standings
+from src.apps.manager.user_cache import get_user_cache
+from src.utils.postgresql.metrics import observe_query
+
+# instance attribute with the game result as it was stored before saving or deleting the game
+STORED_RESULT_ATTRIBUTE = '_stored_game_result'
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def invalidate_team_catalogue(**kwargs) -> None:
+    """Drop the in-memory team catalogue after any Team or League change."""
+    get_team_catalogue().invalidate()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(instance: CustomUser, **kwargs) -> None:
+    """Drop the cached user, the whole cache is dropped if the user is not linked to Telegram."""
+    get_user_cache().invalidate(instance.telegram_user_id)
+
+
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+@receiver(m2m_changed, sender=Tournament.participants.through)
+def invalidate_user_cache(**kwargs) -> None:
+    """Drop all cached users after tournaments change, as their active tournaments flags may be outdated."""
+    get_user_cache().invalidate()
+
+
+@receiver(pre_save, sender=Game)
+@receiver(pre_delete, sender=Game)
+def remember_stored_game_result(instance: Game, **kwargs) -> None:
+    """
+    Remember the stored game result on the instance, the instance being saved or deleted may have outdated values.
+
+    The game is saved and deleted in a transaction, the stored row stays locked until its result is replaced.
+    """
+    setattr(instance, STORED_RESULT_ATTRIBUTE, get_stored_game_result(instance))
+
+
+@receiver(post_save, sender=Game)
+def update_results_on_game_save(instance: Game, **kwargs) -> None:
+    """Update the tournament standings and the players counters by the changed game result."""
+    previous_result = vars(instance).pop(STORED_RESULT_ATTRIBUTE, None)
+    current_result = GameResult.from_game(instance)
+    update_standings(previous_result, current_result)
+    update_player_counters(previous_result, current_result)
+
+
+@receiver(post_delete, sender=Game)
+def update_results_on_game_delete(instance: Game, **kwargs) -> None:
+    """Remove result of the deleted game from the tournament standings and the players counters."""
+    deleted_result = vars(instance).pop(STORED_RESULT_ATTRIBUTE, None)
+    update_standings(deleted_result, None)
+    update_player_counters(deleted_result, None)
+
+
+@receiver(m2m_changed, sender=Tournament.participants.through)
+def create_participants_standings(instance, action: str, reverse: bool, pk_set: set | None, **kwargs) -> None:
+    """Create empty standings of the new tournament participants."""
+    if action != 'post_add' or not pk_set:
+        return
+
+    if reverse:
+        create_empty_standings(pk_set, [instance.pk])
+    else:
+        create_empty_standings([instance.pk], pk_set)
+
+
+@receiver(connection_created)
+def instrument_db_connection(connection, **kwargs) -> None:
+    """Time all queries of the new database connection."""
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
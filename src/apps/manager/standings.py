@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from typing import Iterable
+from uuid import UUID
+
+from django.db import connection, models, transaction
+
+from src.apps.manager.models import Game, Standing, Tournament
+
+POINTS_FOR_VICTORY = 3
+POINTS_FOR_DRAW = 1
+
+GAME_RESULTS_AGGREGATE_SQL = '''
+    SELECT
+        player_id,
+        COUNT(*),
+        SUM(CASE WHEN goals_for > goals_against THEN 1 ELSE 0 END),
+        SUM(CASE WHEN goals_for = goals_against THEN 1 ELSE 0 END),
+        SUM(CASE WHEN goals_for < goals_against THEN 1 ELSE 0 END),
+        SUM(goals_for),
+        SUM(goals_against)
+    FROM (
+        SELECT first_player_id AS player_id, first_player_score AS goals_for, second_player_score AS goals_against
+        FROM {table} WHERE {condition}
+        UNION ALL
+        SELECT second_player_id, second_player_score, first_player_score
+        FROM {table} WHERE {condition}
+    ) AS results
+    GROUP BY player_id
+'''
+
+COMPLETED_GAMES_CONDITION = 'is_completed = %s AND first_player_score IS NOT NULL AND second_player_score IS NOT NULL'
+
+
+@dataclass(frozen=True, slots=True)
+class GameResult:
+    """Result of a completed game which is counted in the tournament standings."""
+
+    tournament_id: UUID
+    first_player_id: UUID
+    second_player_id: UUID
+    first_player_score: int
+    second_player_score: int
+
+    @classmethod
+    def from_game(cls, game: Game | None) -> 'GameResult | None':
+        """Return result of the game or None if the game is not counted in the standings."""
+        if game is None or not game.is_completed:
+            return None
+        if game.first_player_score is None or game.second_player_score is None:
+            return None
+
+        return cls(
+            tournament_id=game.tournament_id,
+            first_player_id=game.first_player_id,
+            second_player_id=game.second_player_id,
+            first_player_score=game.first_player_score,
+            second_player_score=game.second_player_score,
+        )
+
+    def get_standings_deltas(self) -> dict[UUID, dict[str, int]]:
+        """Return changes of the standings fields for both players."""
+        return {
+            self.first_player_id: _get_player_deltas(self.first_player_score, self.second_player_score),
+            self.second_player_id: _get_player_deltas(self.second_player_score, self.first_player_score),
+        }
+
+
+def get_stored_game_result(game: Game) -> GameResult | None:
+    """Return result of the game as it is stored in the database, the game row is locked until the transaction ends."""
+    if game.pk is None or game._state.adding:  # noqa: WPS437
+        return None
+
+    stored_game = Game.objects.filter(pk=game.pk).only(
+        'is_completed',
+        'tournament_id',
+        'first_player_id',
+        'second_player_id',
+        'first_player_score',
+        'second_player_score',
+    )
+    return GameResult.from_game(stored_game.select_for_update().first())
+
+
+def update_standings(previous_result: GameResult | None, current_result: GameResult | None) -> None:
+    """Replace the previous game result with the current one in the standings."""
+    if previous_result == current_result:
+        return
+
+    with transaction.atomic():
+        if previous_result is not None:
+            _apply_game_result(previous_result, sign=-1)
+        if current_result is not None:
+            _apply_game_result(current_result, sign=1)
+
+
+def create_empty_standings(tournament_ids: Iterable[UUID], player_ids: Iterable[UUID]) -> None:
+    """Create missing standings of the players in the tournaments."""
+    Standing.objects.bulk_create(
+        [
+            Standing(tournament_id=tournament_id, player_id=player_id)
+            for tournament_id in tournament_ids
+            for player_id in player_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_standings(tournament: Tournament) -> list[Standing]:
+    """Recalculate the tournament standings from scratch with a single aggregate query over its games."""
+    with transaction.atomic():
+        standings = {
+            player_id: Standing(tournament=tournament, player_id=player_id)
+            for player_id in tournament.participants.values_list('id', flat=True)
+        }
+        results = aggregate_game_results(tournament.pk)
+        for player_id, played, victories, draws, losses, goals_for, goals_against in results:
+            standing = standings.setdefault(player_id, Standing(tournament=tournament, player_id=player_id))
+            standing.played = played
+            standing.victories = victories
+            standing.draws = draws
+            standing.losses = losses
+            standing.goals_for = goals_for
+            standing.goals_against = goals_against
+            standing.points = victories * POINTS_FOR_VICTORY + draws * POINTS_FOR_DRAW
+
+        tournament.standings.all().delete()
+        return Standing.objects.bulk_create(standings.values())
+
+
+def aggregate_game_results(tournament_id: UUID | None = None) -> list[tuple]:
+    """
+    Aggregate completed games of the tournament or of all tournaments with a single grouped query.
+
+    Every row is (player_id, played, victories, draws, losses, goals_for, goals_against).
+    """
+    condition = COMPLETED_GAMES_CONDITION
+    params: list = [True]
+    if tournament_id is not None:
+        condition += ' AND tournament_id = %s'
+        params.append(Game._meta.get_field('tournament').get_db_prep_value(tournament_id, connection))  # noqa: WPS437
+
+    sql = GAME_RESULTS_AGGREGATE_SQL.format(
+        table=connection.ops.quote_name(Game._meta.db_table),  # noqa: WPS437
+        condition=condition,
+    )
+    player_id_field = Standing._meta.get_field('player')  # noqa: WPS437
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params * 2)
+        return [(player_id_field.to_python(row[0]), *row[1:]) for row in cursor.fetchall()]
+
+
+def _apply_game_result(result: GameResult, sign: int) -> None:
+    if sign > 0:
+        create_empty_standings([result.tournament_id], result.get_standings_deltas().keys())
+    for player_id, deltas in result.get_standings_deltas().items():
+        Standing.objects.filter(tournament_id=result.tournament_id, player_id=player_id).update(
+            **{field: models.F(field) + sign * delta for field, delta in deltas.items() if delta},
+        )
+
+
+def _get_player_deltas(goals_for: int, goals_against: int) -> dict[str, int]:
+    is_victory = goals_for > goals_against
+    is_draw = goals_for == goals_against
+    return {
+        'played': 1,
+        'victories': int(is_victory),
+        'draws': int(is_draw),
+        'losses': int(goals_for < goals_against),
+        'goals_for': goals_for,
+        'goals_against': goals_against,
+        'points': POINTS_FOR_VICTORY * is_victory + POINTS_FOR_DRAW * is_draw,
+    }
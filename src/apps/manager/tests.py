@@ -1,3 +1,552 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import importlib
+import itertools
+import pathlib
+import runpy
+import tempfile
+import time
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+import ujson
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from django.apps import apps
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from src.apps.manager.balancer import TeamBalancer
+from src.apps.manager.importer import import_catalogue
+from src.apps.manager.models import CustomUser, Game, League, Standing, Team, Tournament
+from src.apps.manager.results import PLAYER_COUNTERS, record_game_result, recompute_player_counters
+from src.apps.manager.sampler import TeamSampler, permute_index
+from src.apps.manager.scheduler import generate_round_robin
+from src.apps.manager.standings import rebuild_standings
+from src.apps.manager.user_cache import UserCache
+from src.api.bot.webhook import WebhookApplication, feed_tasks
+from src.bot import exceptions, metrics
+from src.bot.bot_controller import BotController
+from src.bot.chat_locks import ChatLocks
+from src.bot.models import MessageNewData, ProcessName, ProcessPhase, StateModel
+from src.bot.processors import TeamChoosingProcessor
+from src.bot.rate_limiter import OutboundScheduler
+from src.bot.serializers import dump_state, load_state
+from src.bot.state_backends import InMemoryStateBackend, SQLiteStateBackend
+from src.bot.state_controller import StateController
+from src.config import settings
+from src.language.manager import get_language_registry
+from src.utils.enums import BotUpdatesMode, FIFAVersion
+from src.utils.fake_telegram import FakeBotAPIServer, FakeTelegramSession, build_message_update, post_to_asgi
+
+FAKE_BOT_TOKEN = '123456:fake-token'
+
+STANDING_FIELDS = ('played', 'victories', 'draws', 'losses', 'goals_for', 'goals_against', 'points')
+
+
+class RoundRobinTests(SimpleTestCase):
+    """Round-robin schedule generation."""
+
+    def test_every_pair_plays_once_per_circle(self):
+        for participants_count in range(2, 15):
+            with self.subTest(participants_count=participants_count):
+                matchdays = generate_round_robin(range(participants_count))
+                pairs = [frozenset(pair) for matchday in matchdays for pair in matchday]
+                self.assertEqual(len(pairs), participants_count * (participants_count - 1) // 2)
+                self.assertEqual(len(set(pairs)), len(pairs))
+                for matchday in matchdays:
+                    players = [player for pair in matchday for player in pair]
+                    self.assertEqual(len(players), len(set(players)))
+
+    def test_home_and_away_games_are_balanced(self):
+        for participants_count in range(2, 15):
+            for circles in range(1, 5):
+                with self.subTest(participants_count=participants_count, circles=circles):
+                    balance = _get_home_away_balance(generate_round_robin(range(participants_count), circles))
+                    self.assertLessEqual(max(abs(balance[player]) for player in range(participants_count)), 1)
+                    if circles % 2 == 0:
+                        self.assertFalse(any(balance.values()))
+
+
+class StandingsTests(TestCase):
+    """Standings and player counters updated by every game result change against the ones rebuilt from all games."""
+
+    def setUp(self):
+        self.players = [
+            CustomUser.objects.create(username=f'player_{i}', telegram_username=f'player_{i}') for i in range(4)
+        ]
+        self.tournament = Tournament.objects.create(
+            name='Tournament',
+            rules_url='https://example.com',
+            start_date=datetime.date(2026, 1, 1),
+            circles_number=1,
+            fifa_version=FIFAVersion.FIFA24,
+        )
+        self.tournament.participants.add(*self.players)
+        self.games = [
+            Game.objects.create(date=timezone.now(), tournament=self.tournament, first_player=home, second_player=away)
+            for home, away in itertools.combinations(self.players, 2)
+        ]
+
+    def test_recorded_results(self):
+        for game, score in zip(self.games, ((2, 1), (0, 0), (1, 3), (4, 4), (1, 0), (0, 2))):
+            record_game_result(game.pk, *score)
+            self.assert_results_match_rebuild()
+
+    def test_edited_results(self):
+        game = self.games[0]
+        for score in ((2, 1), (1, 1), (0, 3), (0, 3), (5, 0)):
+            record_game_result(game.pk, *score)
+            self.assert_results_match_rebuild()
+
+        game.refresh_from_db()
+        game.first_player_score = None
+        game.save()
+        self.assert_results_match_rebuild()
+
+        game.first_player_score = 2
+        game.save()
+        self.assert_results_match_rebuild()
+
+        game.is_completed = False
+        game.save()
+        self.assert_results_match_rebuild()
+
+    def test_deleted_results(self):
+        record_game_result(self.games[0].pk, 3, 1)
+        record_game_result(self.games[1].pk, 2, 2)
+        self.games[0].delete()
+        self.assert_results_match_rebuild()
+
+        Game.objects.get(pk=self.games[1].pk).delete()
+        self.assert_results_match_rebuild()
+        self.games[2].delete()
+        self.assert_results_match_rebuild()
+
+    def test_failed_save_keeps_results(self):
+        record_game_result(self.games[0].pk, 2, 1)
+        game = Game.objects.get(pk=self.games[0].pk)
+        game.first_player_score = -1
+        with self.assertRaises(IntegrityError):
+            game.save()
+        self.assert_results_match_rebuild()
+
+        game.first_player_score = 0
+        game.save()
+        self.assert_results_match_rebuild()
+
+    def test_counters_backfill(self):
+        record_game_result(self.games[0].pk, 2, 1)
+        record_game_result(self.games[1].pk, 1, 1)
+        counters = _get_player_counters()
+        CustomUser.objects.update(victories=0, draws=0, losses=0)
+
+        migration = importlib.import_module('src.apps.manager.migrations.0008_backfill_player_counters')
+        migration.backfill_player_counters(apps, None)
+        self.assertEqual(counters, _get_player_counters())
+
+    def test_standings_backfill(self):
+        record_game_result(self.games[0].pk, 2, 1)
+        record_game_result(self.games[1].pk, 1, 1)
+        standings = _get_standings(self.tournament)
+        Standing.objects.all().delete()
+
+        migration = importlib.import_module('src.apps.manager.migrations.0009_backfill_standings')
+        migration.backfill_standings(apps, None)
+        self.assertEqual(standings, _get_standings(self.tournament))
+
+    def assert_results_match_rebuild(self):
+        standings = _get_standings(self.tournament)
+        rebuild_standings(self.tournament)
+        self.assertEqual(standings, _get_standings(self.tournament))
+
+        counters = _get_player_counters()
+        recompute_player_counters()
+        self.assertEqual(counters, _get_player_counters())
+
+
+class PermuteIndexTests(SimpleTestCase):
+    """Seeded permutation of the sampler."""
+
+    def test_permutation_is_bijection(self):
+        for size in (*range(1, 70), 255, 256, 257, 1000):
+            for seed in range(5):
+                with self.subTest(size=size, seed=seed):
+                    permuted = [permute_index(index, size, seed) for index in range(size)]
+                    self.assertEqual(sorted(permuted), list(range(size)))
+
+    def test_seed_changes_permutation(self):
+        permutations = {tuple(permute_index(index, 100, seed) for index in range(100)) for seed in range(10)}
+        self.assertEqual(len(permutations), 10)
+
+
+class TeamSamplerTests(TestCase):
+    """Draws of the catalogue bucket teams."""
+
+    def setUp(self):
+        league = League.objects.create(name='League')
+        for i in range(40):
+            Team.objects.create(
+                name=f'Team {i}',
+                league=league,
+                fifa_version=FIFAVersion.FIFA24,
+                rating=4.0,
+                attack=50 + i,
+                midfield=60 + i % 7,
+                defense=70 - i % 5,
+                general=65,
+            )
+
+    async def test_every_team_is_drawn_once(self):
+        for is_balanced in (False, True):
+            with self.subTest(is_balanced=is_balanced), mock.patch.object(settings, 'TEAM_DRAW_BALANCED', is_balanced):
+                sampler = TeamSampler.create(rating=4.0)
+                teams_count = await sampler.aget_teams_count()
+                teams = await sampler.adraw_teams(5)
+                teams.extend([await sampler.anext_team() for _ in range(teams_count - 5)])
+                self.assertEqual(len({team.id for team in teams}), teams_count)
+                self.assertIsNone(await sampler.anext_team())
+
+    async def test_balanced_teams_are_picked_once(self):
+        with (
+            mock.patch.object(settings, 'TEAM_DRAW_BALANCED', True),
+            mock.patch.object(TeamBalancer, '_pick_teams', autospec=True, side_effect=TeamBalancer._pick_teams) as pick,
+        ):
+            sampler = TeamSampler.create(rating=4.0)
+            await sampler.adraw_teams(5)
+            for _ in range(10):
+                await sampler.anext_team()
+        self.assertEqual(pick.call_count, 1)
+
+    async def test_dumped_sampler_replays_draw(self):
+        sampler = TeamSampler.create(rating=4.0)
+        first_teams = await sampler.adraw_teams(5)
+        dumped_sampler = sampler.dump()
+        next_teams = [await sampler.anext_team() for _ in range(10)]
+
+        replayed_sampler = TeamSampler.load(dumped_sampler)
+        self.assertEqual(next_teams, [await replayed_sampler.anext_team() for _ in range(10)])
+        self.assertEqual(first_teams, await TeamSampler.load([4.0, None, sampler.seed, 0]).adraw_teams(5))
+
+
+class ImportCatalogueTests(TestCase):
+    """Idempotent import of the teams files."""
+
+    def test_duplicated_teams_are_counted_once(self):
+        League.objects.create(name='Import League')
+        team_data = {
+            'name': 'Import Team',
+            'league': 'Import League',
+            'fifa_version': FIFAVersion.FIFA24.value,
+            'rating': 4.0,
+            'attack': 70,
+            'midfield': 70,
+            'defense': 70,
+            'general': 70,
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            teams_path = pathlib.Path(directory, 'teams.json')
+            teams_path.write_text(ujson.dumps([team_data, {**team_data, 'general': 75}]), encoding='utf-8')
+            report = import_catalogue(teams_path)
+
+        self.assertEqual((report.teams_count, report.created_teams_count), (1, 1))
+        self.assertEqual(Team.objects.get(name='Import Team').general, 75)
+
+
+class UserCacheTests(TestCase):
+    """Users resolved by the Telegram user id."""
+
+    def setUp(self):
+        self.linked_user = CustomUser.objects.create(username='linked', telegram_username='linked', telegram_user_id=1)
+        self.added_user = CustomUser.objects.create(username='added', telegram_username='added')
+
+    async def test_user_is_found_by_telegram_user_id(self):
+        cached_user = await UserCache().aget(1, 'renamed')
+        self.assertEqual(cached_user.user, self.linked_user)
+        self.assertIsNone((await UserCache().aget(2, 'linked')).user)
+
+    async def test_added_user_is_linked(self):
+        self.assertEqual((await UserCache().aget(2, 'added')).user, self.added_user)
+        await self.added_user.arefresh_from_db()
+        self.assertEqual(self.added_user.telegram_user_id, 2)
+        self.assertEqual((await UserCache().aget(2, None)).user, self.added_user)
+
+    async def test_least_recently_used_users_are_dropped(self):
+        user_cache = UserCache(max_size=2)
+        first_user = await user_cache.aget(1, None)
+        await user_cache.aget(2, None)
+        await user_cache.aget(1, None)
+        await user_cache.aget(3, None)
+        with mock.patch.object(CustomUser.objects, 'filter', side_effect=AssertionError):
+            self.assertIs(await user_cache.aget(1, None), first_user)
+        self.assertEqual(len(user_cache), 2)
+
+
+class StateSerializationTests(SimpleTestCase):
+    """Round trip of the conversation states through the serializer and the SQLite backend."""
+
+    def setUp(self):
+        self.states = [
+            StateModel(
+                chat_id=1,
+                process_name=ProcessName.TEAM_CHOOSING,
+                process_phase=ProcessPhase.TC_EXPECT_PLAYERS_COUNT,
+            ),
+            StateModel(
+                chat_id=-100123,
+                process_name=ProcessName.TEAM_CHOOSING,
+                process_phase=ProcessPhase.TC_EXPECT_TEAMS_CONFIRM,
+                is_query=True,
+                is_complete=True,
+                payload={'teams': ['a1', 'b2'], 'rerolled': [2], 'pairs': [[1, 2]]},
+                team_sampler=TeamSampler(rating=3.5, country=None, seed=42, cursor=7, balanced_count=2),
+                messages_to_update={
+                    10: MessageNewData(message_id=10, remove_markup=True, update_on_completion_only=True),
+                    11: MessageNewData(message_id=11, text='Ответ: <b>4</b>'),
+                    12: MessageNewData(message_id=12, remove=True),
+                },
+            ),
+        ]
+
+    def test_serializer_round_trip(self):
+        for state in self.states:
+            with self.subTest(chat_id=state.chat_id):
+                self.assertEqual(load_state(dump_state(state)), state)
+
+    def test_sqlite_backend_round_trip(self):
+        backend = SQLiteStateBackend(':memory:')
+        for state in self.states:
+            backend.save(state)
+        for state in self.states:
+            with self.subTest(chat_id=state.chat_id):
+                self.assertEqual(backend.load(state.chat_id), state)
+
+    def test_sampler_dumped_without_balanced_teams_count(self):
+        raw_state = dump_state(self.states[1]).replace(b'[3.5,null,42,7,2]', b'[3.5,null,42,7]')
+        self.assertEqual(load_state(raw_state).team_sampler.balanced_count, 0)
+
+
+class StateEvictionTests(SimpleTestCase):
+    """Eviction of the expired and excess conversation states."""
+
+    def test_backends_order_chats_by_last_touch(self):
+        for backend in (InMemoryStateBackend(), SQLiteStateBackend(':memory:')):
+            with self.subTest(backend=type(backend).__name__):
+                with mock.patch('time.time', side_effect=[100, 200, 300, 400]):
+                    for chat_id in (1, 2, 3, 1):
+                        backend.save(_build_state(chat_id))
+
+                self.assertEqual(sorted(backend.expired_chat_ids(250)), [2])
+                self.assertEqual(sorted(backend.expired_chat_ids(350)), [2, 3])
+                self.assertEqual(backend.least_recent_chat_ids(2), [2, 3])
+                self.assertEqual(backend.least_recent_chat_ids(5), [2, 3, 1])
+
+    def test_evictions_are_counted_by_reason(self):
+        state_controller = StateController(backend=InMemoryStateBackend(), ttl=60, max_size=2)
+        with mock.patch('time.time', side_effect=[100, 110, 120, 150]):
+            for chat_id in (1, 2, 3):
+                state_controller.create_state(chat_id, _build_state(chat_id))
+            evicted_states = state_controller.evict_states()
+
+        self.assertEqual([state.chat_id for state in evicted_states], [1])
+        self.assertEqual(state_controller.evictions, Counter(lru=1))
+
+        with mock.patch('time.time', return_value=175):
+            evicted_states = state_controller.evict_states()
+        self.assertEqual([state.chat_id for state in evicted_states], [2])
+        self.assertEqual(state_controller.evictions, Counter(lru=1, ttl=1))
+        self.assertEqual(state_controller.backend.count(), 1)
+
+    async def test_evicted_states_are_finalized(self):
+        session = FakeTelegramSession()
+        bot_controller = BotController(Bot(FAKE_BOT_TOKEN, session=session))
+        bot_controller.state_controller = StateController(backend=InMemoryStateBackend(), ttl=60)
+        state = _build_state(1)
+        state.messages_to_update = {
+            10: MessageNewData(message_id=10, remove_markup=True, update_on_completion_only=True),
+            11: MessageNewData(message_id=11, remove=True),
+        }
+        with mock.patch('time.time', return_value=100):
+            bot_controller.state_controller.create_state(1, state)
+
+        with mock.patch('time.time', return_value=200):
+            self.assertEqual(await bot_controller.evict_states(), 1)
+        self.assertEqual(dict(session.requests), {'editMessageReplyMarkup': 1, 'deleteMessages': 1})
+        self.assertIsNone(bot_controller.state_controller.get_state(1))
+
+
+class ProcessorRouterTests(SimpleTestCase):
+    """Routing of the button texts to the processors."""
+
+    def test_every_button_is_routed_in_every_language(self):
+        bot_controller = BotController(Bot(FAKE_BOT_TOKEN, session=FakeTelegramSession()))
+        for language_packs in get_language_registry().packs.values():
+            bot_phrases = language_packs.bot_phrases
+            for processor in bot_controller.processors:
+                for phrase_key in processor.button_phrases_keys:
+                    with self.subTest(language_code=bot_phrases.language_code, phrase_key=phrase_key):
+                        button_text = getattr(bot_phrases, phrase_key)
+                        self.assertIs(bot_controller.router.get_processor(bot_phrases, None, button_text), processor)
+
+    def test_colliding_button_raises_at_startup(self):
+        with mock.patch.object(TeamChoosingProcessor, 'button_phrases_keys', ('registrate_btn',)):
+            with self.assertRaisesRegex(ValueError, 'is routed to'):
+                BotController(Bot(FAKE_BOT_TOKEN, session=FakeTelegramSession()))
+
+
+class ChatLocksTests(SimpleTestCase):
+    """Updates of a chat processed one by one."""
+
+    async def test_chat_updates_are_processed_in_arrival_order(self):
+        chat_locks = ChatLocks()
+        processed = []
+
+        async def process_update(chat_id: int, update_number: int) -> None:
+            async with chat_locks.hold(chat_id):
+                await asyncio.sleep((update_number * 7 % 5) / 1000)
+                processed.append((chat_id, update_number))
+
+        await asyncio.gather(*(process_update(chat_id, number) for number in range(10) for chat_id in (1, 2)))
+        for chat_id in (1, 2):
+            self.assertEqual(
+                [number for processed_chat_id, number in processed if processed_chat_id == chat_id], list(range(10))
+            )
+        self.assertEqual(len(chat_locks), 0)
+
+    async def test_overflow_updates_are_dropped(self):
+        chat_locks = ChatLocks(max_pending_updates=2)
+        release = asyncio.Event()
+
+        async def process_update() -> None:
+            async with chat_locks.hold(1):
+                await release.wait()
+
+        dropped_before = metrics.chat_updates_dropped_total.get()
+        tasks = [asyncio.create_task(process_update()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        overflows = [result for result in results if isinstance(result, exceptions.ChatUpdatesOverflow)]
+        self.assertEqual((len(overflows), results[:3]), (2, [None, None, None]))
+        self.assertEqual(metrics.chat_updates_dropped_total.get() - dropped_before, 2)
+        self.assertEqual(len(chat_locks), 0)
+
+    async def test_cancelled_update_releases_chat(self):
+        chat_locks = ChatLocks()
+        async with chat_locks.hold(1):
+            waiting_task = asyncio.create_task(chat_locks.hold(1).__aenter__())
+            await asyncio.sleep(0)
+            waiting_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting_task
+        self.assertEqual(len(chat_locks), 0)
+
+
+class RunnerWebhookTests(TransactionTestCase):
+    """Webhook updates reach the dispatcher configured by the runner started as the main module."""
+
+    def test_webhook_update_is_handled(self):
+        event_loop_policy = asyncio.get_event_loop_policy()
+        self.addCleanup(asyncio.set_event_loop_policy, event_loop_policy)
+        with mock.patch('asyncio.run', side_effect=lambda coroutine: coroutine.close()):
+            runner = runpy.run_module('src.runner', run_name='__main__')
+
+        session = FakeTelegramSession()
+        with (
+            mock.patch.object(runner['telegram_bot'], 'session', session),
+            mock.patch.object(settings, 'BOT_UPDATES_MODE', BotUpdatesMode.WEBHOOK),
+            mock.patch.object(settings, 'BOT_WEBHOOK_BASE_URL', 'https://example.com'),
+            mock.patch.object(settings, 'BOT_WEBHOOK_SECRET', None),
+        ):
+            status = asyncio.run(self._feed_webhook_update(runner))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(session.requests['setWebhook'], 1)
+        self.assertEqual(len(session.sent_texts[1]), 1)
+
+    async def _feed_webhook_update(self, runner: dict) -> int:
+        await runner['configure_bot']()
+        update = ujson.dumps(build_message_update(1, 1, '/start')).encode()
+        status = await post_to_asgi(WebhookApplication(mock.AsyncMock()), f'/{settings.BOT_WEBHOOK_PATH}', update)
+        await asyncio.gather(*feed_tasks)
+        await runner['dispatcher'].emit_shutdown(bot=runner['telegram_bot'])
+        return status
+
+
+class OutboundSchedulerTests(SimpleTestCase):
+    """Outbound requests through the rate limiter to a local Bot API with Telegram rate limits."""
+
+    async def _start_server(self):
+        self.server = FakeBotAPIServer(global_limit=100, chat_limit=13)
+        api = TelegramAPIServer.from_base(await self.server.start())
+        self.bot = Bot(FAKE_BOT_TOKEN, session=AiohttpSession(api=api))
+
+    async def _stop_server(self):
+        await self.bot.session.close()
+        await self.server.stop()
+
+    async def test_sequential_sends_are_limited(self):
+        await self._start_server()
+        self.bot.session.middleware(OutboundScheduler(global_rate=100, chat_rate=10, chat_burst=2))
+        start_time = time.perf_counter()
+        for i in range(20):
+            await self.bot.send_message(1, f'message {i}')
+        duration = time.perf_counter() - start_time
+        await self._stop_server()
+
+        self.assertEqual(self.server.requests['sendMessage'], 20)
+        self.assertFalse(self.server.rejected)
+        self.assertGreaterEqual(duration, 1.7)
+
+    async def test_idle_chat_is_forgotten_when_refilled(self):
+        await self._start_server()
+        scheduler = OutboundScheduler(global_rate=100, chat_rate=2, chat_burst=2)
+        self.bot.session.middleware(scheduler)
+        await self.bot.send_message(1, 'message')
+        self.assertEqual(len(scheduler), 1)
+        await asyncio.sleep(0.6)
+        await self._stop_server()
+
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_queued_messages_are_merged(self):
+        await self._start_server()
+        self.bot.session.middleware(OutboundScheduler(global_rate=100, chat_rate=10, chat_burst=1))
+        messages = await asyncio.gather(*(self.bot.send_message(1, f'message {i}') for i in range(3)))
+        await self._stop_server()
+
+        self.assertEqual(self.server.received_texts['1'], ['message 0\n\nmessage 1\n\nmessage 2'])
+        self.assertEqual(len({message.message_id for message in messages}), 1)
+
+
+def _build_state(chat_id: int) -> StateModel:
+    """Return state of the team choosing process started in the chat."""
+    return StateModel(
+        chat_id=chat_id,
+        process_name=ProcessName.TEAM_CHOOSING,
+        process_phase=ProcessPhase.TC_EXPECT_PLAYERS_COUNT,
+    )
+
+
+def _get_standings(tournament: Tournament) -> dict:
+    """Return standings fields of the tournament players by player id."""
+    standings = Standing.objects.filter(tournament=tournament).values_list('player_id', *STANDING_FIELDS)
+    return {player_id: standing_values for player_id, *standing_values in standings}
+
+
+def _get_player_counters() -> dict:
+    """Return victories, draws and losses of all players by player id."""
+    return {player_id: counters for player_id, *counters in CustomUser.objects.values_list('id', *PLAYER_COUNTERS)}
+
+
+def _get_home_away_balance(matchdays: list[list[tuple]]) -> Counter:
+    """Return home games minus away games of every participant."""
+    balance = Counter()
+    for matchday in matchdays:
+        for home, away in matchday:
+            balance[home] += 1
+            balance[away] -= 1
+    return balance
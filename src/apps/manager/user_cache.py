@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.apps.manager.models import CustomUser
+from src.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUser:
+    """Resolved user of a Telegram account, user is None if the account is not registered."""
+
+    user: CustomUser | None
+    has_active_tournaments: bool
+    expires_at: float
+
+
+class UserCache:
+    """
+    Process-wide cache of users resolved by Telegram user id.
+
+    Entries expire after ttl seconds and are dropped by CustomUser and Tournament signals,
+    so known users are served without queries on every message.
+    The least recently used entries are dropped above max_size, so the cache does not grow with every new account.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.USER_CACHE_TTL_SECONDS,
+        max_size: int = settings.USER_CACHE_MAX_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._users: OrderedDict[int, CachedUser] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return count of the cached users."""
+        return len(self._users)
+
+    async def aget(self, telegram_user_id: int, telegram_username: str | None) -> CachedUser:
+        """Return cached user of the Telegram account, resolve it from the database if needed."""
+        cached_user = self._users.get(telegram_user_id)
+        if cached_user is not None and cached_user.expires_at > time.monotonic():
+            self._users.move_to_end(telegram_user_id)
+            return cached_user
+
+        user = await _afind_user(telegram_user_id, telegram_username)
+        cached_user = CachedUser(
+            user=user,
+            has_active_tournaments=user is not None and await _ahas_active_tournaments(user),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._users[telegram_user_id] = cached_user
+        self._users.move_to_end(telegram_user_id)
+        if len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+        return cached_user
+
+    async def ahas_active_tournaments(self, user: CustomUser) -> bool:
+        """Return True if the user participates in active tournaments, use cached flag if possible."""
+        cached_user = self._users.get(user.telegram_user_id)
+        is_cache_valid = cached_user is not None and cached_user.expires_at > time.monotonic()
+        if is_cache_valid and cached_user.user is not None and cached_user.user.pk == user.pk:
+            return cached_user.has_active_tournaments
+
+        return await _ahas_active_tournaments(user)
+
+    def invalidate(self, telegram_user_id: int | None = None) -> None:
+        """Drop cached user by Telegram user id or the whole cache if id is not provided."""
+        if telegram_user_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(telegram_user_id, None)
+
+
+@lru_cache()
+def get_user_cache() -> UserCache:
+    """Create and return User Cache."""
+    return UserCache()
+
+
+async def _afind_user(telegram_user_id: int, telegram_username: str | None) -> CustomUser | None:
+    """Find the user by Telegram user id, link the user added by the Telegram username on the first message."""
+    user = await CustomUser.objects.filter(telegram_user_id=telegram_user_id).afirst()
+    if user is not None or telegram_username is None:
+        return user
+
+    user = await CustomUser.objects.filter(telegram_username=telegram_username, telegram_user_id__isnull=True).afirst()
+    if user is not None:
+        user.telegram_user_id = telegram_user_id
+        await user.asave(update_fields=['telegram_user_id'])
+    return user
+
+
+async def _ahas_active_tournaments(user: CustomUser) -> bool:
+    return await user.tournaments.filter(is_active=True).aexists()
@@ -1,20 +1,34 @@
+import asyncio
+import itertools
 import logging
 import random
 from functools import lru_cache
+from typing import Awaitable, Callable
 
 from aiogram.client.bot import Bot
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery
 
-from src.bot import exceptions, processors
-from src.bot.models import ProcessName, StateModel, MessageNewData
+from src.bot import exceptions, metrics
+from src.bot.chat_locks import ChatLocks
+from src.bot.dispatcher import telegram_bot
+from src.bot.models import StateModel, MessageNewData
+from src.bot.processors import BaseProcessor, registered_processors
+from src.bot.routing import ProcessorRouter
 from src.bot.state_controller import StateController
 from src.bot.utils import get_internal_user_with_language_pack
+from src.config import settings
+from src.language.manager import get_language_registry
 from src.language.models import BotPhrases
-from src.runner import telegram_bot
 from src.utils.log import get_logger, async_log, LOWEST_LOG_LVL
 
-logger = get_logger(__name__)
+logger = get_logger(settings.LOGGER_NAME)
+
+# phase label of the first update of a process, when there is no state yet
+PROCESS_START_PHASE = 'start'
+
+# deleteMessages limit of Bot API
+DELETE_MESSAGES_BATCH_SIZE = 100
 
 
 class BotController:
@@ -24,16 +38,63 @@ class BotController:
         self.bot = bot
 
         self.state_controller = StateController()
+        self.chat_locks = ChatLocks()
+
+        self.processors = [processor_class(self.state_controller) for processor_class in registered_processors]
+        self.router = ProcessorRouter(
+            processors=self.processors,
+            languages_bot_phrases=[packs.bot_phrases for packs in get_language_registry().packs.values()],
+        )
 
-        self.registration_processor = processors.RegistrationProcessor(self.state_controller)
-        self.team_choosing_process = processors.TeamChoosingProcessor(self.state_controller)
-        self.create_tournament_process = processors.BaseProcessor(self.state_controller)
-        self.base_processor = processors.BaseProcessor(self.state_controller)
+        self._state_sweeper_task: asyncio.Task | None = None
+        self._finalization_tasks: set[asyncio.Task] = set()
 
     async def pass_message_to_processor(self, message: Message, query: CallbackQuery | None = None):
-        """Find a processor and send a message to it."""
+        """Find a processor and send a message to it after the previous updates of the chat are processed."""
+        try:
+            async with self.chat_locks.hold(message.chat.id):
+                await self._pass_message_to_processor(message, query)
+        except exceptions.ChatUpdatesOverflow as e:
+            logger.warning(f'Update is dropped: {e}')
+
+    def start_state_sweeper(self) -> None:
+        """Run periodic eviction of abandoned states in the background."""
+        if self._state_sweeper_task is None:
+            self._state_sweeper_task = asyncio.create_task(self._sweep_states())
+
+    async def stop_state_sweeper(self) -> None:
+        """Stop periodic eviction of abandoned states."""
+        if self._state_sweeper_task is None:
+            return
+
+        self._state_sweeper_task.cancel()
+        try:
+            await self._state_sweeper_task
+        except asyncio.CancelledError:
+            pass
+        self._state_sweeper_task = None
+
+    async def wait_for_finalization(self) -> None:
+        """Wait until messages of the completed processes are updated."""
+        while self._finalization_tasks:
+            await asyncio.gather(*self._finalization_tasks, return_exceptions=True)
+
+    async def evict_states(self) -> int:
+        """Evict expired and excess states, clean up their pending messages and return evicted count."""
+        evicted_states = self.state_controller.evict_states()
+        for evicted_state in evicted_states:
+            evicted_state.is_complete = True
+        await asyncio.gather(*(self._update_messages(state, self.bot) for state in evicted_states))
+
+        if evicted_states:
+            logger.info(f'Evicted {len(evicted_states)} states. Total: {dict(self.state_controller.evictions)}')
+
+        return len(evicted_states)
+
+    async def _pass_message_to_processor(self, message: Message, query: CallbackQuery | None) -> None:
         telegram_user = query.from_user if query else message.from_user
-        internal_user, bot_phrases = await get_internal_user_with_language_pack(telegram_user)
+        with metrics.user_lookup_duration.time():
+            internal_user, bot_phrases = await get_internal_user_with_language_pack(telegram_user)
 
         state = self.state_controller.get_state(message.chat.id)
         if state is not None and state.is_query and query is None:
@@ -42,25 +103,30 @@ class BotController:
 
         process = state.process_name if state else None
         try:
-            processor = await self._get_processor(bot_phrases=bot_phrases, process=process, message=message)
+            with metrics.processor_dispatch_duration.time():
+                processor = await self._get_processor(bot_phrases=bot_phrases, process=process, message=message)
         except exceptions.ProcessHandlerNotFound:
             await message.answer(random.choice(bot_phrases.wrong_msg))
             return
 
+        phase = state.process_phase.value if state else PROCESS_START_PHASE
         try:
-            await async_log(lvl=logging.DEBUG, enable_return_log=False)(processor.process)(
-                message=message,
-                query=query,
-                bot_phrases=bot_phrases,
-                internal_user=internal_user,
-            )
+            with metrics.process_phase_duration.time(processor.process_name.value, phase):
+                await async_log(lvl=logging.DEBUG, enable_return_log=False)(processor.process)(
+                    message=message,
+                    query=query,
+                    bot_phrases=bot_phrases,
+                    internal_user=internal_user,
+                )
         except Exception as e:
             logger.exception(f'Exception while processing: {e}')
 
         new_state = self.state_controller.get_state(message.chat.id)
         if new_state and new_state.is_complete:
-            await self._update_messages_from_state(message.chat.id, message.bot)
             self.state_controller.delete_state(new_state.chat_id)
+            task = asyncio.create_task(self._finalize_messages(new_state, message.bot))
+            self._finalization_tasks.add(task)
+            task.add_done_callback(self._finalization_tasks.discard)
 
     @async_log(lvl=LOWEST_LOG_LVL)
     async def _get_processor(
@@ -68,39 +134,53 @@ class BotController:
         bot_phrases: BotPhrases,
         process: str | None,
         message: Message | None = None,
-    ) -> processors.BaseProcessor:
-        match process or message.text:
-            case ProcessName.REGISTRATION.value | bot_phrases.registrate_btn:
-                return self.registration_processor
-            case ProcessName.TEAM_CHOOSING.value | bot_phrases.generate_teams_btn:
-                return self.team_choosing_process
-            case ProcessName.CREATE_TOURNAMENT.value | bot_phrases.create_tournament_btn:
-                return self.create_tournament_process
-            case bot_phrases.get_site_link_btn:
-                return self.base_processor
-            case _:
-                payload = f'process "{process}"' if process else f'message "{message.text}"'
-                raise exceptions.ProcessHandlerNotFound(
-                    f'Handler for {payload} not found.'
-                    + f'Chat id {message.chat.id}. User {message.from_user.full_name}',
-                )
-
-    async def _update_messages_from_state(self, chat_id: int, bot: Bot) -> None:
-        state = self.state_controller.get_state(chat_id)
-        if state is None:
-            return
+    ) -> BaseProcessor:
+        processor = self.router.get_processor(bot_phrases, process, message.text)
+        if processor is None:
+            payload = f'process "{process}"' if process else f'message "{message.text}"'
+            raise exceptions.ProcessHandlerNotFound(
+                f'Handler for {payload} not found.' + f'Chat id {message.chat.id}. User {message.from_user.full_name}',
+            )
+        return processor
 
-        updated_messages = []
-        for message_id, msg_new_data in state.messages_to_update.items():
+    async def _sweep_states(self) -> None:
+        while True:
+            await asyncio.sleep(settings.BOT_STATE_SWEEP_INTERVAL_SECONDS)
             try:
-                msg_id = await self._update_message_impl(state, bot, msg_new_data)
-            except TelegramBadRequest:
-                continue
+                await self.evict_states()
+            except Exception as e:
+                logger.exception(f'Exception while evicting states: {e}')
 
-            if msg_id is not None:
-                updated_messages.append(message_id)
+    async def _finalize_messages(self, state: StateModel, bot: Bot) -> None:
+        try:
+            with metrics.messages_update_duration.time():
+                await self._update_messages(state, bot)
+        except Exception as e:
+            logger.exception(f'Exception while finalizing messages of chat {state.chat_id}: {e}')
+
+    async def _update_messages(self, state: StateModel, bot: Bot) -> list[int]:
+        """Delete messages in bulk, edit other messages concurrently and return ids of the updated messages."""
+        semaphore = asyncio.Semaphore(settings.BOT_FINALIZATION_CONCURRENCY)
+        messages = [
+            msg_new_data
+            for msg_new_data in state.messages_to_update.values()
+            if state.is_complete or not msg_new_data.update_on_completion_only
+        ]
+        removed_messages = [msg_new_data.message_id for msg_new_data in messages if msg_new_data.remove]
+        edited_messages = [msg_new_data for msg_new_data in messages if not msg_new_data.remove]
+
+        results = await asyncio.gather(
+            *(self._update_message_impl(state, bot, msg_new_data, semaphore) for msg_new_data in edited_messages),
+            *(
+                self._delete_messages(state, bot, list(message_ids), semaphore)
+                for message_ids in itertools.batched(removed_messages, DELETE_MESSAGES_BATCH_SIZE)
+            ),
+        )
 
-        self.state_controller.remove_messages_from_update(state.chat_id, *updated_messages)
+        updated_messages = []
+        for message_ids in results:
+            updated_messages.extend(message_ids)
+        return updated_messages
 
     @async_log(lvl=LOWEST_LOG_LVL)
     async def _update_message_impl(
@@ -108,33 +188,61 @@ class BotController:
         state: StateModel,
         bot: Bot,
         msg_new_data: MessageNewData,
-    ) -> int | None:
-        """Edit messages related to the process and return id if updated."""
-        if msg_new_data.update_on_completion_only and not state.is_complete:
-            return
-
-        if msg_new_data.remove:
-            await bot.delete_message(chat_id=state.chat_id, message_id=msg_new_data.message_id)
-            return
-
-        if msg_new_data.remove_markup:
-            await bot.edit_message_reply_markup(
-                chat_id=state.chat_id,
-                message_id=msg_new_data.message_id,
-                reply_markup=None,
-            )
-
+        semaphore: asyncio.Semaphore,
+    ) -> list[int]:
+        """Edit message related to the process with one request and return its id if updated."""
         if msg_new_data.text is not None:
-            await bot.edit_message_text(
-                chat_id=state.chat_id,
-                message_id=msg_new_data.message_id,
-                text=msg_new_data.text,
+            # editing text without markup removes the inline keyboard as well
+            is_updated = await _send_request(
+                lambda: bot.edit_message_text(
+                    chat_id=state.chat_id,
+                    message_id=msg_new_data.message_id,
+                    text=msg_new_data.text,
+                ),
+                semaphore,
+            )
+        elif msg_new_data.remove_markup:
+            is_updated = await _send_request(
+                lambda: bot.edit_message_reply_markup(
+                    chat_id=state.chat_id,
+                    message_id=msg_new_data.message_id,
+                    reply_markup=None,
+                ),
+                semaphore,
             )
+        else:
+            return []
 
-        return msg_new_data.message_id
+        return [msg_new_data.message_id] if is_updated else []
+
+    @async_log(lvl=LOWEST_LOG_LVL)
+    async def _delete_messages(
+        self,
+        state: StateModel,
+        bot: Bot,
+        message_ids: list[int],
+        semaphore: asyncio.Semaphore,
+    ) -> list[int]:
+        """Delete messages related to the process with one request and return their ids if deleted."""
+        is_deleted = await _send_request(
+            lambda: bot.delete_messages(chat_id=state.chat_id, message_ids=message_ids),
+            semaphore,
+        )
+        return message_ids if is_deleted else []
 
 
 @lru_cache()
 def get_bot_controller() -> BotController:
     """Create and return Bot Controller."""
     return BotController(telegram_bot)
+
+
+async def _send_request(make_request: Callable[[], Awaitable], semaphore: asyncio.Semaphore) -> bool:
+    """Send request with limited concurrency and return True on success, flood control is retried by the session."""
+    async with semaphore:
+        try:
+            await make_request()
+        except TelegramBadRequest:
+            return False
+
+    return True
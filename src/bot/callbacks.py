@@ -7,6 +7,12 @@ class QuestionCallback(CallbackData, prefix='question'):
     answer: str
 
 
+class RerollCallback(CallbackData, prefix='reroll'):
+    """Callback for changing the drawn team of a player."""
+
+    player_number: int
+
+
 class NumericCallback(CallbackData, prefix='number'):
     """Main callback for yes/no questions."""
 
@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from src.bot import exceptions, metrics
+from src.config import settings
+
+
+@dataclass(slots=True)
+class ChatLock:
+    """Lock of a chat and count of the updates holding or waiting for it."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    updates_count: int = 0
+
+
+class ChatLocks:
+    """
+    Per-chat locks which process updates of a chat one by one in arrival order.
+
+    Updates of different chats do not wait for each other. A chat may have at most max_pending_updates
+    waiting updates, the lock of a chat is dropped as soon as no update holds or waits for it.
+    """
+
+    def __init__(self, max_pending_updates: int = settings.BOT_CHAT_MAX_PENDING_UPDATES) -> None:
+        self.max_pending_updates = max_pending_updates
+        self._locks: dict[int, ChatLock] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, chat_id: int) -> AsyncIterator[None]:
+        """Wait for the previous updates of the chat and hold its lock."""
+        chat_lock = self._add_update(chat_id)
+        try:
+            with metrics.chat_lock_wait_duration.time():
+                await chat_lock.lock.acquire()
+        except asyncio.CancelledError:
+            self._remove_update(chat_id, chat_lock)
+            raise
+
+        try:
+            yield
+        finally:
+            chat_lock.lock.release()
+            self._remove_update(chat_id, chat_lock)
+
+    def _add_update(self, chat_id: int) -> ChatLock:
+        chat_lock = self._locks.get(chat_id)
+        if chat_lock is None:
+            chat_lock = ChatLock()
+            self._locks[chat_id] = chat_lock
+        elif chat_lock.updates_count > self.max_pending_updates:
+            # one update holds the lock, the others are waiting for it
+            metrics.chat_updates_dropped_total.inc()
+            raise exceptions.ChatUpdatesOverflow(f'Chat {chat_id} has {chat_lock.updates_count} pending updates.')
+
+        chat_lock.updates_count += 1
+        return chat_lock
+
+    def _remove_update(self, chat_id: int, chat_lock: ChatLock) -> None:
+        chat_lock.updates_count -= 1
+        if not chat_lock.updates_count:
+            self._locks.pop(chat_id, None)
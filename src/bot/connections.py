@@ -0,0 +1,32 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.db import close_old_connections
+
+
+class DatabaseConnectionsMiddleware(BaseMiddleware):
+    """
+    Release database connections around every update as Django does around every request.
+
+    Connections are returned to the pool or closed, broken ones are dropped, so the next update gets
+    a checked connection. ORM calls of an update run in its own thread as the calls of a request do,
+    so updates of different chats do not wait for one shared thread, and connections are released
+    in that thread before it ends. A connection kept open for CONN_MAX_AGE would be left behind
+    with its thread, so CONN_MAX_AGE must stay 0.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """Run the handler in the update thread and release old connections before and after it."""
+        async with ThreadSensitiveContext():
+            await sync_to_async(close_old_connections)()
+            try:
+                return await handler(event, data)
+            finally:
+                await sync_to_async(close_old_connections)()
@@ -0,0 +1,15 @@
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+
+from src.bot.metrics import TelegramRequestMetricsMiddleware
+from src.bot.rate_limiter import OutboundScheduler
+from src.config import settings
+
+# the runner module may run as __main__, so the bot and its dispatcher live in a module imported only once
+dispatcher = Dispatcher()
+
+telegram_bot = Bot(settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode='HTML'))
+if settings.BOT_RATE_LIMIT_ENABLED:
+    # registered first to wrap the metrics middleware, so that only the sent requests are timed
+    telegram_bot.session.middleware(OutboundScheduler())
+telegram_bot.session.middleware(TelegramRequestMetricsMiddleware())
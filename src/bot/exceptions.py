@@ -14,3 +14,9 @@ class ProcessHandlerNotFound(Exception):
     """Process handler not found exception."""
 
     pass
+
+
+class ChatUpdatesOverflow(Exception):
+    """Too many updates of the chat are waiting for processing."""
+
+    pass
@@ -0,0 +1,99 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from src.utils.metrics import get_metrics_registry
+
+registry = get_metrics_registry()
+
+updates_total = registry.counter('bot_updates_total', 'Updates passed to the router handlers.', ('update_type',))
+update_errors_total = registry.counter(
+    'bot_update_errors_total',
+    'Updates failed with an exception in the handlers.',
+    label_names=('update_type',),
+)
+update_duration = registry.histogram(
+    'bot_update_duration_seconds',
+    'Time from the update arrival to the handler return.',
+    label_names=('update_type',),
+)
+user_lookup_duration = registry.histogram(
+    'bot_user_lookup_duration_seconds',
+    'Time of the internal user and language pack lookup.',
+)
+processor_dispatch_duration = registry.histogram(
+    'bot_processor_dispatch_duration_seconds',
+    'Time of the processor choosing.',
+)
+process_phase_duration = registry.histogram(
+    'bot_process_phase_duration_seconds',
+    'Time of processing the update by the processor in the phase.',
+    label_names=('process', 'phase'),
+)
+messages_update_duration = registry.histogram(
+    'bot_messages_update_duration_seconds',
+    'Time of editing and deleting messages of the completed process.',
+)
+chat_lock_wait_duration = registry.histogram(
+    'bot_chat_lock_wait_duration_seconds',
+    'Time of waiting for the previous updates of the same chat.',
+)
+chat_updates_dropped_total = registry.counter(
+    'bot_chat_updates_dropped_total',
+    'Updates dropped because too many updates of the chat were waiting.',
+)
+telegram_request_duration = registry.histogram(
+    'telegram_api_request_duration_seconds',
+    'Time of Telegram Bot API requests.',
+    label_names=('method',),
+)
+telegram_request_errors_total = registry.counter(
+    'telegram_api_request_errors_total',
+    'Failed Telegram Bot API requests.',
+    label_names=('method',),
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Router middleware which counts and times the updates handling."""
+
+    def __init__(self, update_type: str) -> None:
+        self.update_type = update_type
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """Time the handler."""
+        updates_total.inc(self.update_type)
+        try:
+            with update_duration.time(self.update_type):
+                return await handler(event, data)
+        except Exception:
+            update_errors_total.inc(self.update_type)
+            raise
+
+
+class TelegramRequestMetricsMiddleware(BaseRequestMiddleware):
+    """Bot session middleware which times the Bot API requests."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """Time the request."""
+        method_name = method.__api_method__
+        try:
+            with telegram_request_duration.time(method_name):
+                return await make_request(bot, method)
+        except Exception:
+            telegram_request_errors_total.inc(method_name)
+            raise
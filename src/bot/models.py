@@ -1,8 +1,8 @@
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
-from uuid import UUID
 
-from pydantic import BaseModel
+from src.apps.manager.sampler import TeamSampler
 
 
 class ProcessName(str, Enum):
@@ -12,6 +12,7 @@ class ProcessName(str, Enum):
     REGISTRATION = 'REGISTRATION'
     TEAM_CHOOSING = 'TEAM_CHOOSING'
     CREATE_TOURNAMENT = 'CREATE_TOURNAMENT'
+    TOURNAMENT_TABLE = 'TOURNAMENT_TABLE'
 
 
 class ProcessPhase(str, Enum):
@@ -25,7 +26,25 @@ class ProcessPhase(str, Enum):
     TC_EXPECT_TEAMS_CONFIRM = 'waiting_for_teams_confirm'
 
 
-class MessageNewData(BaseModel):
+class KeyboardTier(str, Enum):
+    """Sets of main reply keyboard buttons available to a user."""
+
+    UNREGISTERED = 'unregistered'
+    REGISTERED = 'registered'
+    TOURNAMENT_PARTICIPANT = 'tournament_participant'
+
+
+class Unset(Enum):
+    """Marker of an omitted argument, so that None and False can be passed explicitly."""
+
+    UNSET = 'UNSET'
+
+
+UNSET = Unset.UNSET
+
+
+@dataclass(slots=True)
+class MessageNewData:
     """Model for changing messages."""
 
     message_id: int
@@ -35,14 +54,15 @@ class MessageNewData(BaseModel):
     update_on_completion_only: bool = False
 
 
-class StateModel(BaseModel):
-    """Model of State object."""
+@dataclass(slots=True)
+class StateModel:
+    """Model of State object, mutated in place on every phase transition."""
 
     chat_id: int
     process_name: ProcessName
     process_phase: ProcessPhase
     is_query: bool = False
     payload: Any | None = None
-    teams_by_filter_ids: list[UUID] | None = None
-    messages_to_update: dict[int, MessageNewData] = {}
+    team_sampler: TeamSampler | None = None
+    messages_to_update: dict[int, MessageNewData] = field(default_factory=dict)
     is_complete: bool = False
@@ -1,3 +1,4 @@
-from src.bot.processors.base_processor import BaseProcessor
+from src.bot.processors.base_processor import BaseProcessor, register_processor, registered_processors
 from src.bot.processors.registratiaon import RegistrationProcessor
 from src.bot.processors.team_choosing import TeamChoosingProcessor
+from src.bot.processors.tournament_table import TournamentTableProcessor
@@ -5,11 +5,22 @@ from src.bot.models import ProcessName
 from src.bot.state_controller import StateController
 from src.language.models import BotPhrases
 
+registered_processors: list[type['BaseProcessor']] = []
 
+
+def register_processor(processor_class: type['BaseProcessor']) -> type['BaseProcessor']:
+    """Add the processor class to the processors created and routed by the bot controller."""
+    registered_processors.append(processor_class)
+    return processor_class
+
+
+@register_processor
 class BaseProcessor:
     """Interface of bot action processor."""
 
     process_name: ProcessName = ProcessName.BASE_PROCESS
+    # names of BotPhrases fields with texts of the buttons which start the process
+    button_phrases_keys: tuple[str, ...] = ('create_tournament_btn', 'get_site_link_btn')
 
     def __init__(self, state_controller: StateController):
         self.state_controller = state_controller
@@ -4,15 +4,17 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from src.apps.manager.models import CustomUser as InternalUser
 from src.bot.callbacks import QuestionCallback
 from src.bot.models import ProcessPhase, StateModel, ProcessName, MessageNewData
-from src.bot.processors.base_processor import BaseProcessor
+from src.bot.processors.base_processor import BaseProcessor, register_processor
 from src.bot.utils import build_main_reply_keyboard
 from src.language.models import BotPhrases
 
 
+@register_processor
 class RegistrationProcessor(BaseProcessor):
     """Processing of registration."""
 
     process_name = ProcessName.REGISTRATION
+    button_phrases_keys = ('registrate_btn',)
 
     async def process(
         self,
@@ -103,7 +105,7 @@ class RegistrationProcessor(BaseProcessor):
                     self.state_controller.update_state(
                         chat_id=chat_id,
                         process_phase=ProcessPhase.REG_EXPECT_NICKNAME,
-                        is_query=True,
+                        is_query=False,
                     )
                     await query.message.answer(bot_phrases.reg_nickname_request_again)
                     return
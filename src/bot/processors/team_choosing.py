@@ -1,24 +1,36 @@
 import random
 from uuid import UUID
 
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from asgiref.sync import sync_to_async
 
-from src.apps.manager.models import Team, CustomUser as InternalUser
-from src.apps.manager.utils import get_async_query_result
-from src.bot.callbacks import NumericCallback, QuestionCallback
+from src.apps.manager.catalogue import TeamRecord, get_team_catalogue
+from src.apps.manager.models import CustomUser as InternalUser
+from src.apps.manager.sampler import TeamSampler
+from src.apps.manager.scheduler import generate_round_robin
+from src.bot.callbacks import NumericCallback, QuestionCallback, RerollCallback
 from src.bot.models import ProcessPhase, StateModel, ProcessName, MessageNewData
-from src.bot.processors.base_processor import BaseProcessor
+from src.bot.processors.base_processor import BaseProcessor, register_processor
 from src.bot.utils import build_main_reply_keyboard, digit_to_emoji
+from src.config import settings
 from src.language.models import BotPhrases
-from src.utils.enums import Country
+from src.utils.enums import Country, TeamDrawRendering
+from src.utils.log import get_logger
 
+logger = get_logger(settings.LOGGER_NAME)
 
+# keys of the single message draw kept in the state payload
+DRAW_TEAMS = 'teams'
+DRAW_REROLLED_PLAYERS = 'rerolled'
+DRAW_PAIRS = 'pairs'
+
+
+@register_processor
 class TeamChoosingProcessor(BaseProcessor):
     """Team choosing processor."""
 
     process_name = ProcessName.TEAM_CHOOSING
+    button_phrases_keys = ('generate_teams_btn',)
     max_players_count = 10
 
     async def process(
@@ -109,14 +121,35 @@ class TeamChoosingProcessor(BaseProcessor):
                     ),
                 )
 
-                teams_ids = await self._send_random_teams(
-                    message=query.message,
-                    bot_phrases=bot_phrases,
-                    players_count=state.payload,
-                    teams_rating=float(teams_rating),
-                )
+                teams_count = len(await get_team_catalogue().aget_teams(rating=float(teams_rating)))
+                if teams_count < state.payload:
+                    await query.message.answer(
+                        text=bot_phrases.tc_not_enough_teams,
+                        reply_markup=await build_main_reply_keyboard(internal_user, bot_phrases),
+                    )
+                    self.state_controller.update_state(
+                        chat_id=state.chat_id,
+                        is_complete=True,
+                    )
+                    return
+
+                draw = None
+                if settings.BOT_TEAM_DRAW_RENDERING == TeamDrawRendering.SINGLE_MESSAGE:
+                    team_sampler, draw = await self._send_teams_draw(
+                        message=query.message,
+                        bot_phrases=bot_phrases,
+                        players_count=state.payload,
+                        teams_rating=float(teams_rating),
+                    )
+                else:
+                    team_sampler = await self._send_random_teams(
+                        message=query.message,
+                        bot_phrases=bot_phrases,
+                        players_count=state.payload,
+                        teams_rating=float(teams_rating),
+                    )
 
-                if teams_ids is None:
+                if team_sampler is None:
                     await query.message.answer(text=bot_phrases.tc_updating_is_unavailable)
                     await query.message.answer(
                         text=bot_phrases.tc_done,
@@ -141,8 +174,8 @@ class TeamChoosingProcessor(BaseProcessor):
                 self.state_controller.update_state(
                     chat_id=query.message.chat.id,
                     process_phase=ProcessPhase.TC_EXPECT_TEAMS_CONFIRM,
-                    payload=None,
-                    teams_by_filter_ids=teams_ids,
+                    payload=draw,
+                    team_sampler=team_sampler,
                 )
                 self.state_controller.add_messages_to_update(
                     query.message.chat.id,
@@ -154,26 +187,18 @@ class TeamChoosingProcessor(BaseProcessor):
                 )
 
             case ProcessPhase.TC_EXPECT_TEAMS_CONFIRM:
+                if query.data.startswith(f'{RerollCallback.__prefix__}{RerollCallback.__separator__}'):
+                    await self._reroll_player_team(
+                        query=query,
+                        state=state,
+                        bot_phrases=bot_phrases,
+                        player_number=RerollCallback.unpack(query.data).player_number,
+                    )
+                    return
+
                 query_answer = query.data.split(':')[1]
                 if query_answer == bot_phrases.tc_change_team_btn:
-                    player_number = query.message.text.split(':')[0][-2:].strip()
-
-                    teams_ids = state.teams_by_filter_ids
-                    team_id = random.choice(teams_ids)
-                    teams_ids.remove(team_id)
-
-                    team_obj = await Team.objects.aget(id=team_id)
-
-                    await query.bot.edit_message_text(
-                        chat_id=state.chat_id,
-                        message_id=query.message.message_id,
-                        text=await self._get_team_description(team_obj, bot_phrases, player_number),
-                        reply_markup=None,
-                    )
-                    self.state_controller.remove_messages_from_update(
-                        query.message.chat.id,
-                        query.message.message_id,
-                    )
+                    await self._change_player_team(query=query, state=state, bot_phrases=bot_phrases)
                 if query_answer == bot_phrases.yes_btn:
                     await query.message.answer(
                         text=bot_phrases.tc_done,
@@ -199,15 +224,9 @@ class TeamChoosingProcessor(BaseProcessor):
         players_count: int,
         teams_rating: float,
         team_country: Country | None = None,
-    ) -> list[UUID] | None:
-        teams_query = Team.objects.filter(
-            rating=teams_rating,
-            **({'league__country': team_country} if team_country is not None else {}),
-        ).values_list('id', flat=True)
-
-        teams_ids = await get_async_query_result(teams_query)
-
-        is_updating_available = (len(teams_ids) / players_count) > 2
+    ) -> TeamSampler | None:
+        team_sampler = self._create_team_sampler(message.chat.id, teams_rating, team_country)
+        is_updating_available = (await team_sampler.aget_teams_count() / players_count) > 2
 
         builder = InlineKeyboardBuilder()
         builder.button(
@@ -215,13 +234,10 @@ class TeamChoosingProcessor(BaseProcessor):
             callback_data=QuestionCallback(answer=bot_phrases.tc_change_team_btn).pack(),
         )
 
-        for player_number in range(1, players_count + 1):
-            team_id = random.choice(teams_ids)
-            teams_ids.remove(team_id)
-
-            team_object = await Team.objects.aget(id=team_id)
+        drawn_teams = await team_sampler.adraw_teams(players_count)
+        for player_number, team in enumerate(drawn_teams, start=1):
             team_description_message = await message.answer(
-                text=await self._get_team_description(team_object, bot_phrases, player_number),
+                text=self._get_team_description(team, bot_phrases, player_number),
                 reply_markup=builder.as_markup() if is_updating_available else None,
             )
 
@@ -237,27 +253,146 @@ class TeamChoosingProcessor(BaseProcessor):
 
         first_round_pairs = self._generate_first_round_pairs(players_count)
         if first_round_pairs:
-            message_text = bot_phrases.tc_first_round_pairs
-            for pair in first_round_pairs:
-                message_text += f'{pair[0]} - {pair[1]}\n'
-
-            await message.answer(text=message_text)
+            await message.answer(text=self._get_first_round_pairs_text(first_round_pairs, bot_phrases))
 
         if is_updating_available:
-            return teams_ids
+            return team_sampler
+
+    async def _send_teams_draw(
+        self,
+        message: Message,
+        bot_phrases: BotPhrases,
+        players_count: int,
+        teams_rating: float,
+        team_country: Country | None = None,
+    ) -> tuple[TeamSampler | None, dict | None]:
+        """
+        Send teams of all players and the first round pairs as one message with a change button per player.
+
+        Return the sampler of the teams for changes and the draw to keep in the state,
+        both are None if there are too few teams for changes.
+        """
+        team_sampler = self._create_team_sampler(message.chat.id, teams_rating, team_country)
+        is_updating_available = (await team_sampler.aget_teams_count() / players_count) > 2
+
+        drawn_teams = await team_sampler.adraw_teams(players_count)
+        first_round_pairs = self._generate_first_round_pairs(players_count) or []
+        draw = {
+            DRAW_TEAMS: [team.id.hex for team in drawn_teams],
+            DRAW_REROLLED_PLAYERS: [] if is_updating_available else list(range(1, players_count + 1)),
+            DRAW_PAIRS: first_round_pairs,
+        }
+        text, reply_markup = await self._render_teams_draw(draw, bot_phrases)
+        draw_message = await message.answer(text=text, reply_markup=reply_markup)
+
+        if not is_updating_available:
+            return None, None
+
+        self.state_controller.add_messages_to_update(
+            message.chat.id,
+            MessageNewData(
+                message_id=draw_message.message_id,
+                remove_markup=True,
+                update_on_completion_only=True,
+            ),
+        )
+        return team_sampler, draw
+
+    @staticmethod
+    def _create_team_sampler(chat_id: int, teams_rating: float, team_country: Country | None) -> TeamSampler:
+        """Create sampler of the draw and log its seed, so the draw can be replayed."""
+        team_sampler = TeamSampler.create(rating=teams_rating, country=team_country)
+        logger.info(f'Teams of chat {chat_id} are drawn with rating {teams_rating} and seed {team_sampler.seed}')
+        return team_sampler
+
+    async def _change_player_team(self, query: CallbackQuery, state: StateModel, bot_phrases: BotPhrases) -> None:
+        """Change the team of the player message once and remove its change button."""
+        if state.team_sampler is None:
+            return
+
+        team = await state.team_sampler.anext_team()
+        if team is None:
+            return
+
+        self.state_controller.update_state(chat_id=state.chat_id, team_sampler=state.team_sampler)
+
+        player_number = query.message.text.split(':')[0][-2:].strip()
+        await query.bot.edit_message_text(
+            chat_id=state.chat_id,
+            message_id=query.message.message_id,
+            text=self._get_team_description(team, bot_phrases, player_number),
+            reply_markup=None,
+        )
+        self.state_controller.remove_messages_from_update(
+            query.message.chat.id,
+            query.message.message_id,
+        )
+
+    async def _reroll_player_team(
+        self,
+        query: CallbackQuery,
+        state: StateModel,
+        bot_phrases: BotPhrases,
+        player_number: int,
+    ) -> None:
+        """Change the team of the player once and edit the draw message, the button of a stale message is rejected."""
+        draw = state.payload
+        is_rerollable = (
+            isinstance(draw, dict)
+            and state.team_sampler is not None
+            and 1 <= player_number <= len(draw[DRAW_TEAMS])
+            and player_number not in draw[DRAW_REROLLED_PLAYERS]
+        )
+        team = await state.team_sampler.anext_team() if is_rerollable else None
+        if team is None:
+            await query.answer(text=bot_phrases.tc_reroll_is_unavailable, show_alert=True)
+            return
+
+        draw[DRAW_TEAMS][player_number - 1] = team.id.hex
+        draw[DRAW_REROLLED_PLAYERS].append(player_number)
+        self.state_controller.update_state(chat_id=state.chat_id, team_sampler=state.team_sampler, payload=draw)
+
+        text, reply_markup = await self._render_teams_draw(draw, bot_phrases)
+        await query.bot.edit_message_text(
+            chat_id=state.chat_id,
+            message_id=query.message.message_id,
+            text=text,
+            reply_markup=reply_markup,
+        )
+
+    async def _render_teams_draw(
+        self,
+        draw: dict,
+        bot_phrases: BotPhrases,
+    ) -> tuple[str, InlineKeyboardMarkup | None]:
+        """Return text of the draw message and change buttons of the players who have not changed their team."""
+        catalogue = get_team_catalogue()
+        descriptions = []
+        builder = InlineKeyboardBuilder()
+        for player_number, team_id in enumerate(draw[DRAW_TEAMS], start=1):
+            team = await catalogue.aget_team(UUID(team_id))
+            descriptions.append(self._get_team_description(team, bot_phrases, player_number))
+            if player_number not in draw[DRAW_REROLLED_PLAYERS]:
+                builder.button(
+                    text=bot_phrases.tc_reroll_player_team_btn.format(player_number=player_number),
+                    callback_data=RerollCallback(player_number=player_number).pack(),
+                )
+        builder.adjust(2)
+
+        if draw[DRAW_PAIRS]:
+            descriptions.append(self._get_first_round_pairs_text(draw[DRAW_PAIRS], bot_phrases))
+
+        reply_markup = builder.as_markup() if len(draw[DRAW_REROLLED_PLAYERS]) < len(draw[DRAW_TEAMS]) else None
+        return '\n'.join(descriptions), reply_markup
 
     @staticmethod
-    async def _get_team_description(team: Team, bot_phrases, player_number: int | str) -> str:
-        league_object = await sync_to_async(lambda: team.league)()
-        if league_object.country is not None:
-            country = Country(league_object.country).get_readable_name()
-        else:
-            country = bot_phrases.unknown
+    def _get_team_description(team: TeamRecord, bot_phrases, player_number: int | str) -> str:
+        country = team.country.get_readable_name() if team.country is not None else bot_phrases.unknown
 
         return bot_phrases.team_description.format(
             player_number=player_number,
             team_name=team.name,
-            league=league_object.name,
+            league=team.league_name,
             country=country,
             general=digit_to_emoji(team.general),
             attack=digit_to_emoji(team.attack),
@@ -265,16 +400,19 @@ class TeamChoosingProcessor(BaseProcessor):
             defense=digit_to_emoji(team.defense),
         )
 
+    @staticmethod
+    def _get_first_round_pairs_text(first_round_pairs: list[tuple[int, int]], bot_phrases: BotPhrases) -> str:
+        message_text = bot_phrases.tc_first_round_pairs
+        for pair in first_round_pairs:
+            message_text += f'{pair[0]} - {pair[1]}\n'
+        return message_text
+
     @staticmethod
     def _generate_first_round_pairs(players_count) -> list[tuple[int, int]] | None:
-        """Generates pairs for the first round of the game."""
+        """Generates pairs for the first round of the game ordered by matchdays of a round-robin schedule."""
         if players_count < 2 or players_count > 10:
             return
 
-        pairs = []
-        for i in range(1, players_count + 1):
-            for j in range(i + 1, players_count + 1):
-                pairs.append((i, j))
-
-        random.shuffle(pairs)
-        return pairs
+        players = list(range(1, players_count + 1))
+        random.shuffle(players)
+        return [pair for matchday in generate_round_robin(players) for pair in matchday]
@@ -0,0 +1,57 @@
+from html import escape
+
+from aiogram.types import Message, CallbackQuery
+
+from src.apps.manager.models import CustomUser as InternalUser
+from src.bot.models import ProcessName
+from src.bot.processors.base_processor import BaseProcessor, register_processor
+from src.language.models import BotPhrases
+
+
+@register_processor
+class TournamentTableProcessor(BaseProcessor):
+    """Sends standings of the user active tournaments."""
+
+    process_name = ProcessName.TOURNAMENT_TABLE
+    button_phrases_keys = ('get_tournament_table_btn',)
+
+    async def process(
+        self,
+        message: Message | None,
+        query: CallbackQuery | None,
+        bot_phrases: BotPhrases,
+        internal_user: InternalUser | None,
+    ) -> None:
+        """Send standings of every active tournament of the user, the standings are read without games scanning."""
+        message = message or query.message
+        if internal_user is None:
+            await message.answer(bot_phrases.tt_no_active_tournaments)
+            return
+
+        tables_count = 0
+        async for tournament in internal_user.tournaments.filter(is_active=True).order_by('start_date'):
+            await message.answer(await self._get_table_text(tournament, bot_phrases))
+            tables_count += 1
+
+        if not tables_count:
+            await message.answer(bot_phrases.tt_no_active_tournaments)
+
+    @staticmethod
+    async def _get_table_text(tournament, bot_phrases: BotPhrases) -> str:
+        table_text = bot_phrases.tt_table_header.format(tournament=escape(tournament.name))
+        position = 0
+        async for standing in tournament.get_standings():
+            position += 1
+            table_text += bot_phrases.tt_table_row.format(
+                position=position,
+                nickname=escape(standing.player.nickname or standing.player.telegram_username),
+                played=standing.played,
+                victories=standing.victories,
+                draws=standing.draws,
+                losses=standing.losses,
+                goals_for=standing.goals_for,
+                goals_against=standing.goals_against,
+                points=standing.points,
+            )
+
+        return table_text
@@ -0,0 +1,328 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Iterable
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from src.config import settings
+
+# methods which change already sent messages, they wait for the interactive requests
+BULK_METHODS = frozenset(
+    (
+        'editMessageText',
+        'editMessageCaption',
+        'editMessageMedia',
+        'editMessageReplyMarkup',
+        'deleteMessage',
+        'deleteMessages',
+    ),
+)
+
+MAX_MESSAGE_LENGTH = 4096
+
+COALESCED_MESSAGES_SEPARATOR = '\n\n'
+
+
+class Lane(IntEnum):
+    """Priority of outbound requests, lower value is sent first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class TokenBucket:
+    """Token bucket refilled with rate tokens per second up to burst tokens."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def get_delay(self) -> float:
+        """Return seconds until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        token_delay = 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(token_delay, self.blocked_until - now)
+
+    def get_refill_delay(self) -> float:
+        """Return seconds until the bucket is full and not blocked."""
+        self.get_delay()
+        return max((self.burst - self.tokens) / self.rate, self.blocked_until - time.monotonic())
+
+    def take(self) -> None:
+        """Take a token, get_delay must return 0 before."""
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """Give no tokens for the seconds, used when Telegram asks to retry later."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        delay = self.get_delay()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.get_delay()
+        self.take()
+
+
+class PriorityTokenBucket(TokenBucket):
+    """Token bucket which gives tokens to waiters of higher priority lanes first."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        super().__init__(rate, burst)
+        self._waiters: list[tuple[Lane, int, asyncio.Future]] = []
+        self._waiters_order = itertools.count()
+        self._dispenser: asyncio.Task | None = None
+
+    async def acquire_in_lane(self, lane: Lane) -> None:
+        """Wait for a token in the lane and take it."""
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._waiters_order), waiter))
+        if self._dispenser is None or self._dispenser.done():
+            self._dispenser = asyncio.create_task(self._dispense())
+        await waiter
+
+    async def _dispense(self) -> None:
+        while self._waiters:
+            delay = self.get_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            waiter = heapq.heappop(self._waiters)[-1]
+            if not waiter.done():
+                self.take()
+                waiter.set_result(None)
+
+
+@dataclass(slots=True)
+class OutboundRequest:
+    """Request waiting in the chat queue."""
+
+    method: TelegramMethod
+    make_request: NextRequestMiddlewareType
+    bot: Bot
+    future: asyncio.Future
+    retries: int = 0
+
+
+@dataclass(slots=True)
+class ChatQueue:
+    """Pending requests of a chat by lanes and the chat rate limits of the lanes."""
+
+    buckets: dict[Lane, TokenBucket]
+    lanes: dict[Lane, deque[OutboundRequest]] = field(default_factory=lambda: {lane: deque() for lane in Lane})
+    worker: asyncio.Task | None = None
+    idle_timer: asyncio.TimerHandle | None = None
+
+    def pop(self) -> OutboundRequest | None:
+        """Return the next request of the lane which can send first, of the higher priority lane on a tie."""
+        lanes = [lane for lane, lane_requests in self.lanes.items() if lane_requests]
+        if not lanes:
+            return None
+
+        lane = min(lanes, key=lambda pending_lane: (self.buckets[pending_lane].get_delay(), pending_lane))
+        return self.lanes[lane].popleft()
+
+    def block(self, seconds: float) -> None:
+        """Pause all lanes of the chat."""
+        for bucket in self.buckets.values():
+            bucket.block(seconds)
+
+    def get_refill_delay(self) -> float:
+        """Return seconds until all lanes of the chat are full."""
+        return max(bucket.get_refill_delay() for bucket in self.buckets.values())
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Bot session middleware which sends requests to chats within Telegram rate limits.
+
+    Requests to every chat are sent one by one within the chat and global token buckets. Edits and deletions
+    have their own chat bucket, as Telegram limits sending new messages to a chat much stricter,
+    and interactive requests are sent first when both lanes can send. Consecutive plain messages to the same chat
+    are merged into one message, when Telegram asks to retry later the chat is paused and the request is repeated.
+    Requests without chat, like getUpdates, are sent immediately.
+
+    All merged requests get the same sent message, so editing or deleting it changes the texts of the other
+    requests too. Only messages without markup and entities are merged, the bot never edits them.
+    An idle chat is forgotten once its buckets are full again, so sequential sends to a chat are limited as well.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = settings.BOT_GLOBAL_RATE_LIMIT,
+        chat_rate: float = settings.BOT_CHAT_RATE_LIMIT,
+        chat_burst: int = settings.BOT_CHAT_BURST,
+        chat_bulk_rate: float = settings.BOT_CHAT_BULK_RATE_LIMIT,
+        chat_bulk_burst: int = settings.BOT_CHAT_BULK_BURST,
+        coalesce_messages: bool = settings.BOT_COALESCE_MESSAGES,
+        max_retries: int = settings.BOT_FLOOD_WAIT_MAX_RETRIES,
+    ) -> None:
+        # no burst over the global rate, it is shared by all chats
+        self.global_bucket = PriorityTokenBucket(global_rate, burst=1)
+        self.chat_rates = {Lane.INTERACTIVE: (chat_rate, chat_burst), Lane.BULK: (chat_bulk_rate, chat_bulk_burst)}
+        self.coalesce_messages = coalesce_messages
+        self.max_retries = max_retries
+        self.coalesced_count = 0
+        self._chats: dict[int | str, ChatQueue] = {}
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Any:
+        """Put the request to the chat queue and wait for the response."""
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        chat_queue = self._chats.get(chat_id)
+        if chat_queue is None:
+            chat_queue = ChatQueue(
+                buckets={lane: TokenBucket(rate, burst) for lane, (rate, burst) in self.chat_rates.items()},
+            )
+            self._chats[chat_id] = chat_queue
+
+        request = OutboundRequest(method, make_request, bot, asyncio.get_running_loop().create_future())
+        chat_queue.lanes[_get_lane(method)].append(request)
+        if chat_queue.worker is None:
+            if chat_queue.idle_timer is not None:
+                chat_queue.idle_timer.cancel()
+            chat_queue.worker = asyncio.create_task(self._process_chat(chat_id, chat_queue))
+
+        return await request.future
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    async def _process_chat(self, chat_id: int | str, chat_queue: ChatQueue) -> None:
+        try:
+            await self._send_queued(chat_queue)
+        finally:
+            chat_queue.worker = None
+            # nobody sends the requests left by a cancelled worker
+            _set_exception(itertools.chain.from_iterable(chat_queue.lanes.values()), asyncio.CancelledError())
+            self._forget_refilled_chat(chat_id, chat_queue)
+
+    def _forget_refilled_chat(self, chat_id: int | str, chat_queue: ChatQueue) -> None:
+        """Forget the idle chat when its buckets are full, a new chat queue has the same limits then."""
+        if chat_queue.worker is not None or self._chats.get(chat_id) is not chat_queue:
+            return
+
+        refill_delay = chat_queue.get_refill_delay()
+        if refill_delay > 0:
+            loop = asyncio.get_running_loop()
+            chat_queue.idle_timer = loop.call_later(refill_delay, self._forget_refilled_chat, chat_id, chat_queue)
+        else:
+            self._chats.pop(chat_id)
+
+    async def _send_queued(self, chat_queue: ChatQueue) -> None:
+        request = chat_queue.pop()
+        while request is not None:
+            if not request.future.done():
+                await self._send(chat_queue, request)
+            request = chat_queue.pop()
+
+    async def _send(self, chat_queue: ChatQueue, request: OutboundRequest) -> None:
+        requests = self._pop_coalesced(chat_queue, request)
+        method = _merge_messages(requests) if len(requests) > 1 else request.method
+
+        try:
+            response = await self._send_in_turn(chat_queue, request, method)
+        except asyncio.CancelledError as e:
+            _set_exception(requests, e)
+            raise
+        except TelegramRetryAfter as e:
+            chat_queue.block(e.retry_after)
+            self._retry_or_fail(chat_queue, requests, e)
+            return
+        except Exception as e:
+            _set_exception(requests, e)
+            return
+
+        self.coalesced_count += len(requests) - 1
+        for coalesced_request in requests:
+            if not coalesced_request.future.done():
+                coalesced_request.future.set_result(response)
+
+    async def _send_in_turn(self, chat_queue: ChatQueue, request: OutboundRequest, method: TelegramMethod) -> Any:
+        """Wait for the chat and global buckets of the method lane and send the method."""
+        lane = _get_lane(method)
+        await chat_queue.buckets[lane].acquire()
+        await self.global_bucket.acquire_in_lane(lane)
+        return await request.make_request(request.bot, method)
+
+    def _pop_coalesced(self, chat_queue: ChatQueue, request: OutboundRequest) -> list[OutboundRequest]:
+        """Return the request and the following requests which can be sent with it as one message."""
+        requests = [request]
+        if not self.coalesce_messages or not _is_coalescible(request.method):
+            return requests
+
+        pending = chat_queue.lanes[Lane.INTERACTIVE]
+        text_length = len(request.method.text)
+        while pending and _can_coalesce(request.method, pending[0].method, text_length):
+            text_length += len(COALESCED_MESSAGES_SEPARATOR) + len(pending[0].method.text)
+            requests.append(pending.popleft())
+
+        return requests
+
+    def _retry_or_fail(self, chat_queue: ChatQueue, requests: list[OutboundRequest], error: Exception) -> None:
+        if requests[0].retries >= self.max_retries:
+            _set_exception(requests, error)
+            return
+
+        lane_requests = chat_queue.lanes[_get_lane(requests[0].method)]
+        for request in reversed(requests):
+            request.retries += 1
+            lane_requests.appendleft(request)
+
+
+def _get_lane(method: TelegramMethod) -> Lane:
+    return Lane.BULK if method.__api_method__ in BULK_METHODS else Lane.INTERACTIVE
+
+
+def _is_coalescible(method: TelegramMethod) -> bool:
+    return isinstance(method, SendMessage) and method.reply_markup is None and method.entities is None
+
+
+def _can_coalesce(method: SendMessage, next_method: TelegramMethod, text_length: int) -> bool:
+    if not _is_coalescible(next_method):
+        return False
+
+    merged_length = text_length + len(COALESCED_MESSAGES_SEPARATOR) + len(next_method.text)
+    if merged_length > MAX_MESSAGE_LENGTH:
+        return False
+
+    return method.model_dump(exclude={'text'}) == next_method.model_dump(exclude={'text'})
+
+
+def _merge_messages(requests: list[OutboundRequest]) -> SendMessage:
+    text = COALESCED_MESSAGES_SEPARATOR.join(request.method.text for request in requests)
+    return requests[0].method.model_copy(update={'text': text})
+
+
+def _set_exception(requests: Iterable[OutboundRequest], error: BaseException) -> None:
+    for request in requests:
+        if request.future.done():
+            continue
+
+        if isinstance(error, asyncio.CancelledError):
+            request.future.cancel()
+        else:
+            request.future.set_exception(error)
@@ -0,0 +1,51 @@
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from src.bot.processors.base_processor import BaseProcessor
+from src.language.models import BotPhrases
+
+
+class ProcessorRouter:
+    """
+    Routing table of processors by process name and by button text of every language.
+
+    The tables are built once from the processors declarations, so that choosing a processor is one dict lookup.
+    """
+
+    def __init__(self, processors: Iterable[BaseProcessor], languages_bot_phrases: Iterable[BotPhrases]) -> None:
+        processors = tuple(processors)
+        self.processors_by_process: Mapping[str, BaseProcessor] = MappingProxyType(
+            {processor.process_name.value: processor for processor in processors},
+        )
+        self.processors_by_button: Mapping[str, Mapping[str, BaseProcessor]] = MappingProxyType(
+            {
+                bot_phrases.language_code: _build_buttons_table(processors, bot_phrases)
+                for bot_phrases in languages_bot_phrases
+            },
+        )
+
+    def get_processor(self, bot_phrases: BotPhrases, process: str | None, text: str | None) -> BaseProcessor | None:
+        """Return processor of the running process or of the pressed button, None if there is no such processor."""
+        if process:
+            return self.processors_by_process.get(process)
+
+        buttons_table = self.processors_by_button.get(bot_phrases.language_code)
+        if buttons_table is None:
+            return None
+        return buttons_table.get(text)
+
+
+def _build_buttons_table(processors: tuple[BaseProcessor, ...], bot_phrases: BotPhrases) -> Mapping[str, BaseProcessor]:
+    buttons_table: dict[str, BaseProcessor] = {}
+    for processor in processors:
+        for phrase_key in processor.button_phrases_keys:
+            button_text = getattr(bot_phrases, phrase_key)
+            routed_processor = buttons_table.get(button_text)
+            if routed_processor is not None:
+                raise ValueError(
+                    f'Button "{button_text}" of language "{bot_phrases.language_code}" is routed to '
+                    + f'{routed_processor} and {processor}.',
+                )
+            buttons_table[button_text] = processor
+
+    return MappingProxyType(buttons_table)
@@ -0,0 +1,87 @@
+import ujson
+
+from src.apps.manager.sampler import TeamSampler
+from src.bot.models import MessageNewData, ProcessName, ProcessPhase, StateModel
+
+STATE_IS_QUERY = 1
+STATE_IS_COMPLETE = 2
+
+MESSAGE_REMOVE_MARKUP = 1
+MESSAGE_REMOVE = 2
+MESSAGE_UPDATE_ON_COMPLETION_ONLY = 4
+
+
+def dump_state(state: StateModel) -> bytes:
+    """
+    Serialize StateModel to a compact JSON array.
+
+    Boolean fields are packed into bit flags and the team sampler is stored as its seed and cursor,
+    so a typical conversation takes a few hundred bytes.
+    """
+    flags = _pack_flags({STATE_IS_QUERY: state.is_query, STATE_IS_COMPLETE: state.is_complete})
+    team_sampler = state.team_sampler.dump() if state.team_sampler is not None else None
+    return ujson.dumps(
+        [
+            state.chat_id,
+            state.process_name.value,
+            state.process_phase.value,
+            flags,
+            state.payload,
+            team_sampler,
+            [dump_message_new_data(msg_new_data) for msg_new_data in state.messages_to_update.values()],
+        ],
+        ensure_ascii=False,
+    ).encode()
+
+
+def load_state(raw_state: bytes | str) -> StateModel:
+    """Deserialize StateModel packed with dump_state."""
+    state_data = ujson.loads(raw_state)
+    flags = state_data[3]
+    team_sampler = state_data[5]
+    if team_sampler and isinstance(team_sampler[0], str):
+        # states saved before the sampler kept the list of team ids, their team changes are not available
+        team_sampler = None
+    messages_to_update = [load_message_new_data(message) for message in state_data[6]]
+    return StateModel(
+        chat_id=state_data[0],
+        process_name=ProcessName(state_data[1]),
+        process_phase=ProcessPhase(state_data[2]),
+        is_query=bool(flags & STATE_IS_QUERY),
+        is_complete=bool(flags & STATE_IS_COMPLETE),
+        payload=state_data[4],
+        team_sampler=TeamSampler.load(team_sampler) if team_sampler is not None else None,
+        messages_to_update={msg_new_data.message_id: msg_new_data for msg_new_data in messages_to_update},
+    )
+
+
+def dump_message_new_data(msg_new_data: MessageNewData) -> list:
+    """Serialize MessageNewData to a compact list of message id, flags and text."""
+    flags = _pack_flags(
+        {
+            MESSAGE_REMOVE_MARKUP: msg_new_data.remove_markup,
+            MESSAGE_REMOVE: msg_new_data.remove,
+            MESSAGE_UPDATE_ON_COMPLETION_ONLY: msg_new_data.update_on_completion_only,
+        },
+    )
+    return [msg_new_data.message_id, flags, msg_new_data.text]
+
+
+def load_message_new_data(raw_msg_new_data: list) -> MessageNewData:
+    """Deserialize MessageNewData packed with dump_message_new_data."""
+    message_id, flags, text = raw_msg_new_data
+    return MessageNewData(
+        message_id=message_id,
+        remove_markup=bool(flags & MESSAGE_REMOVE_MARKUP),
+        remove=bool(flags & MESSAGE_REMOVE),
+        update_on_completion_only=bool(flags & MESSAGE_UPDATE_ON_COMPLETION_ONLY),
+        text=text,
+    )
+
+
+def _pack_flags(flags: dict[int, bool]) -> int:
+    packed = 0
+    for flag, is_set in flags.items():
+        if is_set:
+            packed |= flag
+    return packed
@@ -0,0 +1,143 @@
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+
+from src.bot.models import StateModel
+from src.bot.serializers import dump_state, load_state
+from src.config import settings
+
+
+class BaseStateBackend(ABC):
+    """
+    Interface of conversation state storage.
+
+    Every save marks the state as touched, expiration and LRU order are based on the last touch.
+    """
+
+    @abstractmethod
+    def load(self, chat_id: int) -> StateModel | None:
+        """Return state by chat_id or None if there is no state."""
+
+    @abstractmethod
+    def save(self, state: StateModel) -> None:
+        """Create or replace state of state.chat_id."""
+
+    @abstractmethod
+    def delete(self, chat_id: int) -> None:
+        """Delete state by chat_id if it exists."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return number of stored states."""
+
+    @abstractmethod
+    def expired_chat_ids(self, deadline: float) -> list[int]:
+        """Return ids of chats whose state was last touched before the deadline timestamp."""
+
+    @abstractmethod
+    def least_recent_chat_ids(self, limit: int) -> list[int]:
+        """Return ids of up to limit least recently touched chats, oldest first."""
+
+
+class InMemoryStateBackend(BaseStateBackend):
+    """Process-local state storage, states are lost on restart."""
+
+    def __init__(self) -> None:
+        self.states: dict[int, StateModel] = {}
+        self.touched_at: OrderedDict[int, float] = OrderedDict()
+
+    def load(self, chat_id: int) -> StateModel | None:
+        """Return state by chat_id or None if there is no state."""
+        return self.states.get(chat_id)
+
+    def save(self, state: StateModel) -> None:
+        """Create or replace state of state.chat_id."""
+        self.states[state.chat_id] = state
+        self.touched_at[state.chat_id] = time.time()
+        self.touched_at.move_to_end(state.chat_id)
+
+    def delete(self, chat_id: int) -> None:
+        """Delete state by chat_id if it exists."""
+        self.states.pop(chat_id, None)
+        self.touched_at.pop(chat_id, None)
+
+    def count(self) -> int:
+        """Return number of stored states."""
+        return len(self.states)
+
+    def expired_chat_ids(self, deadline: float) -> list[int]:
+        """Return ids of chats whose state was last touched before the deadline timestamp."""
+        expired = []
+        for chat_id, touched_at in self.touched_at.items():
+            if touched_at >= deadline:
+                break
+            expired.append(chat_id)
+        return expired
+
+    def least_recent_chat_ids(self, limit: int) -> list[int]:
+        """Return ids of up to limit least recently touched chats, oldest first."""
+        return list(islice(self.touched_at, limit))
+
+
+class SQLiteStateBackend(BaseStateBackend):
+    """
+    Durable state storage in a SQLite file.
+
+    States survive restarts and are shared by all bot workers that have access to the file.
+    The database works in WAL mode, so readers of one worker don't block writers of another.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS bot_state '
+            + '(chat_id INTEGER PRIMARY KEY, data BLOB NOT NULL, touched_at REAL NOT NULL)',
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS bot_state_touched_at ON bot_state (touched_at)')
+
+    def load(self, chat_id: int) -> StateModel | None:
+        """Return state by chat_id or None if there is no state."""
+        row = self.connection.execute('SELECT data FROM bot_state WHERE chat_id = ?', (chat_id,)).fetchone()
+        return load_state(row[0]) if row is not None else None
+
+    def save(self, state: StateModel) -> None:
+        """Create or replace state of state.chat_id."""
+        self.connection.execute(
+            'INSERT OR REPLACE INTO bot_state (chat_id, data, touched_at) VALUES (?, ?, ?)',
+            (state.chat_id, dump_state(state), time.time()),
+        )
+
+    def delete(self, chat_id: int) -> None:
+        """Delete state by chat_id if it exists."""
+        self.connection.execute('DELETE FROM bot_state WHERE chat_id = ?', (chat_id,))
+
+    def count(self) -> int:
+        """Return number of stored states."""
+        return self.connection.execute('SELECT COUNT(*) FROM bot_state').fetchone()[0]
+
+    def expired_chat_ids(self, deadline: float) -> list[int]:
+        """Return ids of chats whose state was last touched before the deadline timestamp."""
+        rows = self.connection.execute('SELECT chat_id FROM bot_state WHERE touched_at < ?', (deadline,))
+        return [row[0] for row in rows]
+
+    def least_recent_chat_ids(self, limit: int) -> list[int]:
+        """Return ids of up to limit least recently touched chats, oldest first."""
+        rows = self.connection.execute('SELECT chat_id FROM bot_state ORDER BY touched_at LIMIT ?', (limit,))
+        return [row[0] for row in rows]
+
+
+@lru_cache()
+def get_state_backend() -> BaseStateBackend:
+    """Create and return state backend configured in settings."""
+    match settings.BOT_STATE_BACKEND:
+        case 'memory':
+            return InMemoryStateBackend()
+        case 'sqlite':
+            return SQLiteStateBackend(settings.BOT_STATE_SQLITE_PATH)
+        case _:
+            raise ValueError(f'State backend "{settings.BOT_STATE_BACKEND}" is unavailable.')
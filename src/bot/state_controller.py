@@ -1,51 +1,70 @@
+import time
+from collections import Counter
 from typing import Any
-from uuid import UUID
 
-from src.bot.models import StateModel, MessageNewData, ProcessPhase
+from src.apps.manager.sampler import TeamSampler
+from src.bot.models import StateModel, MessageNewData, ProcessPhase, UNSET, Unset
+from src.bot.state_backends import BaseStateBackend, get_state_backend
+from src.config import settings
 
 
 class StateController:
     """Interface of State object."""
 
-    def __init__(self) -> None:
-        self.state: dict[int, StateModel] = {}
+    def __init__(
+        self,
+        backend: BaseStateBackend | None = None,
+        ttl: int = settings.BOT_STATE_TTL_SECONDS,
+        max_size: int = settings.BOT_STATE_MAX_SIZE,
+    ) -> None:
+        self.backend = backend if backend is not None else get_state_backend()
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.evictions: Counter[str] = Counter()
+        self._evicted_states: list[StateModel] = []
 
     def create_state(self, chat_id: int, state: StateModel) -> None:
         """Create new state by chat_id."""
-        self.state[chat_id] = state
+        self.backend.save(state)
+
+        overflow = self.backend.count() - self.max_size
+        if overflow > 0:
+            self._evict(self.backend.least_recent_chat_ids(overflow), reason='lru')
 
     def get_state(self, chat_id: int) -> StateModel:
         """Return state object by chat_id."""
-        return self.state.get(chat_id)
+        return self.backend.load(chat_id)
 
     def update_state(
         self,
         chat_id: int,
-        process_phase: ProcessPhase | None = None,
-        is_query: bool | None = None,
-        teams_by_filter_ids: list[UUID] | None = None,
-        payload: Any | None = None,
-        is_complete: bool | None = None,
+        process_phase: ProcessPhase | Unset = UNSET,
+        is_query: bool | Unset = UNSET,
+        team_sampler: TeamSampler | None | Unset = UNSET,
+        payload: Any | Unset = UNSET,
+        is_complete: bool | Unset = UNSET,
     ) -> None:
-        """Update state by chat_id."""
-        current_state = self.state.pop(chat_id)
-        new_state = StateModel(
-            chat_id=chat_id,
-            process_name=current_state.process_name,
-            process_phase=process_phase if process_phase else current_state.process_phase,
-            is_query=is_query if is_query else current_state.is_query,
-            payload=payload if payload else current_state.payload,
-            teams_by_filter_ids=teams_by_filter_ids if teams_by_filter_ids else current_state.teams_by_filter_ids,
-            messages_to_update=current_state.messages_to_update,
-            is_complete=is_complete if is_complete else current_state.is_complete,
-        )
-
-        self.create_state(chat_id, new_state)
+        """Update state by chat_id in place, every passed argument is applied even if it is None or False."""
+        state = self.backend.load(chat_id)
+        changes = {
+            'process_phase': process_phase,
+            'is_query': is_query,
+            'team_sampler': team_sampler,
+            'payload': payload,
+            'is_complete': is_complete,
+        }
+        for field_name, field_value in changes.items():
+            if field_value is not UNSET:
+                setattr(state, field_name, field_value)
+
+        self.backend.save(state)
 
     def add_messages_to_update(self, chat_id: int, *data_objects: MessageNewData) -> None:
         """Add MessageNewData objects to messages_to_update."""
         state = self.get_state(chat_id)
         state.messages_to_update.update({new_data.message_id: new_data for new_data in data_objects})
+        self.backend.save(state)
 
     def remove_messages_from_update(self, chat_id: int, *messages_ids: int) -> None:
         """Remove MessageNewData objects from messages_to_update."""
@@ -55,7 +74,26 @@ class StateController:
             messages_to_update.pop(message_id)
 
         state.messages_to_update = messages_to_update
+        self.backend.save(state)
 
     def delete_state(self, chat_id: int) -> None:
         """Delete state by chat_id."""
-        self.state.pop(chat_id)
+        self.backend.delete(chat_id)
+
+    def evict_states(self) -> list[StateModel]:
+        """Delete states untouched for longer than ttl and return them with states evicted by the size cap."""
+        self._evict(self.backend.expired_chat_ids(time.time() - self.ttl), reason='ttl')
+
+        evicted_states = self._evicted_states
+        self._evicted_states = []
+        return evicted_states
+
+    def _evict(self, chat_ids: list[int], reason: str) -> None:
+        for chat_id in chat_ids:
+            state = self.backend.load(chat_id)
+            if state is None:
+                continue
+
+            self.backend.delete(chat_id)
+            self._evicted_states.append(state)
+            self.evictions[reason] += 1
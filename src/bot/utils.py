@@ -1,42 +1,52 @@
+from functools import lru_cache
+from itertools import batched
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, User as TelegramUser
 
 from src.apps.manager.models import CustomUser as InternalUser
+from src.apps.manager.user_cache import get_user_cache
+from src.bot.models import KeyboardTier
 from src.language.manager import get_bot_phrases
 from src.language.models import BotPhrases
 
 
 async def build_main_reply_keyboard(internal_user: InternalUser | None, bot_phrases: BotPhrases) -> ReplyKeyboardMarkup:
-    """Generate main reply keyboard with base bot functionality."""
-    registration_btn = KeyboardButton(text=bot_phrases.registrate_btn)
-    generate_teams_btn = KeyboardButton(text=bot_phrases.generate_teams_btn)
-    create_tournament_btn = KeyboardButton(text=bot_phrases.create_tournament_btn)
-    get_team_btn = KeyboardButton(text=bot_phrases.get_team_btn)
-    get_tournament_table_btn = KeyboardButton(text=bot_phrases.get_tournament_table_btn)
-    get_last_games_btn = KeyboardButton(text=bot_phrases.get_last_games_btn)
-    get_future_games_btn = KeyboardButton(text=bot_phrases.get_future_games_btn)
-    get_site_link = KeyboardButton(text=bot_phrases.get_site_link_btn)
-
-    all_buttons = [generate_teams_btn]
-    if internal_user is not None:
+    """Return main reply keyboard with base bot functionality available to the user."""
+    if internal_user is None:
+        tier = KeyboardTier.UNREGISTERED
+    elif await get_user_cache().ahas_active_tournaments(internal_user):
+        tier = KeyboardTier.TOURNAMENT_PARTICIPANT
+    else:
+        tier = KeyboardTier.REGISTERED
+
+    return get_main_reply_keyboard(bot_phrases.language_code, tier)
+
+
+@lru_cache()
+def get_main_reply_keyboard(language_code: str, tier: KeyboardTier) -> ReplyKeyboardMarkup:
+    """Build main reply keyboard once per language and user tier, the markup is immutable and shared."""
+    bot_phrases = get_bot_phrases(language_code)
+
+    all_buttons = [KeyboardButton(text=bot_phrases.generate_teams_btn)]
+    if tier == KeyboardTier.UNREGISTERED:
+        all_buttons.insert(0, KeyboardButton(text=bot_phrases.registrate_btn))
+    else:
         all_buttons.extend(
             [
-                create_tournament_btn,
-                get_site_link,
+                KeyboardButton(text=bot_phrases.create_tournament_btn),
+                KeyboardButton(text=bot_phrases.get_site_link_btn),
             ],
         )
 
-        is_there_are_active_tournaments = await internal_user.tournaments.filter(is_active=True).aexists()
-        if is_there_are_active_tournaments:
-            all_buttons.extend(
-                [
-                    get_team_btn,
-                    get_tournament_table_btn,
-                    get_last_games_btn,
-                    get_future_games_btn,
-                ],
-            )
-    else:
-        all_buttons.insert(0, registration_btn)
+    if tier == KeyboardTier.TOURNAMENT_PARTICIPANT:
+        all_buttons.extend(
+            [
+                KeyboardButton(text=bot_phrases.get_team_btn),
+                KeyboardButton(text=bot_phrases.get_tournament_table_btn),
+                KeyboardButton(text=bot_phrases.get_last_games_btn),
+                KeyboardButton(text=bot_phrases.get_future_games_btn),
+            ],
+        )
 
     return ReplyKeyboardMarkup(
         keyboard=_format_buttons(all_buttons),
@@ -66,17 +76,9 @@ def digit_to_emoji(number: int) -> str:
 async def get_internal_user_with_language_pack(telegram_user: TelegramUser) -> tuple[InternalUser, BotPhrases]:
     """Find and return InternalUser and BotPhrases."""
     bot_phrases = get_bot_phrases(telegram_user.language_code)
-    internal_user = await InternalUser.objects.filter(telegram_username=telegram_user.username).afirst()
-    return internal_user, bot_phrases
-
-
-def _format_buttons(all_buttons: list[KeyboardButton]) -> list[list[KeyboardButton]]:
-    formated_buttons = []
-    while all_buttons:
-        buttons_line = all_buttons[:2]
-        for btn in buttons_line:
-            all_buttons.remove(btn)
+    cached_user = await get_user_cache().aget(telegram_user.id, telegram_user.username)
+    return cached_user.user, bot_phrases
 
-        formated_buttons.append(buttons_line)
 
-    return formated_buttons
+def _format_buttons(all_buttons: list[KeyboardButton], row_size: int = 2) -> list[list[KeyboardButton]]:
+    return [list(buttons_line) for buttons_line in batched(all_buttons, row_size)]
@@ -5,3 +5,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.config.settings')
 
 application = get_asgi_application()
+
+from src.config import settings  # noqa: E402
+from src.utils.enums import BotUpdatesMode  # noqa: E402
+
+if settings.BOT_UPDATES_MODE == BotUpdatesMode.WEBHOOK:
+    from src.api.bot.webhook import WebhookApplication  # noqa: WPS433
+
+    application = WebhookApplication(application)
@@ -2,7 +2,11 @@ import logging
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+from src.utils.enums import BotUpdatesMode, TeamDrawRendering
 from src.utils.log_formatter import FormatterMode
+from src.utils.log_queue import OverflowPolicy
 
 # --- App settings ---
 
@@ -14,17 +18,67 @@ DEBUG = int(os.getenv('DEBUG'))
 
 LANGUAGE_PACKAGES_PATH = os.getenv('LANGUAGE_PACKAGES_PATH', 'tournament_manager')
 DEFAULT_LANGUAGE: str = os.getenv('DEFAULT_LANGUAGE', 'ru')
+# pickle snapshot of the parsed language packs, it is not used if empty
+LANGUAGE_PACKAGES_CACHE_PATH: str | None = os.getenv('LANGUAGE_PACKAGES_CACHE_PATH') or None
 
 # --- Telegram bot ---
 
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 
+BOT_UPDATES_MODE: BotUpdatesMode = BotUpdatesMode(os.getenv('BOT_UPDATES_MODE', BotUpdatesMode.POLLING.value))
+BOT_WEBHOOK_BASE_URL: str | None = os.getenv('BOT_WEBHOOK_BASE_URL')
+BOT_WEBHOOK_PATH: str = os.getenv('BOT_WEBHOOK_PATH', 'bot/webhook/')
+BOT_WEBHOOK_SECRET: str | None = os.getenv('BOT_WEBHOOK_SECRET')
+if BOT_UPDATES_MODE == BotUpdatesMode.WEBHOOK and not BOT_WEBHOOK_BASE_URL:
+    raise ImproperlyConfigured('BOT_WEBHOOK_BASE_URL is required when BOT_UPDATES_MODE is webhook.')
+
+BOT_STATE_BACKEND: str = os.getenv('BOT_STATE_BACKEND', 'memory')
+BOT_STATE_SQLITE_PATH: str = os.getenv('BOT_STATE_SQLITE_PATH', 'bot_state.sqlite3')
+BOT_STATE_TTL_SECONDS: int = int(os.getenv('BOT_STATE_TTL_SECONDS', 60 * 60))
+BOT_STATE_MAX_SIZE: int = int(os.getenv('BOT_STATE_MAX_SIZE', 10000))
+BOT_STATE_SWEEP_INTERVAL_SECONDS: int = int(os.getenv('BOT_STATE_SWEEP_INTERVAL_SECONDS', 60))
+
+BOT_CHAT_MAX_PENDING_UPDATES: int = int(os.getenv('BOT_CHAT_MAX_PENDING_UPDATES', 10))
+
+BOT_FINALIZATION_CONCURRENCY: int = int(os.getenv('BOT_FINALIZATION_CONCURRENCY', 8))
+BOT_FLOOD_WAIT_MAX_RETRIES: int = int(os.getenv('BOT_FLOOD_WAIT_MAX_RETRIES', 3))
+
+BOT_RATE_LIMIT_ENABLED: bool = bool(int(os.getenv('BOT_RATE_LIMIT_ENABLED', 1)))
+BOT_GLOBAL_RATE_LIMIT: float = float(os.getenv('BOT_GLOBAL_RATE_LIMIT', 30))
+BOT_CHAT_RATE_LIMIT: float = float(os.getenv('BOT_CHAT_RATE_LIMIT', 1))
+BOT_CHAT_BURST: int = int(os.getenv('BOT_CHAT_BURST', 3))
+# edits and deletions of sent messages are limited by the global rate mostly
+BOT_CHAT_BULK_RATE_LIMIT: float = float(os.getenv('BOT_CHAT_BULK_RATE_LIMIT', 20))
+BOT_CHAT_BULK_BURST: int = int(os.getenv('BOT_CHAT_BULK_BURST', 20))
+BOT_COALESCE_MESSAGES: bool = bool(int(os.getenv('BOT_COALESCE_MESSAGES', 1)))
+
+BOT_TEAM_DRAW_RENDERING: TeamDrawRendering = TeamDrawRendering(
+    os.getenv('BOT_TEAM_DRAW_RENDERING', TeamDrawRendering.MESSAGE_PER_PLAYER.value),
+)
+
+# the largest difference of attack, midfield, defense and general stats of balanced teams
+TEAM_BALANCE_TOLERANCE: int = int(os.getenv('TEAM_BALANCE_TOLERANCE', 6))
+# the first teams of a draw are picked with close stats, changes are drawn at random
+TEAM_DRAW_BALANCED: bool = bool(int(os.getenv('TEAM_DRAW_BALANCED', 1)))
+
+USER_CACHE_TTL_SECONDS: int = int(os.getenv('USER_CACHE_TTL_SECONDS', 5 * 60))
+USER_CACHE_MAX_SIZE: int = int(os.getenv('USER_CACHE_MAX_SIZE', 10000))
+# teams imported or edited by another process are seen after this delay
+TEAM_CATALOGUE_TTL_SECONDS: int = int(os.getenv('TEAM_CATALOGUE_TTL_SECONDS', 5 * 60))
+
+METRICS_ENABLED: bool = bool(int(os.getenv('METRICS_ENABLED', 1)))
+METRICS_PATH: str = os.getenv('METRICS_PATH', 'metrics/')
+
 # --- logging ---
 
 LOGGER_NAME: str = os.getenv('LOGGER_NAME', f'{APP_ID}_{APP_ENVIRONMENT}')
 VERBOSE_LOGGER_NAME: str = os.getenv('VERBOSE_LOGGER_NAME', f'{APP_ID}_{APP_ENVIRONMENT}_verbose')
 
 LOGGING_LEVEL: int = logging.DEBUG if DEBUG else logging.INFO
+LOG_SAMPLE_RATE: float = float(os.getenv('LOG_SAMPLE_RATE', '1'))
+LOG_FORMATTER_MODE: FormatterMode = FormatterMode(os.getenv('LOG_FORMATTER_MODE', FormatterMode.COMPACT))
+LOG_QUEUE_SIZE: int = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_QUEUE_OVERFLOW_POLICY: OverflowPolicy = OverflowPolicy(os.getenv('LOG_QUEUE_OVERFLOW_POLICY', OverflowPolicy.DROP))
 
 LOGGING = {
     'version': 1,
@@ -38,7 +92,7 @@ LOGGING = {
         },
         'json_console': {
             '()': 'src.utils.log_formatter.LogFormatter',
-            'formatter_mode': FormatterMode.COMPACT,
+            'formatter_mode': LOG_FORMATTER_MODE,
             'limit_keys_to': ['call_id', 'input_data', 'result', 'function_full_name'],
             'format': '%(asctime)s.%(msecs)03d %(levelname)s %(message)s',
             'datefmt': '%Y-%m-%d %H:%M:%S',
@@ -53,28 +107,46 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'json_console',
         },
+        'queued_console': {
+            'class': 'src.utils.log_queue.LogQueueHandler',
+            'handlers': ['console'],
+            'queue': {
+                '()': 'src.utils.log_queue.LogQueue',
+                'maxsize': LOG_QUEUE_SIZE,
+                'overflow_policy': LOG_QUEUE_OVERFLOW_POLICY,
+            },
+        },
+        'queued_json_console': {
+            'class': 'src.utils.log_queue.LogQueueHandler',
+            'handlers': ['json_console'],
+            'queue': {
+                '()': 'src.utils.log_queue.LogQueue',
+                'maxsize': LOG_QUEUE_SIZE,
+                'overflow_policy': LOG_QUEUE_OVERFLOW_POLICY,
+            },
+        },
     },
     'loggers': {
         'root': {
             'level': LOGGING_LEVEL,
-            'handlers': ['console'],
+            'handlers': ['queued_console'],
             'propagate': True,
         },
         VERBOSE_LOGGER_NAME: {
             'level': LOGGING_LEVEL,
-            'handlers': ['json_console'],
+            'handlers': ['queued_json_console'],
         },
         LOGGER_NAME: {
             'level': LOGGING_LEVEL,
-            'handlers': ['console'],
+            'handlers': ['queued_console'],
         },
         'django.server': {
             'level': LOGGING_LEVEL,
-            'handlers': ['console'],
+            'handlers': ['queued_console'],
         },
         'uvicorn': {
             'level': LOGGING_LEVEL,
-            'handlers': ['console'],
+            'handlers': ['queued_console'],
         },
     },
 }
@@ -127,14 +199,38 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'src.config.wsgi.application'
 
+# connections are taken from a psycopg pool, without it every update opens and closes its own connection
+DB_POOL_ENABLED: bool = bool(int(os.getenv('DB_POOL_ENABLED', 1)))
+DB_POOL_MIN_SIZE: int = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE: int = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', 10))
+DB_POOL_MAX_IDLE_SECONDS: float = float(os.getenv('DB_POOL_MAX_IDLE_SECONDS', 5 * 60))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'src.utils.postgresql',
         'NAME': 'postgres',
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': int(os.getenv('DB_PORT')),
+        # the ORM calls of every update run in a thread of its own, which ends with the update,
+        # so connections are never persistent: pooled ones are returned to the pool, direct ones are closed
+        'CONN_MAX_AGE': 0,
+        # the pool checks a connection before giving it out
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': (
+                {
+                    'min_size': DB_POOL_MIN_SIZE,
+                    'max_size': DB_POOL_MAX_SIZE,
+                    'timeout': DB_POOL_TIMEOUT_SECONDS,
+                    'max_idle': DB_POOL_MAX_IDLE_SECONDS,
+                }
+                if DB_POOL_ENABLED
+                else False
+            ),
+        },
     },
 }
 
@@ -2,8 +2,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
 
+from src.api.v1 import views
 from src.config import settings
 
 urlpatterns = [
     path('admin/', admin.site.urls),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path(settings.METRICS_PATH, views.metrics))
@@ -1,61 +1,163 @@
 import os
+import pickle  # noqa: S403
+from dataclasses import dataclass
 from functools import lru_cache
-from typing import List
+from types import MappingProxyType
+from typing import List, Mapping
 
 import yaml
-from django.conf import settings
 
-from src.config.settings import LANGUAGE_PACKAGES_PATH
+from src.config import settings
 from src.language.models import BotPhrases, BotRepresentation
 
+PACKAGES_NAMES = ('bot_phrases', 'bot_representation')
+
+# distinct language codes sent by Telegram are many, but they are normalized to a few available ones
+LANGUAGE_CODES_CACHE_SIZE = 256
+
+PACKAGES_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class LanguagePacks:
+    """Validated language packs of a language."""
+
+    bot_phrases: BotPhrases
+    bot_representation: BotRepresentation
+
+
+class LanguageRegistry:
+    """Immutable language packs of all available languages by normalized language code."""
+
+    def __init__(self, packs: Mapping[str, LanguagePacks], default_language_code: str) -> None:
+        if default_language_code not in packs:
+            raise ValueError(f'Default language "{default_language_code}" has no language packs.')
+
+        self.packs = MappingProxyType(dict(packs))
+        self.default_language_code = default_language_code
+
+    @property
+    def languages_codes(self) -> tuple[str, ...]:
+        """Return available language codes."""
+        return tuple(self.packs)
+
+    def get(self, language_code: str | None) -> LanguagePacks:
+        """Return packs of the language, packs of the default language if it is not available."""
+        return self.packs.get(normalize_language_code(language_code), self.packs[self.default_language_code])
+
+
+def normalize_language_code(language_code: str | None) -> str | None:
+    """Return primary language subtag in lower case, for example "en" for "en-US"."""
+    if not language_code:
+        return None
+    return language_code.replace('_', '-').split('-', maxsplit=1)[0].strip().lower()
+
+
+def load_language_registry(
+    packages_path: str = settings.LANGUAGE_PACKAGES_PATH,
+    cache_path: str | None = settings.LANGUAGE_PACKAGES_CACHE_PATH,
+) -> LanguageRegistry:
+    """
+    Load and validate language packs of all languages in the packages directory.
+
+    If cache_path is set, parsed YAML files are kept in a pickle snapshot and parsed again only after any of them
+    changes, so the cache file must be writable by the bot only.
+    """
+    files_key = _get_files_key(packages_path)
+    packages_data = _load_cached_packages(cache_path, files_key) if cache_path else None
+    if packages_data is None:
+        packages_data = {
+            normalize_language_code(language_code): {
+                package_name: _get_language_pack(packages_path, language_code, package_name)
+                for package_name in PACKAGES_NAMES
+            }
+            for language_code in _get_packages_languages_codes(packages_path)
+        }
+        if cache_path:
+            _save_cached_packages(cache_path, files_key, packages_data)
+
+    packs = {
+        language_code: LanguagePacks(
+            bot_phrases=BotPhrases(language_code=language_code, **language_data['bot_phrases']),
+            bot_representation=BotRepresentation(language_code=language_code, **language_data['bot_representation']),
+        )
+        for language_code, language_data in packages_data.items()
+    }
+    return LanguageRegistry(packs, default_language_code=normalize_language_code(settings.DEFAULT_LANGUAGE))
+
+
+@lru_cache()
+def get_language_registry() -> LanguageRegistry:
+    """Load and return Language Registry."""
+    return load_language_registry()
+
 
 def get_available_languages_codes() -> List[str]:
     """Return a list of available language codes."""
-    return os.listdir(LANGUAGE_PACKAGES_PATH)
+    return list(get_language_registry().languages_codes)
 
 
-@lru_cache()
+@lru_cache(maxsize=LANGUAGE_CODES_CACHE_SIZE)
 def get_bot_phrases(language_code: str | None) -> BotPhrases:
     """
-    Builds and returns an BotPhrases object with bot phrases in the specified language, if any.
+    Return BotPhrases object with bot phrases in the specified language, if any.
 
     By default, the language is Russian.
     """
-    _language_code = _get_language_code(language_code)
-    package_yaml = _get_language_pack(
-        language_code=_language_code,
-        package_name='bot_phrases',
-    )
+    return get_language_registry().get(language_code).bot_phrases
 
-    return BotPhrases(language_code=_language_code, **package_yaml)
 
-
-@lru_cache()
+@lru_cache(maxsize=LANGUAGE_CODES_CACHE_SIZE)
 def get_bot_representation_pack(language_code: str | None) -> BotRepresentation:
     """
-    Builds and returns an BotCommandsRepresentation object with bot phrases in the specified language, if any.
+    Return BotRepresentation object with bot description and commands in the specified language, if any.
 
     By default, the language is Russian.
     """
-    _language_code = _get_language_code(language_code)
-    package_yaml = _get_language_pack(
-        language_code=_language_code,
-        package_name='bot_representation',
-    )
-    return BotRepresentation(
-        language_code=_language_code,
-        **package_yaml,
+    return get_language_registry().get(language_code).bot_representation
+
+
+def _get_packages_languages_codes(packages_path: str) -> list[str]:
+    return sorted(
+        language_code
+        for language_code in os.listdir(packages_path)
+        if os.path.isdir(os.path.join(packages_path, language_code))
     )
 
 
-def _get_language_pack(language_code: str, package_name: str) -> dict:
-    with open(os.path.join(LANGUAGE_PACKAGES_PATH, f'{language_code}/{package_name}.yaml'), 'r') as package_obj:
+def _get_language_pack(packages_path: str, language_code: str, package_name: str) -> dict:
+    with open(os.path.join(packages_path, f'{language_code}/{package_name}.yaml'), 'r') as package_obj:
         return yaml.safe_load(package_obj)
 
 
-def _get_language_code(language_code: str | None = 'ru') -> str:
-    available_codes = get_available_languages_codes()
-    if language_code in available_codes:
-        return language_code
+def _get_files_key(packages_path: str) -> tuple:
+    """Return paths and modification times of all package files, the cache is valid while they are the same."""
+    files = []
+    for language_code in _get_packages_languages_codes(packages_path):
+        for package_name in PACKAGES_NAMES:
+            file_stat = os.stat(os.path.join(packages_path, f'{language_code}/{package_name}.yaml'))
+            files.append((language_code, package_name, file_stat.st_mtime_ns, file_stat.st_size))
+    return (PACKAGES_CACHE_VERSION, os.path.abspath(packages_path), tuple(files))
+
+
+def _load_cached_packages(cache_path: str, files_key: tuple) -> dict | None:
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cached_key, packages_data = pickle.load(cache_file)  # noqa: S301
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+
+    return packages_data if cached_key == files_key else None
+
+
+def _save_cached_packages(cache_path: str, files_key: tuple, packages_data: dict) -> None:
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as cache_file:
+            pickle.dump((files_key, packages_data), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # the cache only speeds up the start, the packs are already loaded
+        return
 
-    return settings.DEFAULT_LANGUAGE
+    # the snapshot is replaced at once, so that other processes never read a partially written one
+    os.replace(temporary_path, cache_path)
@@ -51,11 +51,18 @@ class BotPhrases(BaseLanguagePack):
     tc_teams_country_nvrmind_btn: str
     tc_teams_country: str
     tc_change_team_btn: str
+    tc_reroll_player_team_btn: str
+    tc_reroll_is_unavailable: str
     tc_teams_confirm_question: str
     tc_updating_is_unavailable: str
+    tc_not_enough_teams: str
     tc_done: str
     tc_first_round_pairs: str
 
+    tt_no_active_tournaments: str
+    tt_table_header: str
+    tt_table_row: str
+
 
 class BotRepresentation(BaseLanguagePack):
     """Description of the bot."""
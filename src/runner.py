@@ -3,18 +3,15 @@ from importlib import import_module
 
 import uvicorn
 import uvloop
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
 
 from src.api.bot.representation import set_bot_representation
+from src.bot.dispatcher import dispatcher, telegram_bot
 from src.config import settings
+from src.language.manager import get_language_registry
+from src.utils.enums import BotUpdatesMode
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
-dispatcher = Dispatcher()
-
-telegram_bot = Bot(settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode='HTML'))
-
 
 async def main():
     """Run ASGI server with uvicorn and run bot dispatcher."""
@@ -31,11 +28,26 @@ async def main():
 
     await asyncio.gather(server_future, bot_future)
 
+    if settings.BOT_UPDATES_MODE == BotUpdatesMode.WEBHOOK:
+        await dispatcher.emit_shutdown(bot=telegram_bot)
+
 
 async def configure_bot():
-    """Add bot router to dispatcher."""
+    """Load language packs, add bot router to dispatcher and start receiving updates with polling or webhook."""
+    get_language_registry()
     dispatcher.include_router(import_module('src.api.bot.handler').router)
     await set_bot_representation(telegram_bot)
+
+    if settings.BOT_UPDATES_MODE == BotUpdatesMode.WEBHOOK:
+        await telegram_bot.set_webhook(
+            url=f'{settings.BOT_WEBHOOK_BASE_URL.rstrip('/')}/{settings.BOT_WEBHOOK_PATH}',
+            secret_token=settings.BOT_WEBHOOK_SECRET,
+            allowed_updates=dispatcher.resolve_used_update_types(),
+        )
+        await dispatcher.emit_startup(bot=telegram_bot)
+        return
+
+    await telegram_bot.delete_webhook()
     await dispatcher.start_polling(telegram_bot)
 
 
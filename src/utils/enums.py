@@ -1,4 +1,4 @@
-from enum import IntEnum
+from enum import Enum, IntEnum
 
 
 class ChoiceEnum(IntEnum):
@@ -64,3 +64,17 @@ class FIFAVersion(ChoiceEnum):
     FIFA23 = 23
     FIFA24 = 24
     FIFA25 = 25
+
+
+class BotUpdatesMode(str, Enum):
+    """Ways of receiving updates from Telegram."""
+
+    POLLING = 'polling'
+    WEBHOOK = 'webhook'
+
+
+class TeamDrawRendering(str, Enum):
+    """Ways of sending the drawn teams to a chat."""
+
+    MESSAGE_PER_PLAYER = 'message_per_player'
+    SINGLE_MESSAGE = 'single_message'
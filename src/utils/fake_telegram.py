@@ -0,0 +1,281 @@
+import asyncio
+import itertools
+import time
+from collections import Counter, defaultdict, deque
+from importlib import import_module
+from typing import Any, AsyncGenerator, Callable, Sequence, get_args
+
+import ujson
+from aiogram import Bot
+from aiohttp import web
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Message
+
+from src.language.models import BotPhrases
+
+FAKE_USERNAME_PREFIX = 'fake_user_'
+FAKE_BOT_ID = 1
+
+RATE_LIMIT_WINDOW_SECONDS = 1
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Bot session which answers all Bot API methods locally without network.
+
+    Methods returning messages get a new message with a unique id, all other methods succeed with True.
+    Every request is counted by method name and sent texts are kept by chat in order,
+    optional latency emulates the round-trip to Telegram.
+    """
+
+    def __init__(self, latency: float = 0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.sent_texts: defaultdict[int, list[str]] = defaultdict(list)
+        self._message_ids = itertools.count(1)
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        """Return a successful response to the method."""
+        self.requests[method.__api_method__] += 1
+        if isinstance(method, SendMessage):
+            self.sent_texts[method.chat_id].append(method.text)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        result = self._build_message(method) if _returns_message(method) else True
+        content = ujson.dumps({'ok': True, 'result': result})
+        return self.check_response(bot=bot, method=method, status_code=200, content=content).result
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        """Return empty content."""
+        yield b''
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+    def _build_message(self, method: TelegramMethod) -> dict:
+        chat_id = getattr(method, 'chat_id', None) or 0
+        return {
+            'message_id': getattr(method, 'message_id', None) or next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': getattr(method, 'text', None) or '',
+        }
+
+
+class FakeBotAPIServer:
+    """
+    Local HTTP server of the Bot API which enforces Telegram rate limits.
+
+    Every chat may get chat_limit requests and all chats together global_limit requests in a second,
+    requests above the limits are answered with 429 and retry_after like Telegram does.
+    """
+
+    def __init__(self, global_limit: int = 30, chat_limit: int = 3, retry_after: int = 1) -> None:
+        self.global_limit = global_limit
+        self.chat_limit = chat_limit
+        self.retry_after = retry_after
+        self.requests: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+        self.received_texts: defaultdict[str, list[str]] = defaultdict(list)
+        self._global_requests: deque[float] = deque()
+        self._chat_requests: defaultdict[str, deque[float]] = defaultdict(deque)
+        self._message_ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start the server and return its base url, a free port is used by default."""
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return f'http://{host}:{self._runner.addresses[0][1]}'
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method_name = request.match_info['method']
+        form_data = await request.post()
+        chat_id = str(form_data.get('chat_id', ''))
+        if not self._take_request(chat_id):
+            self.rejected[method_name] += 1
+            return web.json_response(
+                {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f'Too Many Requests: retry after {self.retry_after}',
+                    'parameters': {'retry_after': self.retry_after},
+                },
+                status=429,
+            )
+
+        self.requests[method_name] += 1
+        result: dict | bool = True
+        if method_name.startswith('send') or method_name.startswith('editMessage'):
+            text = str(form_data.get('text', ''))
+            self.received_texts[chat_id].append(text)
+            result = {
+                'message_id': int(form_data.get('message_id', 0)) or next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': int(chat_id or 0), 'type': 'private'},
+                'text': text,
+            }
+
+        return web.json_response({'ok': True, 'result': result})
+
+    def _take_request(self, chat_id: str) -> bool:
+        """Count the request if it is within the sliding window limits."""
+        now = time.monotonic()
+        windows = [(self._global_requests, self.global_limit)]
+        if chat_id:
+            windows.append((self._chat_requests[chat_id], self.chat_limit))
+
+        for window_requests, limit in windows:
+            while window_requests and window_requests[0] <= now - RATE_LIMIT_WINDOW_SECONDS:
+                window_requests.popleft()
+            if len(window_requests) >= limit:
+                return False
+
+        for accepted_requests, _ in windows:
+            accepted_requests.append(now)
+        return True
+
+
+def build_message_update(update_id: int, chat_id: int, text: str, language_code: str = 'ru') -> dict:
+    """Return raw update with a text message from a private chat."""
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': _build_user(chat_id, language_code),
+            'text': text,
+        },
+    }
+
+
+def build_callback_query_update(
+    update_id: int,
+    chat_id: int,
+    data: str,
+    message_text: str = '',
+    language_code: str = 'ru',
+) -> dict:
+    """Return raw update with a callback query from a private chat."""
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'chat_instance': str(chat_id),
+            'from': _build_user(chat_id, language_code),
+            'data': data,
+            'message': {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': FAKE_BOT_ID, 'is_bot': True, 'first_name': 'Fake bot', 'username': 'fake_bot'},
+                'text': message_text,
+            },
+        },
+    }
+
+
+def use_fake_session(latency: float = 0) -> FakeTelegramSession:
+    """Replace the session of the bot with a fake one and include the bot router into the dispatcher once."""
+    from src.bot.dispatcher import dispatcher, telegram_bot  # noqa: WPS433
+
+    session = FakeTelegramSession(latency=latency)
+    telegram_bot.session = session
+    handler_router = import_module('src.api.bot.handler').router
+    if handler_router.parent_router is None:
+        dispatcher.include_router(handler_router)
+    return session
+
+
+def build_conversation_updates(chats_ids: Sequence[int], bot_phrases: BotPhrases) -> list[list[dict]]:
+    """Return updates of a team choosing conversation grouped by step, one update per chat in each step."""
+    steps = [
+        lambda update_id, chat_id: build_message_update(update_id, chat_id, bot_phrases.generate_teams_btn),
+        lambda update_id, chat_id: build_callback_query_update(update_id, chat_id, 'number:2'),
+        lambda update_id, chat_id: build_callback_query_update(update_id, chat_id, 'number:3.0'),
+        lambda update_id, chat_id: build_callback_query_update(update_id, chat_id, f'question:{bot_phrases.yes_btn}'),
+    ]
+    return [
+        [build_update(step_number * len(chats_ids) + index, chat_id) for index, chat_id in enumerate(chats_ids)]
+        for step_number, build_update in enumerate(steps)
+    ]
+
+
+async def post_to_asgi(
+    application: Callable,
+    path: str,
+    body: bytes,
+    headers: dict[str, str] | None = None,
+) -> int:
+    """Send POST request to ASGI application in-process and return response status."""
+    request_headers = [(b'host', b'localhost'), (b'content-type', b'application/json')]
+    request_headers.extend((key.lower().encode(), header.encode()) for key, header in (headers or {}).items())
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': request_headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    response: dict[str, Any] = {}
+    is_response_sent = asyncio.Event()
+    request_messages = iter([{'type': 'http.request', 'body': body, 'more_body': False}])
+
+    async def receive() -> dict:
+        message = next(request_messages, None)
+        if message is not None:
+            return message
+
+        await is_response_sent.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif not message.get('more_body'):
+            is_response_sent.set()
+
+    await application(scope, receive, send)
+    return response['status']
+
+
+def _returns_message(method: TelegramMethod) -> bool:
+    returning = method.__returning__
+    return returning is Message or Message in get_args(returning)
+
+
+def _build_user(user_id: int, language_code: str) -> dict:
+    return {
+        'id': user_id,
+        'is_bot': False,
+        'first_name': f'Fake {user_id}',
+        'username': f'{FAKE_USERNAME_PREFIX}{user_id}',
+        'language_code': language_code,
+    }
@@ -1,8 +1,10 @@
 import inspect
 import logging
+import random
 import re
 import time
 from copy import deepcopy
+from functools import lru_cache
 from types import FunctionType
 from typing import Any, Callable, Iterable
 from uuid import uuid1
@@ -33,61 +35,73 @@ def async_log(
     hide_output: bool = False,
     enable_return_log: bool = True,
     hidden_params: Iterable = (),
+    sample_rate: float = settings.LOG_SAMPLE_RATE,
 ) -> Callable:
     """
     Decorator to trace function calls in logs.
 
     It logs function call, function return and any exceptions with separate log records.
     This high-level function is needed to pass additional parameters and customise _log behavior.
+    Calls are traced only if the level is enabled and the call gets into the sample, exceptions are always logged.
     """
 
-    @decorator
-    async def _log(wrapped: FunctionType, instance: Any, args: tuple[Any], kwargs: dict[str, Any]) -> Any:
-        """Actual implementation of the above decorator."""
-        func_name = wrapped.__qualname__
-        function_full_name = f'{wrapped.__module__}.{func_name}'
-        extra = {
-            'call_id': uuid1().hex,
-            'function': func_name,
-            'function_full_name': function_full_name,
-        }
+    def _decorate(func: FunctionType) -> Callable:
+        params = get_arg_spec(func)
+        func_name = func.__qualname__
+        function_full_name = f'{func.__module__}.{func_name}'
+
+        @decorator
+        async def _log(wrapped: FunctionType, instance: Any, args: tuple[Any], kwargs: dict[str, Any]) -> Any:
+            """Actual implementation of the above decorator."""
+            is_traced = logger_inst.isEnabledFor(lvl) and (sample_rate >= 1 or random.random() < sample_rate)
+            extra = {'function': func_name, 'function_full_name': function_full_name}
+
+            try:
+                if not is_traced:
+                    return await wrapped(*args, **kwargs)
+
+                extra['call_id'] = uuid1().hex
+                start_time = time.time()
+                extra['input_data'] = get_logged_args(
+                    params,
+                    [instance] + list(args) if instance else args,
+                    kwargs,
+                    hidden_params,
+                )
+
+                logger_inst.log(
+                    level=lvl,
+                    msg=f'call {func_name}',
+                    extra=extra,
+                )
+
+                result = await wrapped(*args, **kwargs)
+
+                if not enable_return_log:
+                    return result
+
+                extra['result'] = HIDDEN_VALUE if hide_output else normalize_for_log(result)
+                extra['execution_time_ms'] = int((time.time() - start_time) * 1000)
+
+                logger_inst.log(level=lvl, msg=f'return {func_name}', extra=extra)
 
-        try:
-            params = inspect.getfullargspec(wrapped)
-            start_time = time.time()
-            extra['input_data'] = get_logged_args(
-                params,
-                [instance] + list(args) if instance else args,
-                kwargs,
-                hidden_params,
-            )
-
-            logger_inst.log(
-                level=lvl,
-                msg=f'call {func_name}',
-                extra=extra,
-            )
-
-            result = await wrapped(*args, **kwargs)
-
-            if not enable_return_log:
                 return result
+            except Exception as e:
+                logger_inst.exception(f'error in {func_name}', extra=extra)
 
-            extra['result'] = HIDDEN_VALUE if hide_output else normalize_for_log(result)
-            extra['execution_time_ms'] = int((time.time() - start_time) * 1000)
+                if hasattr(e, 'return_value'):
+                    return e.return_value
 
-            logger_inst.log(level=lvl, msg=f'return {func_name}', extra=extra)
+                raise e
 
-            return result
-        except Exception as e:
-            logger_inst.exception(f'error in {func_name}', extra=extra if extra is not None else {})
+        return _log(func)
 
-            if hasattr(e, 'return_value'):
-                return e.return_value
+    return _decorate
 
-            raise e
 
-    return _log
+def get_arg_spec(func: Callable) -> inspect.FullArgSpec:
+    """Return arguments specification of the function, bound methods share the specification of their function."""
+    return _get_function_arg_spec(getattr(func, '__func__', func))
 
 
 # fmt: off
@@ -140,6 +154,11 @@ def normalize_for_log(value: Any) -> Any:
     return _get_log_repr(value)
 
 
+@lru_cache(maxsize=None)
+def _get_function_arg_spec(func: Callable) -> inspect.FullArgSpec:
+    return inspect.getfullargspec(func)
+
+
 def _get_log_repr(value: Any) -> Any:
     """Cast value of complex type to a primitive type."""
     if inspect.isclass(value):
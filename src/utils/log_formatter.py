@@ -1,12 +1,17 @@
 import logging
 from enum import Enum
-from typing import Iterable
-from copy import deepcopy
+from typing import Any, Iterable
 
 import ujson
 
 DEFAULT_MAX_LOG_LENGTH = 32000
 
+DEFAULT_MAX_FIELD_LENGTH = 2000
+
+SCALAR_LENGTH = 8
+
+TRUNCATION_MARK = '...'
+
 DEFAULT_SEPARATOR = f'\n\n{'=' * 50}\n\n'
 
 
@@ -15,6 +20,7 @@ class FormatterMode(str, Enum):
 
     COMPACT = 'compact'
     VERBOSE = 'verbose'
+    JSON = 'json'
 
 
 class LogFormatter(logging.Formatter):
@@ -26,6 +32,7 @@ class LogFormatter(logging.Formatter):
         limit_keys_to: Iterable | None = ('input_data', 'result'),
         max_length: int | None = DEFAULT_MAX_LOG_LENGTH,
         separator: str = DEFAULT_SEPARATOR,
+        max_field_length: int = DEFAULT_MAX_FIELD_LENGTH,
         **kwargs,
     ):
         super(LogFormatter, self).__init__(**kwargs)  # noqa: WPS608
@@ -33,6 +40,7 @@ class LogFormatter(logging.Formatter):
         available_formatters = {
             FormatterMode.COMPACT: self.compact_formatter,
             FormatterMode.VERBOSE: self.verbose_formatter,
+            FormatterMode.JSON: self.json_formatter,
         }
         self.selected_formatter = available_formatters.get(formatter_mode)
         if self.selected_formatter is None:
@@ -41,6 +49,7 @@ class LogFormatter(logging.Formatter):
         self.limit_keys_to = limit_keys_to
         self.max_length = max_length
         self.separator = separator
+        self.max_field_length = max_field_length
 
     def format(self, record: logging.LogRecord) -> str:
         """Converts log record to readable string."""
@@ -50,43 +59,84 @@ class LogFormatter(logging.Formatter):
         """Converts log record to single-line compact readable string for console output."""
         formatted = super(LogFormatter, self).format(record)  # noqa: WPS608
 
-        record_data = record.__dict__
-        if self.limit_keys_to is None:
-            extra = deepcopy(record_data)
-        else:
-            extra = {}
-            for key in self.limit_keys_to:
-                if key not in record_data:
-                    continue
-
-                value = record_data.get(key)
-                extra[key] = value
-
-        return self._strip_message_if_needed(f'{formatted} {extra}')
+        return self._strip_message_if_needed(f'{formatted} {self._get_logged_items(record)}')
 
     def verbose_formatter(self, record: logging.LogRecord) -> str:
         """Converts log record to multi-line verbose readable string for log storage."""
-        record_data = record.__dict__
-
-        result = record_data.get('msg', '')
-        result += '\n' * 2
-
-        for i, j in record_data.items():
-            if (self.limit_keys_to is not None) and (i not in self.limit_keys_to):
-                continue
+        parts = [str(record.msg), '\n' * 2]
 
+        for key, value in self._get_logged_items(record).items():
             try:
-                prepared_value = ujson.dumps(j, indent=2)
+                prepared_value = ujson.dumps(value, indent=2)
             except TypeError:
-                prepared_value = j
+                prepared_value = value
 
-            result += f'{self.separator}{str(i).upper().replace('_', ' ')}:\n{prepared_value}'
+            parts.append(f'{self.separator}{str(key).upper().replace('_', ' ')}:\n{prepared_value}')
 
-        result += self.separator
+        parts.append(self.separator)
 
-        return self._strip_message_if_needed(result)
+        return self._strip_message_if_needed(''.join(parts))
+
+    def json_formatter(self, record: logging.LogRecord) -> str:
+        """Converts log record to single-line JSON, large fields are truncated before the only serialization."""
+        log_data = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': _truncate(record.getMessage(), self.max_field_length),
+        }
+        for key, value in self._get_logged_items(record).items():
+            log_data[key] = _truncate(value, self.max_field_length)
+
+        if record.exc_info:
+            log_data['exception'] = _truncate(self.formatException(record.exc_info), self.max_field_length)
+
+        return ujson.dumps(log_data, ensure_ascii=False, default=str)
+
+    def _get_logged_items(self, record: logging.LogRecord) -> dict:
+        """Return record attributes to log, the record is not copied, as it is formatted only once."""
+        record_data = record.__dict__
+        if self.limit_keys_to is None:
+            return record_data
+
+        return {key: record_data[key] for key in self.limit_keys_to if key in record_data}
 
     def _strip_message_if_needed(self, message):
         if self.max_length is not None and len(message) > self.max_length:
             return f'{message[:self.max_length - 3]}...'
         return message
+
+
+def _truncate(value: Any, max_length: int) -> Any:
+    """Shorten the value, so that strings of the value and its nested items take at most max_length chars."""
+    return _truncate_impl(value, max_length)[0]
+
+
+def _truncate_impl(value: Any, budget: int) -> tuple[Any, int]:
+    """Return shortened value and the remaining budget."""
+    if isinstance(value, str):
+        if len(value) > budget:
+            return value[:budget] + TRUNCATION_MARK, 0
+        return value, budget - len(value)
+
+    if isinstance(value, dict):
+        truncated = {}
+        for key, item in value.items():
+            if budget <= 0:
+                truncated[TRUNCATION_MARK] = f'{len(value) - len(truncated)} more items'
+                break
+            truncated_item, budget = _truncate_impl(item, budget - len(str(key)))
+            truncated[key] = truncated_item
+        return truncated, budget
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        truncated_items = []
+        for element in value:
+            if budget <= 0:
+                truncated_items.append(f'{TRUNCATION_MARK} {len(value) - len(truncated_items)} more items')
+                break
+            truncated_element, budget = _truncate_impl(element, budget)
+            truncated_items.append(truncated_element)
+        return truncated_items, budget
+
+    return value, budget - SCALAR_LENGTH
@@ -0,0 +1,83 @@
+import atexit
+import logging
+import queue
+from enum import Enum
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_QUEUE_SIZE = 10000
+
+started_listeners: list[QueueListener] = []
+
+
+class OverflowPolicy(str, Enum):
+    """What to do with a log record when the queue is full."""
+
+    DROP = 'drop'
+    BLOCK = 'block'
+
+
+class LogQueue(queue.Queue):
+    """Bounded queue of log records which drops new records or blocks the logging thread when it is full."""
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, overflow_policy: OverflowPolicy = OverflowPolicy.DROP):
+        super().__init__(maxsize=maxsize)
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.dropped = 0
+
+    def put_nowait(self, item: logging.LogRecord | None) -> None:
+        """Put the record without waiting if the policy allows, the listener stop sentinel is never dropped."""
+        if item is None or self.overflow_policy == OverflowPolicy.BLOCK:
+            self.put(item)
+            return
+
+        try:
+            super().put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Handler which only puts records to the queue, so that formatting and I/O are done by the listener thread.
+
+    Unlike QueueHandler it does not format records before enqueueing, only the message arguments are merged,
+    so that later changes of the arguments do not affect the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge message arguments into the message."""
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def start_queue_listeners() -> None:
+    """Start listeners of all configured queue handlers and stop them at exit after the queues are drained."""
+    if not started_listeners:
+        atexit.register(stop_queue_listeners)
+
+    for listener in _get_queue_listeners():
+        if listener not in started_listeners:
+            listener.start()
+            started_listeners.append(listener)
+
+
+def stop_queue_listeners() -> None:
+    """Process the remaining records and stop the listeners."""
+    while started_listeners:
+        started_listeners.pop().stop()
+
+
+def _get_queue_listeners() -> list[QueueListener]:
+    loggers = [logging.getLogger()]
+    loggers.extend(logger for logger in logging.root.manager.loggerDict.values() if isinstance(logger, logging.Logger))
+
+    listeners = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            listener = getattr(handler, 'listener', None)
+            if isinstance(handler, QueueHandler) and listener is not None and listener not in listeners:
+                listeners.append(listener)
+
+    return listeners
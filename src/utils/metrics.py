@@ -0,0 +1,172 @@
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metric(ABC):
+    """Base class of in-process metrics with labels."""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        """Return lines of the metric in the text exposition format."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """Return sample lines of the metric, called under the metric lock."""
+
+    def _format_labels(self, label_values: tuple[str, ...], **extra_labels: str) -> str:
+        labels = [*zip(self.label_names, label_values), *extra_labels.items()]
+        if not labels:
+            return ''
+
+        formatted_labels = ','.join(f'{name}="{_escape_label_value(label_value)}"' for name, label_value in labels)
+        return f'{{{formatted_labels}}}'
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase the value of the labels by amount."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        """Return the value of the labels."""
+        return self._values.get(label_values, 0)
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f'{self.name}{self._format_labels(label_values)} {counter_value}'
+            for label_values, counter_value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, with sum and count."""
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per labels: counts of values in every bucket and above the last one, sum of values
+        self._bucket_counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, observed_value: float, *label_values: str) -> None:
+        """Add the value to the distribution of the labels."""
+        bucket_index = bisect.bisect_left(self.buckets, observed_value)
+        with self._lock:
+            bucket_counts = self._bucket_counts.get(label_values)
+            if bucket_counts is None:
+                bucket_counts = [0 for _ in range(len(self.buckets) + 1)]
+                self._bucket_counts[label_values] = bucket_counts
+                self._sums[label_values] = 0
+
+            bucket_counts[bucket_index] += 1
+            self._sums[label_values] += observed_value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Observe duration of the block in seconds."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, *label_values)
+
+    def get_count(self, *label_values: str) -> int:
+        """Return count of the values observed with the labels."""
+        return sum(self._bucket_counts.get(label_values, ()))
+
+    def get_sum(self, *label_values: str) -> float:
+        """Return sum of the values observed with the labels."""
+        return self._sums.get(label_values, 0)
+
+    def _render_samples(self) -> list[str]:
+        samples = []
+        for label_values, bucket_counts in self._bucket_counts.items():
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip((*self.buckets, '+Inf'), bucket_counts):
+                cumulative_count += bucket_count
+                bucket_labels = self._format_labels(label_values, le=str(upper_bound))
+                samples.append(f'{self.name}_bucket{bucket_labels} {cumulative_count}')
+
+            labels = self._format_labels(label_values)
+            samples.append(f'{self.name}_sum{labels} {self._sums[label_values]}')
+            samples.append(f'{self.name}_count{labels} {cumulative_count}')
+
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of the process metrics."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        """Return registered counter, create it if needed."""
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return registered histogram, create it if needed."""
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+
+@lru_cache()
+def get_metrics_registry() -> MetricsRegistry:
+    """Create and return Metrics Registry."""
+    return MetricsRegistry()
+
+
+def _escape_label_value(label_value: str) -> str:
+    return str(label_value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
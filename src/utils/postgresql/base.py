@@ -0,0 +1,12 @@
+from django.db.backends.postgresql import base
+
+from src.utils.postgresql.metrics import connection_wait_duration
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend which measures how long queries wait for a connection."""
+
+    def get_new_connection(self, conn_params):
+        """Get a connection from the pool if it is configured, otherwise open a new one."""
+        with connection_wait_duration.time('pool' if self.pool else 'direct'):
+            return super().get_new_connection(conn_params)
@@ -0,0 +1,31 @@
+import time
+from typing import Any, Callable
+
+from src.utils.metrics import get_metrics_registry
+
+registry = get_metrics_registry()
+
+connection_wait_duration = registry.histogram(
+    'db_connection_wait_duration_seconds',
+    'Time of getting a database connection from the pool or of opening a new one.',
+    label_names=('mode',),
+)
+query_duration = registry.histogram(
+    'db_query_duration_seconds',
+    'Time of database queries.',
+    label_names=('operation',),
+)
+query_errors_total = registry.counter('db_query_errors_total', 'Failed database queries.', ('operation',))
+
+
+def observe_query(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    """Database execute wrapper which times the queries by operation."""
+    operation = sql.lstrip().split(maxsplit=1)[0].upper() if sql else 'UNKNOWN'
+    start_time = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    except Exception:
+        query_errors_total.inc(operation)
+        raise
+    finally:
+        query_duration.observe(time.perf_counter() - start_time, operation)